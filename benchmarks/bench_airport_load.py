@@ -0,0 +1,108 @@
+"""Reports how long loading an airport with its runways and frequencies takes.
+
+Adds an airport with many runways and frequencies, like KORD, to a synthetic
+database, then times loading it, along with a sample of other airports, first
+without the indexes on the runways' and frequencies' airport_id and then with
+them, printing the median and 99th percentile latencies.
+
+Run from the project directory with:
+
+    python -m benchmarks.bench_airport_load [airport_count]
+"""
+
+
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import create_database_file
+from p2app.engine.load_cache import LoadCacheSettings
+from p2app.engine.main import Engine
+from p2app.events import LoadAirportEvent, OpenDatabaseEvent
+
+
+_DEFAULT_AIRPORT_COUNT = 70000
+_LOADS = 500
+_BUSY_AIRPORT_RUNWAYS = 8
+_BUSY_AIRPORT_FREQUENCIES = 30
+_CHILD_INDEXES = ('runway_airport_id', 'airport_frequency_airport_id')
+
+
+def _add_busy_airport(database_path):
+    """Adds an airport with many runways and frequencies, returning its id"""
+    connection = sqlite3.connect(database_path)
+
+    with connection:
+        (airport_id,), = connection.execute('SELECT max(airport_id) + 1 FROM airport;')
+        connection.execute(
+            "INSERT INTO airport SELECT ?, 'KORD', type, 'Chicago O''Hare International Airport', "
+            'latitude_deg, longitude_deg, elevation_ft, continent_id, country_id, region_id, '
+            'municipality, 1, gps_code, iata_code, local_code, home_link, wikipedia_link, '
+            'keywords FROM airport WHERE airport_id = 1;', (airport_id,))
+
+        for _ in range(_BUSY_AIRPORT_RUNWAYS):
+            connection.execute(
+                'INSERT INTO runway (airport_id, length_ft, lighted, closed, le_ident, he_ident) '
+                "VALUES (?, 10000, 1, 0, '10L', '28R');", (airport_id,))
+
+        for _ in range(_BUSY_AIRPORT_FREQUENCIES):
+            connection.execute(
+                'INSERT INTO airport_frequency (airport_id, type, frequency_mhz) '
+                "VALUES (?, 'TWR', 126.9);", (airport_id,))
+
+    connection.close()
+    return airport_id
+
+
+def _report(engine, label, airport_ids):
+    """Loads each airport, printing the median and 99th percentile latencies"""
+    latencies = []
+
+    for airport_id in airport_ids:
+        start = time.perf_counter()
+        list(engine.process_event(LoadAirportEvent(airport_id)))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    percentiles = statistics.quantiles(latencies, n = 100)
+    print(f'  {label:28} p50 {percentiles[49]:8.3f} ms   p99 {percentiles[98]:8.3f} ms')
+
+
+def main():
+    airport_count = int(sys.argv[1]) if len(sys.argv) > 1 else _DEFAULT_AIRPORT_COUNT
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = create_database_file(
+            Path(directory) / 'airport.db', airports = airport_count)
+        busy_airport_id = _add_busy_airport(database_path)
+
+        # The load cache is disabled, so that every load goes to the database
+        engine = Engine(load_cache_settings = LoadCacheSettings(0, None, None))
+        list(engine.process_event(OpenDatabaseEvent(database_path)))
+        connection = engine.database().connection()
+
+        generator = random.Random(33)
+        sampled_ids = [generator.randint(1, airport_count) for _ in range(_LOADS)]
+        busy_ids = [busy_airport_id] * _LOADS
+
+        for index in _CHILD_INDEXES:
+            connection.execute(f'DROP INDEX {index};')
+
+        print(f'Loading airports from {airport_count:,}, without the airport_id indexes:')
+        _report(engine, 'KORD (many runways)', busy_ids)
+        _report(engine, 'random airports', sampled_ids)
+
+        # Reopening the database applies the migrations again, recreating the indexes
+        list(engine.process_event(OpenDatabaseEvent(database_path)))
+
+        print(f'Loading airports from {airport_count:,}, with the airport_id indexes:')
+        _report(engine, 'KORD (many runways)', busy_ids)
+        _report(engine, 'random airports', sampled_ids)
+        engine.database().close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Times saving 1,000 region updates one transaction at a time, in one batch, and
+with group commits.
+
+Each region in turn is renamed by a SaveRegionEvent sent to the engine, which by
+default commits each save as a transaction of its own.  The same updates are then
+sent between a BeginBatchEvent and a CommitBatchEvent, and then to an engine with
+a group commit window, which commits the saves that arrive within it together.
+
+Run from the project directory with:
+
+    python -m benchmarks.bench_batch_saves
+"""
+
+
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import create_database_file
+from p2app.engine.main import Engine
+from p2app.events import OpenDatabaseEvent, LoadRegionEvent, SaveRegionEvent,\
+    BeginBatchEvent, CommitBatchEvent, RegionSavedEvent, RegionLoadedEvent
+
+
+_UPDATES = 1000
+_GROUP_COMMIT_SECONDS = 0.05
+
+
+def _regions(engine):
+    """Returns the regions that are renamed"""
+    return [
+        event.region()
+        for region_id in range(1, _UPDATES + 1)
+        for event in engine.process_event(LoadRegionEvent(region_id))
+        if isinstance(event, RegionLoadedEvent)]
+
+
+def _save_all(engine, regions, suffix):
+    """Renames every region, returning how many were saved"""
+    saved = 0
+
+    for region in regions:
+        event = SaveRegionEvent(region._replace(name = f'{region.name} {suffix}'))
+        saved += sum(isinstance(result, RegionSavedEvent) for result in engine.process_event(event))
+
+    return saved
+
+
+def _run(database_path, label, suffix, batched = False, group_commit_seconds = None):
+    engine = Engine(group_commit_seconds = group_commit_seconds)
+    list(engine.process_event(OpenDatabaseEvent(database_path)))
+    regions = _regions(engine)
+
+    start = time.perf_counter()
+
+    if batched:
+        list(engine.process_event(BeginBatchEvent()))
+
+    saved = _save_all(engine, regions, suffix)
+
+    if batched:
+        list(engine.process_event(CommitBatchEvent()))
+
+    engine.commit_pending_saves()
+    seconds = time.perf_counter() - start
+    engine.database().close()
+
+    print(f'{label:28} {saved:5,} saves  {seconds * 1000:9.1f} ms  '
+          f'({seconds / saved * 1e6:7.1f} us per save)')
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = create_database_file(Path(directory) / 'airport.db')
+
+        _run(database_path, 'One transaction per save', 'A')
+        _run(database_path, 'One batch', 'B', batched = True)
+        _run(database_path, f'Group commits ({_GROUP_COMMIT_SECONDS * 1000:.0f} ms)', 'C',
+             group_commit_seconds = _GROUP_COMMIT_SECONDS)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Measures how quickly the engine finds the handler for an event.
+
+Replays a mixed stream of events through the isinstance chain that
+Engine.process_event used to walk and through the engine's EventDispatcher,
+reporting events per second for each.  Only the handler lookup is timed, so
+no database is needed.
+
+Run from the project directory with:
+
+    python -m benchmarks.bench_dispatch [event_count]
+"""
+
+
+import random
+import sys
+import time
+
+from p2app.engine import Engine
+from p2app.events import *
+
+
+_DEFAULT_EVENT_COUNT = 1_000_000
+
+
+def _make_event_stream(count):
+    """Returns a list of events in which searches, loads and saves are mixed"""
+    samples = [
+        StartContinentSearchEvent('NA', None),
+        LoadContinentEvent(1),
+        SaveContinentEvent(Continent(1, 'NA', 'North America')),
+        StartCountrySearchEvent('US', None),
+        LoadCountryEvent(1),
+        SaveNewCountryEvent(Country(None, 'XX', 'X', 1, '', None)),
+        StartRegionSearchEvent('US-CA', None, None),
+        LoadRegionEvent(1),
+        SaveRegionEvent(Region(1, 'US-CA', 'CA', 'California', 1, 1, None, None)),
+        SaveNewRegionEvent(Region(None, 'US-ZZ', 'ZZ', 'Z', 1, 1, None, None)),
+    ]
+
+    generator = random.Random(33)
+    return [generator.choice(samples) for _ in range(count)]
+
+
+def _legacy_lookup(event):
+    """The isinstance chain that Engine.process_event walked before the dispatcher"""
+    if isinstance(event, QuitInitiatedEvent):
+        return 'quit'
+    elif isinstance(event, OpenDatabaseEvent):
+        return 'open'
+    elif isinstance(event, CloseDatabaseEvent):
+        return 'close'
+    elif isinstance(event, StartContinentSearchEvent):
+        return 'search continent'
+    elif isinstance(event, LoadContinentEvent):
+        return 'load continent'
+    elif isinstance(event, (SaveNewContinentEvent, SaveContinentEvent)):
+        return 'save continent'
+    elif isinstance(event, StartCountrySearchEvent):
+        return 'search country'
+    elif isinstance(event, LoadCountryEvent):
+        return 'load country'
+    elif isinstance(event, (SaveNewCountryEvent, SaveCountryEvent)):
+        return 'save country'
+    elif isinstance(event, StartRegionSearchEvent):
+        return 'search region'
+    elif isinstance(event, LoadRegionEvent):
+        return 'load region'
+    elif isinstance(event, (SaveNewRegionEvent, SaveRegionEvent)):
+        return 'save region'
+    else:
+        return None
+
+
+def _time_lookups(lookup, events):
+    """Returns the number of events per second that the lookup can route"""
+    start = time.perf_counter()
+
+    for event in events:
+        lookup(event)
+
+    return len(events) / (time.perf_counter() - start)
+
+
+def main():
+    event_count = int(sys.argv[1]) if len(sys.argv) > 1 else _DEFAULT_EVENT_COUNT
+    events = _make_event_stream(event_count)
+
+    registry = Engine()._dispatcher
+    registry_lookup = lambda event: registry.lookup(type(event))
+
+    before = _time_lookups(_legacy_lookup, events)
+    after = _time_lookups(registry_lookup, events)
+
+    print(f'events replayed       : {event_count:,}')
+    print(f'isinstance chain      : {before:,.0f} events/sec')
+    print(f'dispatcher            : {after:,.0f} events/sec')
+    print(f'speedup               : {after / before:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
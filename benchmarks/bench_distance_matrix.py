@@ -0,0 +1,96 @@
+"""Times distance matrices computed in NumPy blocks against a Python loop.
+
+Measures the distance from each of one set of airports to each of another, a
+block of rows at a time within a fixed number of bytes, reporting the time taken
+and the largest block, then times a Python loop over a sample of the same rows
+and estimates how long it would take over the whole matrix.
+
+Run from the project directory with:
+
+    python -m benchmarks.bench_distance_matrix [airport_count] [max_block_megabytes]
+"""
+
+
+import math
+import random
+import sys
+import time
+
+from p2app.engine.distances import AirportCoordinates, distance_matrix_blocks
+from p2app.engine.geodesy import EARTH_RADIUS_NM
+
+
+_DEFAULT_AIRPORT_COUNT = 10000
+_DEFAULT_MAX_BLOCK_MEGABYTES = 64
+_SAMPLED_ROWS = 20
+
+
+def _random_coordinates(generator, count):
+    """Returns the ids, latitudes and longitudes of count random airports"""
+    return (
+        list(range(1, count + 1)),
+        [math.degrees(math.asin(generator.uniform(-1, 1))) for _ in range(count)],
+        [generator.uniform(-180, 180) for _ in range(count)])
+
+
+def _python_row(latitude, longitude, latitudes, longitudes):
+    """Measures one row of the matrix with a Python loop, as a baseline"""
+    row = []
+
+    for other_latitude, other_longitude in zip(latitudes, longitudes):
+        a = math.sin((other_latitude - latitude) / 2) ** 2 + \
+            math.cos(latitude) * math.cos(other_latitude) * \
+            math.sin((other_longitude - longitude) / 2) ** 2
+        row.append(2 * EARTH_RADIUS_NM * math.asin(min(1.0, math.sqrt(a))))
+
+    return row
+
+
+def main():
+    airport_count = int(sys.argv[1]) if len(sys.argv) > 1 else _DEFAULT_AIRPORT_COUNT
+    max_block_megabytes = \
+        float(sys.argv[2]) if len(sys.argv) > 2 else _DEFAULT_MAX_BLOCK_MEGABYTES
+    max_block_bytes = int(max_block_megabytes * 1024 * 1024)
+
+    generator = random.Random(33)
+    from_coordinates = AirportCoordinates(*_random_coordinates(generator, airport_count))
+    to_coordinates = AirportCoordinates(*_random_coordinates(generator, airport_count))
+
+    start = time.perf_counter()
+    largest_block = 0
+    blocks = 0
+    first_rows = None
+
+    for row, distances in distance_matrix_blocks(from_coordinates, to_coordinates, max_block_bytes):
+        largest_block = max(largest_block, distances.nbytes)
+        blocks += 1
+
+        if first_rows is None:
+            first_rows = distances[:_SAMPLED_ROWS].copy()
+
+    numpy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    python_rows = [
+        _python_row(
+            from_coordinates.latitudes[row], from_coordinates.longitudes[row],
+            to_coordinates.latitudes.tolist(), to_coordinates.longitudes.tolist())
+        for row in range(min(_SAMPLED_ROWS, airport_count))]
+    python_seconds = (time.perf_counter() - start) * airport_count / len(python_rows)
+
+    error = max(
+        abs(expected - actual)
+        for expected_row, actual_row in zip(python_rows, first_rows)
+        for expected, actual in zip(expected_row, actual_row))
+
+    print(f'{airport_count:,} x {airport_count:,} distances, '
+          f'at most {max_block_megabytes:g} MB per block:')
+    print(f'  NumPy blocks   {numpy_seconds:10.2f} s in {blocks} blocks, '
+          f'largest {largest_block / 1024 / 1024:.1f} MB')
+    print(f'  Python loop    {python_seconds:10.2f} s (estimated from {len(python_rows)} rows)')
+    print(f'  speedup        {python_seconds / numpy_seconds:10.1f}x')
+    print(f'  largest difference {error:.2e} nm')
+
+
+if __name__ == '__main__':
+    main()
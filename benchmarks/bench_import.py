@@ -0,0 +1,100 @@
+"""Times importing a full set of OurAirports CSV files.
+
+A synthetic database of roughly half a million rows is written out as CSV files
+in the OurAirports format, which are then imported twice: into a new database,
+and again into that database once it has been opened by the engine, so that the
+import has to drop and rebuild its indexes, as the nightly refresh does.
+
+Run from the project directory with:
+
+    python -m benchmarks.bench_import
+"""
+
+
+import csv
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import SCHEMA_PATH, create_database_file
+from p2app.engine.main import Engine
+from p2app.engine.ourairports import CSV_FILES, import_csv_files
+from p2app.events import OpenDatabaseEvent
+
+
+_COUNTS = {'airports': 210000, 'navigation_aids': 33000}
+
+
+def _csv_expression(column, convert):
+    """Returns the expression that selects a column's value as it appears in its CSV file"""
+    if isinstance(convert, tuple):
+        return \
+            f'(SELECT {convert.code_column} FROM {convert.table} ' \
+            f'WHERE {convert.id_expression} = row.{column})'
+    elif convert.__name__ == '_yes_no':
+        return f"CASE row.{column} WHEN 1 THEN 'yes' ELSE 'no' END"
+    else:
+        return f'row.{column}'
+
+
+def _write_csv_files(database_path, directory):
+    """Writes each table of a database to a CSV file in the OurAirports format"""
+    connection = sqlite3.connect(database_path)
+
+    try:
+        for csv_file in CSV_FILES:
+            expressions = ', '.join(
+                _csv_expression(column, convert) for column, _, convert in csv_file.columns)
+
+            with open(Path(directory) / csv_file.filename, 'w', newline = '') as file:
+                writer = csv.writer(file)
+                writer.writerow(csv_column for _, csv_column, _ in csv_file.columns)
+                writer.writerows(
+                    connection.execute(f'SELECT {expressions} FROM {csv_file.table} AS row;'))
+    finally:
+        connection.close()
+
+
+def _import(database_path, directory):
+    """Imports the CSV files into a database, returning the rows and the seconds taken"""
+    connection = sqlite3.connect(database_path, isolation_level = None)
+    connection.execute('PRAGMA journal_mode = WAL;')
+    connection.execute('PRAGMA cache_size = -262144;')
+
+    try:
+        start = time.perf_counter()
+        summary = import_csv_files(connection, directory)
+        seconds = time.perf_counter() - start
+    finally:
+        connection.close()
+
+    return sum(table.rows for table in summary.tables), seconds, summary.index_seconds
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = create_database_file(Path(directory) / 'source.db', **_COUNTS)
+        _write_csv_files(source_path, directory)
+
+        database_path = Path(directory) / 'airport.db'
+        connection = sqlite3.connect(database_path)
+        connection.executescript(SCHEMA_PATH.read_text())
+        connection.close()
+
+        rows, seconds, index_seconds = _import(database_path, directory)
+        print(f'Into a new database:      {rows:,} rows in {seconds:6.2f} s '
+              f'({index_seconds:.2f} s rebuilding indexes)')
+
+        # Opening the database lets the engine build all of its indexes first
+        engine = Engine()
+        list(engine.process_event(OpenDatabaseEvent(database_path)))
+        engine.database().close()
+
+        rows, seconds, index_seconds = _import(database_path, directory)
+        print(f'Into an indexed database: {rows:,} rows in {seconds:6.2f} s '
+              f'({index_seconds:.2f} s rebuilding indexes)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Replays a log of region and airport loads with and without the load cache.
+
+The log is a file with one JSON object per line, each naming the event and the
+id of the record it loads, e.g. {"event": "LoadAirportEvent", "id": 3632}.  When
+no log is given, a session is simulated: a user going back and forth between a
+small number of records at a time, occasionally moving on to others.  The loads
+are replayed against a synthetic database with the load cache disabled, then
+with it enabled, printing the hit rate and the median and 99th percentile load
+latencies of each.
+
+Run from the project directory with:
+
+    python -m benchmarks.bench_load_cache [log_path]
+"""
+
+
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import create_database_file
+from p2app.engine.load_cache import DEFAULT_LOAD_CACHE_SETTINGS, LoadCacheSettings
+from p2app.engine.main import Engine
+from p2app.events import LoadAirportEvent, LoadRegionEvent, OpenDatabaseEvent
+
+
+_LOAD_EVENT_TYPES = {
+    'LoadRegionEvent': LoadRegionEvent,
+    'LoadAirportEvent': LoadAirportEvent
+}
+
+_SIMULATED_LOADS = 20000
+_REGION_COUNT = 4000
+_AIRPORT_COUNT = 70000
+
+_DISABLED = LoadCacheSettings(max_entries = 0, max_bytes = None, ttl_seconds = None)
+
+
+def _simulate_log(path):
+    """Writes a log of a simulated session's loads to a file"""
+    generator = random.Random(33)
+    working_set = []
+
+    with open(path, 'w') as log:
+        for _ in range(_SIMULATED_LOADS):
+            # Mostly going back to one of the last few records, sometimes a new one
+            if not working_set or generator.random() < 0.25:
+                event_type = generator.choice(list(_LOAD_EVENT_TYPES))
+                count = _REGION_COUNT if event_type == 'LoadRegionEvent' else _AIRPORT_COUNT
+                working_set = [(event_type, generator.randint(1, count))] + working_set[:19]
+
+            event_type, record_id = generator.choice(working_set)
+            log.write(json.dumps({'event': event_type, 'id': record_id}) + '\n')
+
+
+def _read_log(path):
+    """Returns the load events in a log"""
+    with open(path) as log:
+        records = [json.loads(line) for line in log if line.strip()]
+
+    return [
+        _LOAD_EVENT_TYPES[record['event']](record['id'])
+        for record in records if record['event'] in _LOAD_EVENT_TYPES]
+
+
+def _replay(database_path, events, settings):
+    """Replays the loads with the given cache settings, returning the latencies of
+    each type of load and the engine's statistics"""
+    engine = Engine(load_cache_settings = settings)
+    list(engine.process_event(OpenDatabaseEvent(database_path)))
+    latencies = {event_type: [] for event_type in _LOAD_EVENT_TYPES.values()}
+
+    for event in events:
+        start = time.perf_counter()
+        list(engine.process_event(event))
+        latencies[type(event)].append((time.perf_counter() - start) * 1000)
+
+    connection = engine.database().connection()
+    caches = connection.load_caches
+    engine.database().close()
+    return latencies, caches
+
+
+def _report(label, latencies, caches):
+    print(f'{label}:')
+
+    for event_type, table in ((LoadRegionEvent, 'region'), (LoadAirportEvent, 'airport')):
+        if len(latencies[event_type]) < 2:
+            continue
+
+        cache = caches[table]
+        hit_rate = cache.hits / max(cache.hits + cache.misses, 1)
+        percentiles = statistics.quantiles(latencies[event_type], n = 100)
+        print(f'  {event_type.__name__:16} {len(latencies[event_type]):6,} loads   '
+              f'hit rate {hit_rate:6.1%}   '
+              f'p50 {percentiles[49]:7.3f} ms   p99 {percentiles[98]:7.3f} ms')
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        if len(sys.argv) > 1:
+            log_path = Path(sys.argv[1])
+        else:
+            log_path = Path(directory) / 'loads.jsonl'
+            _simulate_log(log_path)
+
+        events = _read_log(log_path)
+
+        database_path = create_database_file(
+            Path(directory) / 'airport.db', regions = _REGION_COUNT, airports = _AIRPORT_COUNT)
+
+        _report('Without the load cache', *_replay(database_path, events, _DISABLED))
+        _report(
+            f'With the load cache ({DEFAULT_LOAD_CACHE_SETTINGS.max_entries:,} entries)',
+            *_replay(database_path, events, DEFAULT_LOAD_CACHE_SETTINGS))
+
+
+if __name__ == '__main__':
+    main()
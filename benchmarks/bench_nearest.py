@@ -0,0 +1,86 @@
+"""Compares nearest-airport searches using the R*Tree with a naive scan.
+
+Finds the 10 airports nearest to each of a set of random points, once with the
+engine's R*Tree search and once by measuring the distance to every airport in
+the table and sorting them, checking that both find the same airports and
+printing the average time per search.
+
+Run from the project directory with:
+
+    python -m benchmarks.bench_nearest [airport_count]
+"""
+
+
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import create_database_file
+from p2app.engine.database import EngineConnection
+from p2app.engine.geodesy import haversine_nm
+from p2app.engine.locations import find_nearest
+from p2app.engine.migrations import apply_migrations
+
+
+_DEFAULT_AIRPORT_COUNT = 70000
+_SEARCHES = 200
+_COUNT = 10
+
+
+def _naive_nearest(connection, latitude, longitude, count):
+    """Finds the nearest airports by measuring the distance to every one of them"""
+    rows = connection.execute('SELECT airport_id, latitude_deg, longitude_deg FROM airport;')
+    airport_ids, latitudes, longitudes = zip(*rows)
+    distances = haversine_nm(latitude, longitude, latitudes, longitudes)
+    return [airport_id for _, airport_id in sorted(zip(distances, airport_ids))[:count]]
+
+
+def _time(search, points):
+    """Returns the results of a search from each point and the average milliseconds it took"""
+    start = time.perf_counter()
+    results = [search(latitude, longitude) for latitude, longitude in points]
+    return results, (time.perf_counter() - start) * 1000 / len(points)
+
+
+def main():
+    airport_count = int(sys.argv[1]) if len(sys.argv) > 1 else _DEFAULT_AIRPORT_COUNT
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = create_database_file(
+            Path(directory) / 'airport.db', airports = airport_count)
+
+        connection = sqlite3.connect(
+            database_path, isolation_level = None, factory = EngineConnection)
+
+        start = time.perf_counter()
+        apply_migrations(connection)
+        print(f'Indexing {airport_count:,} airports took {time.perf_counter() - start:.2f} s')
+
+        generator = random.Random(33)
+        points = [
+            (generator.uniform(-60, 70), generator.uniform(-180, 180)) for _ in range(_SEARCHES)]
+
+        indexed, indexed_milliseconds = _time(
+            lambda latitude, longitude: [
+                result.record_id
+                for result in find_nearest(connection, 'airport', latitude, longitude, _COUNT)],
+            points)
+
+        naive, naive_milliseconds = _time(
+            lambda latitude, longitude: _naive_nearest(connection, latitude, longitude, _COUNT),
+            points[:_SEARCHES // 10])
+
+        assert indexed[:len(naive)] == naive, 'the searches found different airports'
+
+        print(f'{_COUNT} nearest of {airport_count:,} airports:')
+        print(f'  R*Tree     {indexed_milliseconds:10.3f} ms')
+        print(f'  naive scan {naive_milliseconds:10.3f} ms')
+        print(f'  speedup    {naive_milliseconds / indexed_milliseconds:10.1f}x')
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
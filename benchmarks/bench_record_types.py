@@ -0,0 +1,83 @@
+"""Measures the cost of turning search results into Region records.
+
+Runs consecutive region searches the way the engine used to, defining a fresh
+Region namedtuple class before every search and building each row with
+Region._make, and then through the engine, which builds rows into the canonical
+Region type with a row factory.  Reports searches per second for each.
+
+Run from the project directory with:
+
+    python -m benchmarks.bench_record_types [searches]
+"""
+
+
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from benchmarks.synthetic import create_database_file
+from p2app.engine import Engine
+from p2app.events import *
+
+
+_DEFAULT_SEARCHES = 10_000
+_REGION_COUNT = 4000
+
+
+def _legacy_search(connection, region_code):
+    """Searches for a region the way the engine did before it reused Region"""
+    region_type = namedtuple(
+        'Region', ['region_id', 'region_code', 'local_code', 'name',
+                   'continent_id', 'country_id', 'wikipedia_link', 'keywords'])
+
+    cursor = connection.execute('SELECT * FROM region WHERE region_code = ?;', (region_code,))
+    results = [RegionSearchResultEvent(region_type._make(row)) for row in cursor.fetchall()]
+    cursor.close()
+    return results
+
+
+def main():
+    searches = int(sys.argv[1]) if len(sys.argv) > 1 else _DEFAULT_SEARCHES
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = create_database_file(
+            Path(directory) / 'airport.db', regions = _REGION_COUNT, airports = 0,
+            navigation_aids = 0)
+
+        connection = sqlite3.connect(database_path)
+        region_codes = [
+            code for code, in connection.execute('SELECT region_code FROM region;')]
+
+        generator = random.Random(33)
+        searched_codes = [generator.choice(region_codes) for _ in range(searches)]
+
+        start = time.perf_counter()
+
+        for region_code in searched_codes:
+            _legacy_search(connection, region_code)
+
+        before = searches / (time.perf_counter() - start)
+        connection.close()
+
+        engine = Engine()
+        list(engine.process_event(OpenDatabaseEvent(database_path)))
+        start = time.perf_counter()
+
+        for region_code in searched_codes:
+            list(engine.process_event(StartRegionSearchEvent(region_code, None, None)))
+
+        after = searches / (time.perf_counter() - start)
+        list(engine.process_event(CloseDatabaseEvent()))
+
+    print(f'region searches             : {searches:,}')
+    print(f'namedtuple class per search : {before:,.0f} searches/sec')
+    print(f'canonical Region + factory  : {after:,.0f} searches/sec')
+    print(f'speedup                     : {after / before:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
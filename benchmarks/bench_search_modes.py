@@ -0,0 +1,85 @@
+"""Reports query plans and timings for each region search mode.
+
+Runs every search mode, with and without case sensitivity, against the full
+region table, first without the engine's indexes and then after the engine's
+migrations have created them, printing the query plan SQLite chose and the
+average time per search.
+
+Run from the project directory with:
+
+    python -m benchmarks.bench_search_modes [region_count]
+"""
+
+
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import create_database_file
+from p2app.engine.migrations import apply_migrations
+from p2app.engine.statements import make_search
+from p2app.events.searching import *
+
+
+_DEFAULT_REGION_COUNT = 4000
+_SEARCHES_PER_MODE = 200
+
+
+def _make_searches(connection):
+    """Returns the (mode, ignore_case, values) searches that will be timed"""
+    names = [name for name, in connection.execute('SELECT name FROM region;')]
+    generator = random.Random(33)
+    sampled = [generator.choice(names) for _ in range(_SEARCHES_PER_MODE)]
+
+    return [
+        (EXACT_MATCH, False, sampled),
+        (EXACT_MATCH, True, [name.lower() for name in sampled]),
+        (PREFIX_MATCH, False, [name[:3] for name in sampled]),
+        (PREFIX_MATCH, True, [name[:3].lower() for name in sampled]),
+        (SUBSTRING_MATCH, False, [name[1:4] for name in sampled]),
+        (SUBSTRING_MATCH, True, [name[1:4].upper() for name in sampled])
+    ]
+
+
+def _report(connection, searches):
+    for mode, ignore_case, values in searches:
+        statement, parameters = make_search('region', {'name': values[0]}, mode, ignore_case)
+        plan = connection.execute(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+
+        start = time.perf_counter()
+
+        for value in values:
+            statement, parameters = make_search('region', {'name': value}, mode, ignore_case)
+            connection.execute(statement, parameters).fetchall()
+
+        milliseconds = (time.perf_counter() - start) * 1000 / len(values)
+        case = 'ignoring case' if ignore_case else 'matching case'
+        print(f'  {mode:8} {case:14} {milliseconds:8.3f} ms   {" / ".join(row[3] for row in plan)}')
+
+
+def main():
+    region_count = int(sys.argv[1]) if len(sys.argv) > 1 else _DEFAULT_REGION_COUNT
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = create_database_file(
+            Path(directory) / 'airport.db', regions = region_count, airports = 0,
+            navigation_aids = 0)
+
+        connection = sqlite3.connect(database_path, isolation_level = None)
+        searches = _make_searches(connection)
+
+        print(f'{region_count:,} regions, without the engine\'s indexes:')
+        _report(connection, searches)
+
+        apply_migrations(connection)
+
+        print(f'{region_count:,} regions, with the engine\'s indexes:')
+        _report(connection, searches)
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
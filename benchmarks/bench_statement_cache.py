@@ -0,0 +1,69 @@
+"""Measures what the compiled-statement cache saves on repeated loads.
+
+Sends LoadRegionEvent round trips through an engine whose connection keeps no
+compiled statements and through one that uses the default cache, reporting
+round trips per second for each.  Neither keeps loaded records, so that every
+round trip runs its query.
+
+Run from the project directory with:
+
+    python -m benchmarks.bench_statement_cache [round_trips]
+"""
+
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import create_database_file
+from p2app.engine import Engine
+from p2app.engine.load_cache import LoadCacheSettings
+from p2app.engine.statements import DEFAULT_CACHED_STATEMENTS
+from p2app.events import *
+
+
+_DEFAULT_ROUND_TRIPS = 100_000
+_REGION_COUNT = 4000
+
+
+def _time_round_trips(database_path, cached_statements, region_ids):
+    """Returns the number of load round trips per second an engine can make.  The
+    load cache is turned off, so that every load runs its query."""
+    engine = Engine(cached_statements, load_cache_settings = LoadCacheSettings(0, None, None))
+    list(engine.process_event(OpenDatabaseEvent(database_path)))
+
+    start = time.perf_counter()
+
+    for region_id in region_ids:
+        for _ in engine.process_event(LoadRegionEvent(region_id)):
+            pass
+
+    elapsed = time.perf_counter() - start
+    list(engine.process_event(CloseDatabaseEvent()))
+    return len(region_ids) / elapsed
+
+
+def main():
+    round_trips = int(sys.argv[1]) if len(sys.argv) > 1 else _DEFAULT_ROUND_TRIPS
+
+    generator = random.Random(33)
+    region_ids = [generator.randint(1, _REGION_COUNT) for _ in range(round_trips)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = create_database_file(
+            Path(directory) / 'airport.db', regions = _REGION_COUNT, airports = 0,
+            navigation_aids = 0)
+
+        without_cache = _time_round_trips(database_path, 0, region_ids)
+        with_cache = _time_round_trips(database_path, DEFAULT_CACHED_STATEMENTS, region_ids)
+
+    print(f'LoadRegionEvent round trips : {round_trips:,}')
+    print(f'without statement cache     : {without_cache:,.0f} round trips/sec')
+    print(f'with statement cache        : {with_cache:,.0f} round trips/sec')
+    print(f'speedup                     : {with_cache / without_cache:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
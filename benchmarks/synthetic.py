@@ -0,0 +1,147 @@
+"""Builds synthetic databases with the structure of airport.db for the benchmarks.
+
+The tables are created from schema.sql and filled with generated rows whose
+counts default to roughly those of the real airport.db, so the benchmarks can
+run without a copy of it.
+"""
+
+
+import random
+import sqlite3
+from pathlib import Path
+
+
+SCHEMA_PATH = Path(__file__).parent.parent / 'schema.sql'
+
+_CONTINENTS = [
+    (1, 'AF', 'Africa'), (2, 'AN', 'Antarctica'), (3, 'AS', 'Asia'), (4, 'EU', 'Europe'),
+    (5, 'NA', 'North America'), (6, 'OC', 'Oceania'), (7, 'SA', 'South America')
+]
+
+_SYLLABLES = [
+    'ka', 'lo', 'mi', 'ran', 'tor', 'vel', 'an', 'bri', 'cas', 'del', 'er', 'fon',
+    'gar', 'hal', 'is', 'jun', 'kel', 'lan', 'mor', 'nor', 'os', 'pel', 'qua', 'ros'
+]
+
+_AIRPORT_TYPES = ['small_airport', 'medium_airport', 'large_airport', 'heliport', 'closed']
+_NAVAID_TYPES = ['VOR', 'VOR-DME', 'NDB', 'DME', 'TACAN', 'VORTAC', 'NDB-DME']
+_FREQUENCY_TYPES = ['TWR', 'GND', 'ATIS', 'APP', 'UNIC', 'CTAF']
+
+
+def make_name(generator, words = 2):
+    """Returns a made-up, capitalized name of the given number of words"""
+    return ' '.join(
+        ''.join(generator.choice(_SYLLABLES) for _ in range(generator.randint(2, 3))).title()
+        for _ in range(words))
+
+
+def build_database(
+        connection, *, countries = 250, regions = 4000, airports = 70000,
+        runways_per_airport = 0.7, frequencies_per_airport = 0.4, navigation_aids = 11000,
+        seed = 33):
+    """Creates the schema in an empty database and fills it with generated rows"""
+    generator = random.Random(seed)
+    connection.executescript(SCHEMA_PATH.read_text())
+
+    country_rows = []
+
+    for country_id in range(1, countries + 1):
+        country_rows.append((
+            country_id, f'{_code(country_id, 2)}', make_name(generator, 1),
+            generator.randint(1, len(_CONTINENTS)),
+            f'https://en.wikipedia.org/wiki/C{country_id}',
+            make_name(generator, 2) if generator.random() < 0.3 else None))
+
+    region_rows = []
+
+    for region_id in range(1, regions + 1):
+        country = country_rows[generator.randrange(countries)]
+        local_code = _code(region_id, 3)
+        region_rows.append((
+            region_id, f'{country[1]}-{local_code}', local_code, make_name(generator, 1),
+            country[3], country[0], None,
+            make_name(generator, 2) if generator.random() < 0.2 else None))
+
+    airport_rows = []
+
+    for airport_id in range(1, airports + 1):
+        region = region_rows[generator.randrange(regions)]
+        airport_rows.append((
+            airport_id, f'A{airport_id:06d}', generator.choice(_AIRPORT_TYPES),
+            f'{make_name(generator, 2)} Airport',
+            generator.uniform(-60.0, 70.0), generator.uniform(-180.0, 180.0),
+            generator.randint(0, 8000), str(region[4]), region[5], region[0],
+            make_name(generator, 1), int(generator.random() < 0.1),
+            f'G{airport_id:05d}' if generator.random() < 0.5 else None,
+            _code(airport_id, 3) if generator.random() < 0.1 else None,
+            None, None, None,
+            make_name(generator, 2) if generator.random() < 0.2 else None))
+
+    runway_rows = []
+
+    for runway_id in range(1, int(airports * runways_per_airport) + 1):
+        airport = airport_rows[generator.randrange(airports)]
+        runway_rows.append((
+            runway_id, airport[0], generator.randint(1000, 13000), generator.randint(50, 200),
+            'ASP', 1, 0, '09', airport[4], airport[5], airport[6], 90.0, None,
+            '27', airport[4] + 0.01, airport[5] + 0.01, airport[6], 270.0, None))
+
+    frequency_rows = []
+
+    for frequency_id in range(1, int(airports * frequencies_per_airport) + 1):
+        frequency_rows.append((
+            frequency_id, generator.randint(1, airports), generator.choice(_FREQUENCY_TYPES),
+            None, round(generator.uniform(118.0, 136.0), 3)))
+
+    navigation_aid_rows = []
+
+    for navigation_aid_id in range(1, navigation_aids + 1):
+        airport = airport_rows[generator.randrange(airports)]
+        country = country_rows[airport[8] - 1]
+        navigation_aid_rows.append((
+            navigation_aid_id, f'{navigation_aid_id}-{country[1]}.html',
+            _code(navigation_aid_id, 3), make_name(generator, 1),
+            generator.choice(_NAVAID_TYPES), generator.randint(190, 1750),
+            airport[4] + generator.uniform(-0.5, 0.5), airport[5] + generator.uniform(-0.5, 0.5),
+            airport[6], country[1], None, None, None, None, None, None, None, 'BOTH', 'HIGH',
+            airport[0] if generator.random() < 0.5 else None))
+
+    with connection:
+        connection.executemany('INSERT INTO continent VALUES (?, ?, ?);', _CONTINENTS)
+        connection.executemany('INSERT INTO country VALUES (?, ?, ?, ?, ?, ?);', country_rows)
+        connection.executemany(
+            'INSERT INTO region VALUES (?, ?, ?, ?, ?, ?, ?, ?);', region_rows)
+        connection.executemany(
+            f'INSERT INTO airport VALUES ({", ".join("?" * 18)});', airport_rows)
+        connection.executemany(
+            f'INSERT INTO runway VALUES ({", ".join("?" * 19)});', runway_rows)
+        connection.executemany(
+            'INSERT INTO airport_frequency VALUES (?, ?, ?, ?, ?);', frequency_rows)
+        connection.executemany(
+            f'INSERT INTO navigation_aid VALUES ({", ".join("?" * 20)});', navigation_aid_rows)
+
+
+def create_database_file(path, **counts):
+    """Creates a database file at the given path, replacing any file already there,
+    and fills it by calling build_database with the given row counts"""
+    path = Path(path)
+    path.unlink(missing_ok = True)
+    connection = sqlite3.connect(path)
+
+    try:
+        build_database(connection, **counts)
+    finally:
+        connection.close()
+
+    return path
+
+
+def _code(number, length):
+    """Returns a unique, upper-case code of the given length for a number"""
+    letters = []
+
+    for _ in range(length):
+        number, remainder = divmod(number, 26)
+        letters.append(chr(ord('A') + remainder))
+
+    return ''.join(reversed(letters))
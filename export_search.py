@@ -0,0 +1,104 @@
+# export_search.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# Exports the continents, countries, regions or airports that a search finds to a
+# CSV, JSON Lines or columnar file, streaming the rows from the database so that
+# even a whole table is exported in constant memory.  A search in which nothing
+# is searched for exports every row of its table.
+#
+#     python export_search.py airport.db airport airports.csv --country-id 35
+#     python export_search.py airport.db region regions.jsonl --name New --mode prefix
+
+import argparse
+import os
+import sys
+from p2app.engine.main import Engine
+from p2app.events import OpenDatabaseEvent, DatabaseOpenFailedEvent, StartExportEvent,\
+    ExportedEvent, ExportFailedEvent, ErrorEvent, StartContinentSearchEvent,\
+    StartCountrySearchEvent, StartRegionSearchEvent, StartAirportSearchEvent, EXPORT_FORMATS,\
+    EXACT_MATCH, PREFIX_MATCH, SUBSTRING_MATCH
+
+
+_MODES = {'exact': EXACT_MATCH, 'prefix': PREFIX_MATCH, 'substring': SUBSTRING_MATCH}
+
+_FORMATS_BY_SUFFIX = {'.csv': 'csv', '.jsonl': 'jsonl', '.cols': 'columnar'}
+
+
+def _search_event(arguments):
+    search = {
+        'limit': arguments.limit,
+        'mode': _MODES[arguments.mode],
+        'ignore_case': arguments.ignore_case
+    }
+
+    if arguments.table == 'continent':
+        return StartContinentSearchEvent(arguments.code, arguments.name, **search)
+    elif arguments.table == 'country':
+        return StartCountrySearchEvent(arguments.code, arguments.name, **search)
+    elif arguments.table == 'region':
+        return StartRegionSearchEvent(
+            arguments.code, arguments.local_code, arguments.name, **search)
+    else:
+        return StartAirportSearchEvent(
+            arguments.code, arguments.iata_code, arguments.gps_code, arguments.name,
+            arguments.municipality, arguments.country_id, **search)
+
+
+def _parse_arguments():
+    parser = argparse.ArgumentParser(
+        description = 'Exports the results of a search to a CSV, JSON Lines or columnar file.')
+    parser.add_argument('database', help = 'the database to search')
+    parser.add_argument('table', choices = ['continent', 'country', 'region', 'airport'])
+    parser.add_argument('output', help = 'the file to export to')
+    parser.add_argument(
+        '--format', choices = EXPORT_FORMATS,
+        help = "the format to export in, which is otherwise chosen by the output file's "
+               "suffix (.csv, .jsonl or .cols), or is csv")
+    parser.add_argument(
+        '--code', help = 'the continent, country or region code, or the airport ident')
+    parser.add_argument('--name')
+    parser.add_argument('--local-code', help = "the region's local code")
+    parser.add_argument('--iata-code')
+    parser.add_argument('--gps-code')
+    parser.add_argument('--municipality')
+    parser.add_argument('--country-id', type = int, help = "the airport's country id")
+    parser.add_argument('--mode', choices = list(_MODES), default = 'exact')
+    parser.add_argument('--ignore-case', action = 'store_true')
+    parser.add_argument('--limit', type = int)
+    return parser.parse_args()
+
+
+def main():
+    arguments = _parse_arguments()
+    suffix = os.path.splitext(arguments.output)[1].lower()
+    format = arguments.format or _FORMATS_BY_SUFFIX.get(suffix, 'csv')
+
+    engine = Engine()
+
+    for event in engine.process_event(OpenDatabaseEvent(arguments.database)):
+        if isinstance(event, DatabaseOpenFailedEvent):
+            print(event.reason(), file = sys.stderr)
+            return 1
+
+    export = StartExportEvent(_search_event(arguments), arguments.output, format)
+
+    try:
+        for event in engine.process_event(export):
+            if isinstance(event, ExportedEvent):
+                print(f'Exported {event.rows():,} rows to {event.path()}')
+            elif isinstance(event, ExportFailedEvent):
+                print(event.reason(), file = sys.stderr)
+                return 1
+            elif isinstance(event, ErrorEvent):
+                print(event.message(), file = sys.stderr)
+                return 1
+    finally:
+        engine.database().close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# import_ourairports.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# Imports the CSV files published by OurAirports (countries.csv, regions.csv,
+# airports.csv, runways.csv, airport-frequencies.csv and navaids.csv) into a
+# database, replacing the rows of each table whose file is in the directory.  A
+# database that doesn't exist yet is created with the tables in schema.sql.  With
+# --sync, only the rows that have changed since the last sync are saved instead.
+#
+#     python import_ourairports.py [--sync] airport.db path/to/csv/directory
+
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from p2app.engine.database import EngineConnection
+from p2app.engine.ourairports import CsvImportError, import_csv_files, sync_csv_files
+
+
+_SCHEMA_PATH = Path(__file__).parent / 'schema.sql'
+
+
+def _connect(database_path):
+    is_new = not Path(database_path).exists()
+    connection = sqlite3.connect(
+        database_path, isolation_level = None, factory = EngineConnection)
+    connection.execute('PRAGMA journal_mode = WAL;')
+    connection.execute('PRAGMA cache_size = -262144;')
+    connection.execute('PRAGMA temp_store = MEMORY;')
+
+    if is_new:
+        connection.executescript(_SCHEMA_PATH.read_text())
+
+    return connection
+
+
+def _print_progress(imported):
+    print(f'{imported.filename:24} {imported.rows:9,} rows  {imported.seconds:7.2f} s')
+
+
+def _print_synced(synced):
+    print(f'{synced.filename:24} {synced.inserted:7,} inserted {synced.updated:7,} updated '
+          f'{synced.deleted:7,} deleted {synced.unchanged:7,} unchanged '
+          f'{synced.seconds:7.2f} s')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description = 'Imports the OurAirports CSV files into a database.')
+    parser.add_argument('database', help = 'the database to import into')
+    parser.add_argument('directory', help = 'the directory containing the CSV files')
+    parser.add_argument(
+        '--sync', action = 'store_true',
+        help = 'save only the rows that have changed since the last sync')
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+
+    try:
+        connection = _connect(arguments.database)
+    except sqlite3.Error as e:
+        print(f'The database could not be opened: {e}', file = sys.stderr)
+        return 1
+
+    try:
+        if arguments.sync:
+            synced = sync_csv_files(connection, arguments.directory)
+        else:
+            summary = import_csv_files(connection, arguments.directory, _print_progress)
+    except (CsvImportError, OSError, sqlite3.Error) as e:
+        print(f'The files could not be imported: {e}', file = sys.stderr)
+        return 1
+    finally:
+        connection.close()
+
+    if arguments.sync:
+        for table in synced:
+            _print_synced(table)
+
+        changed = sum(table.inserted + table.updated + table.deleted for table in synced)
+        print(f'Synced {changed:,} changed rows in {time.perf_counter() - start:.2f} s')
+    else:
+        print(f'{"(indexes)":24} {"":14}  {summary.index_seconds:7.2f} s')
+        print(f'Imported {sum(table.rows for table in summary.tables):,} rows '
+              f'in {time.perf_counter() - start:.2f} s')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,5 +8,5 @@
 # YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
 
 from .engine import Engine
-from .events import EventBus
+from .events import EventBus, ThreadedEventBus, QueuedEventBus
 from .views import MainView
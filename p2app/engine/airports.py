@@ -0,0 +1,170 @@
+"""This module is in charge of handling airport functions"""
+
+
+import sqlite3
+from p2app.events.airports import Airport, Runway, AirportFrequency, StartAirportSearchEvent,\
+    AirportSearchResultsBatchEvent, StartAirportPageSearchEvent, AirportSearchPageEvent,\
+    LoadAirportEvent, AirportLoadedEvent, SaveNewAirportEvent, SaveAirportEvent,\
+    AirportSavedEvent, SaveAirportFailedEvent
+from p2app.engine.database import fetch_batches, record_factory
+from p2app.engine.dispatch import dispatcher
+from p2app.engine.load_cache import load_cache
+from p2app.engine.migrations import MIGRATIONS
+from p2app.engine.paging import search_page
+from p2app.engine.statements import make_search
+
+
+_make_airport = record_factory(Airport)
+_make_runway = record_factory(Runway)
+_make_frequency = record_factory(AirportFrequency)
+
+_INSERT_AIRPORT = \
+    'INSERT INTO airport (airport_id, airport_ident, type, name, latitude_deg, ' \
+    'longitude_deg, elevation_ft, continent_id, country_id, region_id, municipality, ' \
+    'scheduled_service, gps_code, iata_code, local_code, home_link, wikipedia_link, ' \
+    'keywords) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);'
+
+_UPDATE_AIRPORT = \
+    'UPDATE airport SET airport_ident = ?, type = ?, name = ?, latitude_deg = ?, ' \
+    'longitude_deg = ?, elevation_ft = ?, continent_id = ?, country_id = ?, region_id = ?, ' \
+    'municipality = ?, scheduled_service = ?, gps_code = ?, iata_code = ?, local_code = ?, ' \
+    'home_link = ?, wikipedia_link = ?, keywords = ? WHERE airport_id = ?;'
+
+
+MIGRATIONS.extend([
+    # Searches by each of the airport search fields, and by country
+    'CREATE INDEX IF NOT EXISTS airport_name ON airport (name);',
+    'CREATE INDEX IF NOT EXISTS airport_iata_code ON airport (iata_code);',
+    'CREATE INDEX IF NOT EXISTS airport_gps_code ON airport (gps_code);',
+    'CREATE INDEX IF NOT EXISTS airport_municipality ON airport (municipality);',
+    'CREATE INDEX IF NOT EXISTS airport_country_id ON airport (country_id);',
+
+    # Pages of the airports in a country, ordered by name
+    'CREATE INDEX IF NOT EXISTS airport_country_id_name ON airport (country_id, name);',
+
+    # Case-insensitive searches by the same fields
+    'CREATE INDEX IF NOT EXISTS airport_ident_nocase ON airport (airport_ident COLLATE NOCASE);',
+    'CREATE INDEX IF NOT EXISTS airport_name_nocase ON airport (name COLLATE NOCASE);',
+    'CREATE INDEX IF NOT EXISTS airport_iata_code_nocase ON airport (iata_code COLLATE NOCASE);',
+    'CREATE INDEX IF NOT EXISTS airport_gps_code_nocase ON airport (gps_code COLLATE NOCASE);',
+    'CREATE INDEX IF NOT EXISTS airport_municipality_nocase '
+    'ON airport (municipality COLLATE NOCASE);',
+
+    # Loading an airport's runways and frequencies along with it
+    'CREATE INDEX IF NOT EXISTS runway_airport_id ON runway (airport_id);',
+    'CREATE INDEX IF NOT EXISTS airport_frequency_airport_id ON airport_frequency (airport_id);'
+])
+
+
+@dispatcher.register(StartAirportSearchEvent, errors_as_events = True)
+def process_start_airport_search_event(event, connection):
+    """This function starts airport search event"""
+    # Defining parameters
+    criteria = {
+        'airport_ident': event._airport_ident,
+        'iata_code': event._iata_code,
+        'gps_code': event._gps_code,
+        'name': event._name,
+        'municipality': event._municipality
+    }
+    statement, parameters = make_search(
+        'airport', criteria, event._mode, event._ignore_case,
+        {'country_id': event._country_id})
+    if statement is None:
+        return
+    cursor = connection.cursor()
+    cursor.row_factory = _make_airport
+    try:
+        cursor.execute(statement, parameters)
+        # Streaming results as each batch of rows is fetched, one event per batch
+        for airports in fetch_batches(cursor, connection.fetch_batch_size, event._limit):
+            yield AirportSearchResultsBatchEvent(airports)
+    finally:
+        cursor.close()
+
+
+@dispatcher.register(StartAirportPageSearchEvent, errors_as_events = True)
+def process_start_airport_page_search_event(event, connection):
+    """This function searches for one page of airports, ordered by name and id"""
+    # Defining parameters
+    criteria = {
+        'airport_ident': event._airport_ident,
+        'iata_code': event._iata_code,
+        'gps_code': event._gps_code,
+        'name': event._name,
+        'municipality': event._municipality
+    }
+    page = search_page(
+        connection, 'airport', criteria, ('name', 'airport_id'), _make_airport,
+        event._page_size, event._after_key, event._mode, event._ignore_case,
+        {'country_id': event._country_id})
+    if page is not None:
+        airports, next_key = page
+        yield AirportSearchPageEvent(airports, event._after_key, next_key)
+
+
+@dispatcher.register(LoadAirportEvent, errors_as_events = True)
+def process_load_airport_event(event, connection):
+    """This function loads airport based on id"""
+    # Defining parameters
+    airport_id = event._airport_id
+    cache = load_cache(connection, 'airport')
+    # Loading the airport, with its runways and frequencies, from the cache when it
+    # was loaded recently
+    if (cached := cache.get(airport_id)) is not None:
+        yield AirportLoadedEvent(*cached)
+        return
+    cursor = connection.cursor()
+    cursor.row_factory = _make_airport
+    cursor.execute("SELECT * FROM airport WHERE airport_id = ?;",
+                   (airport_id,))
+    # Fetching result
+    result = cursor.fetchone()
+    cursor.close()
+    if result is not None:
+        # Loading the airport's runways and frequencies with one indexed query each
+        runways = _load_children(
+            connection, 'SELECT * FROM runway WHERE airport_id = ? ORDER BY runway_id;',
+            _make_runway, airport_id)
+        frequencies = _load_children(
+            connection, 'SELECT * FROM airport_frequency WHERE airport_id = ? '
+            'ORDER BY airport_frequency_id;', _make_frequency, airport_id)
+        cache.put(airport_id, (result, runways, frequencies))
+        yield AirportLoadedEvent(result, runways, frequencies)
+    else:
+        yield ()
+
+
+def _load_children(connection, statement, make_record, airport_id):
+    """Returns the list of records that a statement finds for an airport, built by
+    the given row factory"""
+    cursor = connection.cursor()
+    cursor.row_factory = make_record
+    try:
+        return cursor.execute(statement, (airport_id,)).fetchall()
+    finally:
+        cursor.close()
+
+
+@dispatcher.register(SaveNewAirportEvent, SaveAirportEvent)
+def process_save_airport_event(event, connection):
+    """This function saves airport information, old and new airports"""
+    # Defining parameters
+    airport = event._airport
+    cursor = connection.cursor()
+    # Filtering New Airport Event versus Existing Airport Event
+    try:
+        if isinstance(event, SaveNewAirportEvent):
+            cursor.execute(_INSERT_AIRPORT, airport)
+        elif isinstance(event, SaveAirportEvent):
+            cursor.execute(_UPDATE_AIRPORT, (*airport[1:], airport.airport_id))
+    except sqlite3.IntegrityError as e:
+        yield SaveAirportFailedEvent(e)
+    else:
+        # New airports are given their id by the database
+        if isinstance(event, SaveNewAirportEvent):
+            airport = airport._replace(airport_id = cursor.lastrowid)
+        # The airport will be loaded from the database the next time it's needed
+        load_cache(connection, 'airport').invalidate(airport.airport_id)
+        yield AirportSavedEvent(airport)
+    cursor.close()
@@ -0,0 +1,145 @@
+"""This module is in charge of grouping saves into transactions.
+
+The connection is in autocommit mode, so every save is otherwise a transaction
+of its own, committed before the next one can begin.  A batch, begun by a
+BeginBatchEvent, holds every save until it's committed or rolled back.  When the
+engine is given a group commit window, the saves that arrive within that many
+seconds of the first are also committed together, by the first event to arrive
+after the window has passed, by the event bus once it has nothing left to do, or
+when the database is closed, whichever comes first.  If they can't be committed,
+they're rolled back and the view is sent an ErrorEvent."""
+
+
+import sqlite3
+import time
+from p2app.events.airports import SaveNewAirportEvent, SaveAirportEvent
+from p2app.events.app import ErrorEvent
+from p2app.events.batches import BeginBatchEvent, CommitBatchEvent, RollbackBatchEvent,\
+    BatchBegunEvent, BatchCommittedEvent, BatchRolledBackEvent, BatchFailedEvent
+from p2app.events.continents import SaveNewContinentEvent, SaveContinentEvent
+from p2app.events.countries import SaveNewCountryEvent, SaveCountryEvent
+from p2app.events.navigation_aids import SaveNewNavigationAidEvent, SaveNavigationAidEvent
+from p2app.events.regions import SaveNewRegionEvent, SaveRegionEvent
+from p2app.engine.diagnostics import STATISTICS_REPORTERS
+from p2app.engine.dispatch import dispatcher
+
+
+# The events whose saves a group commit coalesces
+SAVE_EVENT_TYPES = (
+    SaveNewContinentEvent, SaveContinentEvent, SaveNewCountryEvent, SaveCountryEvent,
+    SaveNewRegionEvent, SaveRegionEvent, SaveNewAirportEvent, SaveAirportEvent,
+    SaveNewNavigationAidEvent, SaveNavigationAidEvent
+)
+
+
+@dispatcher.register(BeginBatchEvent, errors_as_events = True)
+def process_begin_batch_event(event, connection):
+    """This function begins a batch of saves"""
+    if connection.in_batch:
+        yield BatchFailedEvent('A batch has already begun')
+        return
+    # The saves grouped so far aren't made part of the batch
+    commit_group(connection)
+    connection.execute('BEGIN;')
+    connection.in_batch = True
+    yield BatchBegunEvent()
+
+
+@dispatcher.register(CommitBatchEvent, errors_as_events = True)
+def process_commit_batch_event(event, connection):
+    """This function commits every save made since the batch began"""
+    if not connection.in_batch:
+        yield BatchFailedEvent('No batch has begun')
+        return
+    connection.execute('COMMIT;')
+    connection.in_batch = False
+    yield BatchCommittedEvent()
+
+
+@dispatcher.register(RollbackBatchEvent, errors_as_events = True)
+def process_rollback_batch_event(event, connection):
+    """This function undoes every save made since the batch began"""
+    if not connection.in_batch:
+        yield BatchFailedEvent('No batch has begun')
+        return
+    connection.execute('ROLLBACK;')
+    connection.in_batch = False
+    # The caches may hold records whose saves were just undone
+    reload_caches(connection)
+    yield BatchRolledBackEvent()
+
+
+def reload_caches(connection):
+    """Empties a connection's load caches and reloads its reference cache, so that
+    neither holds anything the database no longer does"""
+    for cache in (connection.load_caches or {}).values():
+        cache.clear()
+
+    if connection.reference_cache is not None:
+        connection.reference_cache.load(connection)
+
+
+def group_saves(event, connection):
+    """A generator function called before each event is handled.  Commits the saves
+    grouped so far if the group commit window has passed since the first of them,
+    yielding an ErrorEvent if they couldn't be, then, if the event is a save and
+    group commits are on, makes it part of the group, beginning a new group if
+    there isn't one."""
+    seconds = seconds_until_group_commit(connection)
+
+    if seconds is not None and seconds <= 0:
+        try:
+            commit_group(connection)
+        except sqlite3.Error as e:
+            yield ErrorEvent(f'The grouped saves could not be committed: {e}')
+
+    if connection.group_commit_seconds is None or connection.in_batch \
+            or not isinstance(event, SAVE_EVENT_TYPES):
+        return
+
+    if connection.group_started is None:
+        connection.execute('BEGIN;')
+        connection.group_started = time.monotonic()
+        connection.group_commits += 1
+
+    connection.grouped_saves += 1
+
+
+def seconds_until_group_commit(connection):
+    """Returns how many seconds are left before the saves grouped so far are due to
+    be committed, or None if there aren't any"""
+    if connection.group_started is None:
+        return None
+
+    return connection.group_started + connection.group_commit_seconds - time.monotonic()
+
+
+def commit_group(connection):
+    """Commits the saves grouped so far, if there are any.  If they can't be
+    committed (e.g., because the database is locked), they're rolled back and the
+    error is raised, so that the next save begins a new group."""
+    if connection.group_started is None:
+        return
+
+    try:
+        connection.execute('COMMIT;')
+    except sqlite3.Error:
+        if connection.in_transaction:
+            connection.execute('ROLLBACK;')
+
+        # The caches may hold records whose saves were just undone
+        reload_caches(connection)
+        raise
+    finally:
+        connection.group_started = None
+
+
+def report_group_commit_statistics(connection):
+    """Returns how many group commits there have been and how many saves they held"""
+    if connection is None or connection.group_commit_seconds is None:
+        return {}
+
+    return {'group commits': connection.group_commits, 'grouped saves': connection.grouped_saves}
+
+
+STATISTICS_REPORTERS.append(report_group_commit_statistics)
@@ -2,62 +2,87 @@
 
 
 import sqlite3
-from p2app.events.continents import ContinentSearchResultEvent, ContinentLoadedEvent, SaveContinentEvent,\
-    SaveContinentFailedEvent, SaveNewContinentEvent, ContinentSavedEvent
-from collections import namedtuple
+from p2app.events.continents import Continent, StartContinentSearchEvent,\
+    ContinentSearchResultsBatchEvent, StartContinentPageSearchEvent, ContinentSearchPageEvent,\
+    LoadContinentEvent, ContinentLoadedEvent, SaveContinentEvent, SaveContinentFailedEvent,\
+    SaveNewContinentEvent, ContinentSavedEvent
+from p2app.engine.database import fetch_batches, record_factory
+from p2app.engine.dispatch import dispatcher
+from p2app.engine.paging import search_page
+from p2app.engine.reference_cache import batches
+from p2app.engine.statements import make_search
 
 
-def define_globals():
-    """This function defines the global namedtuples of the functions"""
-    global Continent
-    Continent = namedtuple('Continent', ['continent_id', 'continent_code', 'name'])
+_make_continent = record_factory(Continent)
 
 
+@dispatcher.register(StartContinentSearchEvent, errors_as_events = True)
 def process_start_continent_search_event(event, connection):
     """This function starts continent search"""
     # Defining parameters
-    define_globals()
     continent_name = event._name
     continent_code = event._continent_code
+    criteria = {'continent_code': continent_code, 'name': continent_name}
+    # Searching the cached continents rather than the database, if there are any
+    if connection.reference_cache is not None:
+        continents = connection.reference_cache.continents.search(
+            criteria, event._mode, event._ignore_case)
+        for batch in batches(continents or [], connection.fetch_batch_size, event._limit):
+            yield ContinentSearchResultsBatchEvent(batch)
+        return
+    statement, parameters = make_search('continent', criteria, event._mode, event._ignore_case)
+    if statement is None:
+        return
     cursor = connection.cursor()
-    # Checking all cases of search parameters
-    if continent_name is not None and continent_code is not None:
-        cursor.execute("SELECT * FROM continent WHERE continent_code = ? AND name = ?;",
-                       (continent_code, continent_name))
-    elif continent_name is not None:
-        cursor.execute("SELECT * FROM continent WHERE name = ?;",
-                       (continent_name,))
-    elif continent_code is not None:
-        cursor.execute("SELECT * FROM continent WHERE continent_code = ?;",
-                       (continent_code,))
-    # Fetching result
-    result = cursor.fetchall()
-    if result is not None:
-        for continent in result:
-            continent = Continent._make(continent)
-            yield ContinentSearchResultEvent(continent)
-    else:
-        yield ()
-    cursor.close()
+    cursor.row_factory = _make_continent
+    try:
+        cursor.execute(statement, parameters)
+        # Streaming results as each batch of rows is fetched, one event per batch
+        for continents in fetch_batches(cursor, connection.fetch_batch_size, event._limit):
+            yield ContinentSearchResultsBatchEvent(continents)
+    finally:
+        cursor.close()
 
 
+@dispatcher.register(StartContinentPageSearchEvent, errors_as_events = True)
+def process_start_continent_page_search_event(event, connection):
+    """This function searches for one page of continents, ordered by name and id"""
+    # Defining parameters
+    criteria = {'continent_code': event._continent_code, 'name': event._name}
+    page = search_page(
+        connection, 'continent', criteria, ('name', 'continent_id'), _make_continent,
+        event._page_size, event._after_key, event._mode, event._ignore_case)
+    if page is not None:
+        continents, next_key = page
+        yield ContinentSearchPageEvent(continents, event._after_key, next_key)
+
+
+@dispatcher.register(LoadContinentEvent, errors_as_events = True)
 def process_load_continent_event(event, connection):
     """This function loads continent based on id"""
     # Defining parameters
     continent_id = event._continent_id
+    cache = connection.reference_cache
+    # Loading the cached continent when it's there
+    if cache is not None and (result := cache.continents.get(continent_id)) is not None:
+        yield ContinentLoadedEvent(result)
+        return
     cursor = connection.cursor()
+    cursor.row_factory = _make_continent
     cursor.execute("SELECT * FROM continent WHERE continent_id = ?;",
                    (continent_id,))
     # Fetching result
     result = cursor.fetchone()
     if result is not None:
-        result = Continent._make(result)
+        if cache is not None:
+            cache.continents.put(result)
         yield ContinentLoadedEvent(result)
     else:
         yield ()
     cursor.close()
 
 
+@dispatcher.register(SaveNewContinentEvent, SaveContinentEvent)
 def process_save_continent_event(event, connection):
     """This function saves continent information, old and new continents"""
     # Defining parameters
@@ -80,7 +105,11 @@ def process_save_continent_event(event, connection):
     except sqlite3.IntegrityError as e:
         yield SaveContinentFailedEvent(e)
     else:
-        # Fetching result
-        result = cursor.fetchone()
-        yield ContinentSavedEvent(result)
+        # New continents are given their id by the database
+        if isinstance(event, SaveNewContinentEvent):
+            continent = continent._replace(continent_id = cursor.lastrowid)
+        # Keeping the cached continents the same as the database's
+        if connection.reference_cache is not None and cursor.rowcount > 0:
+            connection.reference_cache.continents.put(continent)
+        yield ContinentSavedEvent(continent)
     cursor.close()
@@ -2,64 +2,87 @@
 
 
 import sqlite3
-from p2app.events.countries import CountrySearchResultEvent, CountryLoadedEvent,\
-    SaveNewCountryEvent, SaveCountryEvent, CountrySavedEvent, SaveCountryFailedEvent
-from collections import namedtuple
+from p2app.events.countries import Country, StartCountrySearchEvent,\
+    CountrySearchResultsBatchEvent, StartCountryPageSearchEvent, CountrySearchPageEvent,\
+    LoadCountryEvent, CountryLoadedEvent, SaveNewCountryEvent, SaveCountryEvent,\
+    CountrySavedEvent, SaveCountryFailedEvent
+from p2app.engine.database import fetch_batches, record_factory
+from p2app.engine.dispatch import dispatcher
+from p2app.engine.paging import search_page
+from p2app.engine.reference_cache import batches
+from p2app.engine.statements import make_search
 
 
-def define_globals():
-    """This function defines the global namedtuples of the functions"""
-    global Country
-    Country = namedtuple('Country', ['country_id', 'country_code', 'name', 'continent_id',
-                                     'wikipedia_link', 'keywords'])
+_make_country = record_factory(Country)
 
 
+@dispatcher.register(StartCountrySearchEvent, errors_as_events = True)
 def process_start_country_search_event(event, connection):
     """This function starts a country search"""
     # Defining parameters
-    define_globals()
     country_name = event._name
     country_code = event._country_code
+    criteria = {'country_code': country_code, 'name': country_name}
+    # Searching the cached countries rather than the database, if there are any
+    if connection.reference_cache is not None:
+        countries = connection.reference_cache.countries.search(
+            criteria, event._mode, event._ignore_case)
+        for batch in batches(countries or [], connection.fetch_batch_size, event._limit):
+            yield CountrySearchResultsBatchEvent(batch)
+        return
+    statement, parameters = make_search('country', criteria, event._mode, event._ignore_case)
+    if statement is None:
+        return
     cursor = connection.cursor()
-
-    # Checking all cases of search parameters
-    if country_name is not None and country_code is not None:
-        cursor.execute("SELECT * FROM country WHERE country_code = ? AND name = ?;",
-                       (country_code, country_name))
-    elif country_name is not None:
-        cursor.execute("SELECT * FROM country WHERE name = ?;",
-                       (country_name,))
-    elif country_code is not None:
-        cursor.execute("SELECT * FROM country WHERE country_code = ?;",
-                       (country_code,))
-        # Fetching result
-        result = cursor.fetchall()
-        if result is not None:
-            for country in result:
-                country = Country._make(country)
-                yield CountrySearchResultEvent(country)
-        else:
-            yield ()
+    cursor.row_factory = _make_country
+    try:
+        cursor.execute(statement, parameters)
+        # Streaming results as each batch of rows is fetched, one event per batch
+        for countries in fetch_batches(cursor, connection.fetch_batch_size, event._limit):
+            yield CountrySearchResultsBatchEvent(countries)
+    finally:
         cursor.close()
 
 
+@dispatcher.register(StartCountryPageSearchEvent, errors_as_events = True)
+def process_start_country_page_search_event(event, connection):
+    """This function searches for one page of countries, ordered by name and id"""
+    # Defining parameters
+    criteria = {'country_code': event._country_code, 'name': event._name}
+    page = search_page(
+        connection, 'country', criteria, ('name', 'country_id'), _make_country,
+        event._page_size, event._after_key, event._mode, event._ignore_case)
+    if page is not None:
+        countries, next_key = page
+        yield CountrySearchPageEvent(countries, event._after_key, next_key)
+
+
+@dispatcher.register(LoadCountryEvent, errors_as_events = True)
 def process_load_country_event(event, connection):
     """This function loads country based on id"""
     # Defining parameters
     country_id = event._country_id
+    cache = connection.reference_cache
+    # Loading the cached country when it's there
+    if cache is not None and (result := cache.countries.get(country_id)) is not None:
+        yield CountryLoadedEvent(result)
+        return
     cursor = connection.cursor()
+    cursor.row_factory = _make_country
     cursor.execute("SELECT * FROM country WHERE country_id = ?;",
                    (country_id,))
     # Fetching result
     result = cursor.fetchone()
     if result is not None:
-        result = Country._make(result)
+        if cache is not None:
+            cache.countries.put(result)
         yield CountryLoadedEvent(result)
     else:
         yield ()
     cursor.close()
 
 
+@dispatcher.register(SaveNewCountryEvent, SaveCountryEvent)
 def process_save_country_event(event, connection):
     """This function saves country information, old and new countries"""
     # Defining parameters
@@ -84,7 +107,11 @@ def process_save_country_event(event, connection):
     except sqlite3.IntegrityError as e:
         yield SaveCountryFailedEvent(e)
     else:
-        # Fetching result
-        result = cursor.fetchone()
-        yield CountrySavedEvent(result)
+        # New countries are given their id by the database
+        if isinstance(event, SaveNewCountryEvent):
+            country = country._replace(country_id = cursor.lastrowid)
+        # Keeping the cached countries the same as the database's
+        if connection.reference_cache is not None and cursor.rowcount > 0:
+            connection.reference_cache.countries.put(country)
+        yield CountrySavedEvent(country)
     cursor.close()
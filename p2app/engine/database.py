@@ -2,18 +2,164 @@
 
 
 import sqlite3
+import time
 from p2app.events.database import DatabaseOpenedEvent, DatabaseOpenFailedEvent
+from p2app.engine.batches import commit_group
+from p2app.engine.load_cache import DEFAULT_LOAD_CACHE_SETTINGS
+from p2app.engine.migrations import apply_migrations
+from p2app.engine.statements import DEFAULT_CACHED_STATEMENTS
 
 
-def process_open_database_event(event):
+# How many rows a search fetches from its cursor at a time by default
+DEFAULT_FETCH_BATCH_SIZE = 256
+
+
+# The PRAGMAs applied to every connection as soon as it has been opened
+_PRAGMAS = (
+    'PRAGMA foreign_keys = ON;',
+    'PRAGMA journal_mode = WAL;',
+    'PRAGMA synchronous = NORMAL;',
+    'PRAGMA cache_size = -65536;',
+    'PRAGMA mmap_size = 268435456;',
+    'PRAGMA temp_store = MEMORY;'
+)
+
+
+# The functions called with every connection once it has been opened and its
+# migrations applied, which the engine modules append to so that they can prepare
+# whatever they keep for the connection
+CONNECTION_INITIALIZERS = []
+
+
+class EngineConnection(sqlite3.Connection):
+    """A connection to the database that also carries the settings that the
+    engine's handlers need when they use it, and the state they keep for it"""
+    fetch_batch_size = DEFAULT_FETCH_BATCH_SIZE
+    load_cache_settings = DEFAULT_LOAD_CACHE_SETTINGS
+    load_caches = None
+    reference_cache = None
+    group_commit_seconds = None
+    full_text_search = True
+    group_started = None
+    group_commits = 0
+    grouped_saves = 0
+    in_batch = False
+
+
+class ConnectionManager:
+    """Owns the engine's one connection to the database, opening it exactly once
+    per database and closing it deterministically, so that reopening a database
+    never leaks a connection."""
+
+    def __init__(
+            self, cached_statements = DEFAULT_CACHED_STATEMENTS,
+            fetch_batch_size = DEFAULT_FETCH_BATCH_SIZE,
+            load_cache_settings = DEFAULT_LOAD_CACHE_SETTINGS, group_commit_seconds = None,
+            full_text_search = True):
+        """Initializes a manager with no database open, whose connections will keep
+        the given number of compiled statements cached, fetch search results the
+        given number of rows at a time, cache loaded records within the limits of
+        the given LoadCacheSettings, commit the saves that arrive within the given
+        number of seconds of each other together (None meaning each save is
+        committed on its own), and keep full-text indexes if full_text_search is
+        True (which makes every save keep them up to date)"""
+        self._cached_statements = cached_statements
+        self._fetch_batch_size = fetch_batch_size
+        self._load_cache_settings = load_cache_settings
+        self._group_commit_seconds = group_commit_seconds
+        self._full_text_search = full_text_search
+        self._connection = None
+        self._path = None
+        self._open_seconds = None
+        self._close_seconds = None
+
+
+    def open(self, database_path):
+        """Opens the database at the given path, closing any database that's already open"""
+        self.close()
+
+        start = time.perf_counter()
+        connection = sqlite3.connect(
+            database_path, isolation_level = None,
+            cached_statements = self._cached_statements, factory = EngineConnection)
+        connection.fetch_batch_size = self._fetch_batch_size
+        connection.load_cache_settings = self._load_cache_settings
+        connection.group_commit_seconds = self._group_commit_seconds
+        connection.full_text_search = self._full_text_search
+
+        try:
+            for pragma in _PRAGMAS:
+                _quietly_execute_statement(connection, pragma)
+
+            apply_migrations(connection)
+
+            for initialize in CONNECTION_INITIALIZERS:
+                initialize(connection)
+        except sqlite3.Error:
+            connection.close()
+            raise
+
+        self._connection = connection
+        self._path = database_path
+        self._open_seconds = time.perf_counter() - start
+
+
+    def close(self):
+        """Closes the database if one is open, committing any saves grouped so far
+        first.  A batch that hasn't been committed is rolled back."""
+        if self._connection is None:
+            return
+
+        start = time.perf_counter()
+
+        # The database is closed even if the grouped saves can't be committed
+        try:
+            commit_group(self._connection)
+        finally:
+            self._connection.close()
+            self._connection = None
+            self._path = None
+            self._close_seconds = time.perf_counter() - start
+
+
+    def is_open(self):
+        """Returns True if a database is open, or False otherwise"""
+        return self._connection is not None
+
+
+    def connection(self):
+        """Returns the connection to the open database, or None if there isn't one"""
+        return self._connection
+
+
+    def path(self):
+        """Returns the path to the open database, or None if there isn't one"""
+        return self._path
+
+
+    def timings(self):
+        """Returns how many seconds the most recent open and close took, with None
+        standing in for an operation that hasn't happened yet"""
+        return {'open': self._open_seconds, 'close': self._close_seconds}
+
+
+def process_open_database_event(event, database):
     """This function opens the database file"""
     database_path = event.path()
     # Checks if it's a database file
-    db_checker = is_sqlite_database(database_path)
+    try:
+        db_checker = is_sqlite_database(database_path)
+    except OSError as e:
+        yield DatabaseOpenFailedEvent(f'The file could not be read: {e}')
+        return
+
     if db_checker:
-        connection = sqlite3.connect(database_path, isolation_level = None)
-        _quietly_execute_statement(connection, 'PRAGMA foreign_keys = ON;')
-        yield DatabaseOpenedEvent(database_path)
+        try:
+            database.open(database_path)
+        except sqlite3.Error as e:
+            yield DatabaseOpenFailedEvent(f'The database could not be opened: {e}')
+        else:
+            yield DatabaseOpenedEvent(database_path)
     else:
         yield DatabaseOpenFailedEvent('The file selected is not a database file.')
 
@@ -37,3 +183,32 @@ def _quietly_execute_statement(connection, statement):
         # was opened.
         if cursor is not None:
             cursor.close()
+
+
+def record_factory(record_type):
+    """Returns a row factory that builds each row fetched by a cursor directly into
+    an instance of the given namedtuple type"""
+    make = tuple.__new__
+
+    def factory(cursor, row):
+        return make(record_type, row)
+
+    return factory
+
+
+def fetch_batches(cursor, batch_size, limit = None):
+    """A generator function that fetches a cursor's rows in lists of at most
+    batch_size rows, stopping once limit rows have been fetched if there's a limit,
+    so that no more than one batch of rows is ever held in memory at a time"""
+    remaining = limit
+
+    while remaining is None or remaining > 0:
+        rows = cursor.fetchmany(batch_size if remaining is None else min(batch_size, remaining))
+
+        if not rows:
+            break
+
+        if remaining is not None:
+            remaining -= len(rows)
+
+        yield rows
@@ -0,0 +1,21 @@
+"""This module is in charge of reporting what the engine has been doing"""
+
+
+from p2app.events.diagnostics import ReportEngineStatisticsEvent, EngineStatisticsEvent
+from p2app.engine.dispatch import dispatcher
+
+
+# The functions that report statistics about the engine, each called with the
+# connection to the open database, or None if there isn't one, and returning a
+# dictionary of named statistics.  The engine modules append their own.
+STATISTICS_REPORTERS = []
+
+
+@dispatcher.register(ReportEngineStatisticsEvent, errors_as_events = True)
+def process_report_engine_statistics_event(event, connection):
+    """This function reports the statistics that the engine modules keep"""
+    # Collecting every module's statistics into one dictionary
+    statistics = {}
+    for report in STATISTICS_REPORTERS:
+        statistics.update(report(connection))
+    yield EngineStatisticsEvent(statistics)
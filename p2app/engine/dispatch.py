@@ -0,0 +1,83 @@
+"""This module is in charge of routing events to the functions that handle them"""
+
+
+from p2app.events.app import ErrorEvent
+
+
+class EventDispatcher:
+    """A table that maps event types to the generator functions that handle them.
+
+    A lookup tries the exact type of the event first and then walks its method
+    resolution order, so a handler registered for a base class also handles its
+    subclasses.  The outcome of every lookup is remembered, which means that each
+    event type pays for the walk once and is a single dictionary lookup after that,
+    no matter how many handlers have been registered.
+    """
+
+    def __init__(self):
+        """Initializes an empty dispatcher"""
+        self._handlers = {}
+        self._resolved = {}
+
+
+    def register(self, *event_types, errors_as_events = False):
+        """Returns a decorator that registers the decorated function as the handler
+        of the given event types.  When errors_as_events is True, an exception raised
+        by the handler is turned into an ErrorEvent instead of being propagated."""
+        def decorator(handler):
+            registered = _reporting_errors(handler) if errors_as_events else handler
+
+            for event_type in event_types:
+                self.add(event_type, registered)
+
+            return handler
+
+        return decorator
+
+
+    def add(self, event_type, handler):
+        """Registers a handler for one event type, replacing any existing one"""
+        self._handlers[event_type] = handler
+        self._resolved.clear()
+
+
+    def update(self, other):
+        """Registers every handler that has been registered with another dispatcher"""
+        self._handlers.update(other._handlers)
+        self._resolved.clear()
+
+
+    def lookup(self, event_type):
+        """Returns the handler for the given event type, or None if there isn't one"""
+        try:
+            return self._resolved[event_type]
+        except KeyError:
+            handler = self._resolve(event_type)
+            self._resolved[event_type] = handler
+            return handler
+
+
+    def _resolve(self, event_type):
+        """Finds the handler for the nearest registered class in the type's MRO"""
+        for base in event_type.__mro__:
+            handler = self._handlers.get(base)
+
+            if handler is not None:
+                return handler
+
+        return None
+
+
+def _reporting_errors(handler):
+    """Wraps a handler so that any exception it raises is yielded as an ErrorEvent"""
+    def reporting_handler(*args):
+        try:
+            yield from handler(*args)
+        except Exception as e:
+            yield ErrorEvent(e)
+
+    return reporting_handler
+
+
+# The dispatcher that the p2app.engine modules register their handlers into
+dispatcher = EventDispatcher()
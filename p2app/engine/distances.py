@@ -0,0 +1,137 @@
+"""This module is in charge of measuring the distances between sets of airports"""
+
+
+from p2app.events.distances import StartDistanceMatrixEvent, DistanceMatrixBlockEvent
+from p2app.engine.dispatch import dispatcher
+from p2app.engine.geodesy import EARTH_RADIUS_NM
+
+# NumPy is needed to measure distance matrices, but nothing else in the engine
+# depends on it, so the rest of the engine works without it
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# How many bytes the arrays computing one block of a distance matrix may take up,
+# which is about twice the size of the block itself
+DEFAULT_MAX_BLOCK_BYTES = 64 * 1024 * 1024
+
+# The airport columns that a selection of airports can be made by
+SELECTION_COLUMNS = ('airport_id', 'continent_id', 'country_id', 'region_id', 'type')
+
+
+class AirportCoordinates:
+    """The ids of a selection of airports, along with their latitudes and longitudes
+    in radians and the cosines of their latitudes, each in a contiguous array"""
+
+    def __init__(self, airport_ids, latitudes_deg, longitudes_deg):
+        """Initializes the coordinates from sequences of ids and coordinates in degrees"""
+        self.airport_ids = numpy.ascontiguousarray(airport_ids, dtype = numpy.int64)
+        self.latitudes = numpy.radians(
+            numpy.ascontiguousarray(latitudes_deg, dtype = numpy.float64))
+        self.longitudes = numpy.radians(
+            numpy.ascontiguousarray(longitudes_deg, dtype = numpy.float64))
+        self.cos_latitudes = numpy.cos(self.latitudes)
+
+
+    def __len__(self):
+        return len(self.airport_ids)
+
+
+def _selection_statement(selection):
+    """Returns the statement that selects the ids and coordinates of the airports in
+    a selection, along with its parameters"""
+    conditions = []
+    parameters = []
+
+    for column, value in selection.items():
+        if column not in SELECTION_COLUMNS:
+            raise ValueError(f'Airports cannot be selected by {column!r}')
+
+        if isinstance(value, (list, tuple)):
+            conditions.append(f'{column} IN ({", ".join("?" * len(value))})')
+            parameters.extend(value)
+        else:
+            conditions.append(f'{column} = ?')
+            parameters.append(value)
+
+    where = f' WHERE {" AND ".join(conditions)}' if conditions else ''
+    statement = f'SELECT airport_id, latitude_deg, longitude_deg FROM airport{where} ' \
+                f'ORDER BY airport_id;'
+    return statement, parameters
+
+
+def load_airport_coordinates(connection, selection):
+    """Returns the AirportCoordinates of the airports in a selection, ordered by id"""
+    statement, parameters = _selection_statement(selection)
+    cursor = connection.execute(statement, parameters)
+
+    try:
+        rows = numpy.array(cursor.fetchall(), dtype = numpy.float64).reshape(-1, 3)
+    finally:
+        cursor.close()
+
+    return AirportCoordinates(rows[:, 0], rows[:, 1], rows[:, 2])
+
+
+def distance_matrix_blocks(
+        from_coordinates, to_coordinates, max_block_bytes = DEFAULT_MAX_BLOCK_BYTES):
+    """A generator function that yields the great-circle distances, in nautical
+    miles, from each airport in from_coordinates to each in to_coordinates, as
+    (start, distances) pairs, where distances is an array of the rows of the
+    matrix beginning with row start.  The rows are as many as will fit in
+    max_block_bytes, but always at least one."""
+    columns = len(to_coordinates)
+    rows_per_block = max(1, max_block_bytes // (2 * 8 * max(columns, 1)))
+
+    for start in range(0, len(from_coordinates), rows_per_block):
+        block = slice(start, start + rows_per_block)
+        yield start, _haversine_block(
+            from_coordinates.latitudes[block], from_coordinates.longitudes[block],
+            from_coordinates.cos_latitudes[block], to_coordinates)
+
+
+def _haversine_block(latitudes, longitudes, cos_latitudes, to_coordinates):
+    """Returns the matrix of the distances from each of the given points to each of
+    to_coordinates, computing it in place in two arrays the size of the matrix"""
+    # sin²(Δlatitude / 2)
+    a = numpy.subtract.outer(latitudes, to_coordinates.latitudes)
+    a *= 0.5
+    numpy.sin(a, out = a)
+    a *= a
+
+    # cos(latitude) × cos(other latitude) × sin²(Δlongitude / 2)
+    b = numpy.subtract.outer(longitudes, to_coordinates.longitudes)
+    b *= 0.5
+    numpy.sin(b, out = b)
+    b *= b
+    b *= cos_latitudes[:, numpy.newaxis]
+    b *= to_coordinates.cos_latitudes
+
+    a += b
+    del b
+
+    numpy.sqrt(a, out = a)
+    numpy.minimum(a, 1.0, out = a)
+    numpy.arcsin(a, out = a)
+    a *= 2 * EARTH_RADIUS_NM
+    return a
+
+
+@dispatcher.register(StartDistanceMatrixEvent, errors_as_events = True)
+def process_start_distance_matrix_event(event, connection):
+    """This function measures the distances between two selections of airports,
+    streaming the matrix a block of rows at a time"""
+    # Defining parameters
+    if numpy is None:
+        raise RuntimeError('Measuring distance matrices requires NumPy, which is not installed')
+    from_coordinates = load_airport_coordinates(connection, event._from_selection)
+    to_coordinates = load_airport_coordinates(connection, event._to_selection)
+    # Delivering the matrix a block at a time.  The event bus waits for the view to
+    # take each block before letting the engine get more than a couple ahead of it,
+    # so only a few blocks are ever in memory at once.
+    for start, distances in distance_matrix_blocks(from_coordinates, to_coordinates):
+        yield DistanceMatrixBlockEvent(
+            from_coordinates.airport_ids[start:start + len(distances)],
+            to_coordinates.airport_ids, distances)
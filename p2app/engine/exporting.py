@@ -0,0 +1,267 @@
+"""This module is in charge of exporting the results of searches to files.
+
+The rows are fetched from the cursor a batch at a time and written out before the
+next batch is fetched, so only one batch is ever held in memory, however many
+rows there are.  The columnar format buffers one group of rows at a time, which
+it writes column by column.
+
+A columnar file begins with the magic bytes, then a header giving the table and
+its columns as JSON, then each group of rows, then a group of zero rows.  Each
+group is its number of rows followed by each of its columns: a byte saying what
+type of values it holds and the length and zlib-compressed bytes of its data.
+The data is a bitmap of the rows whose values are NULL, then the other values,
+as 64-bit integers, 64-bit floats, or the lengths of UTF-8 strings followed by
+the strings themselves.  Every number is little-endian."""
+
+
+import csv
+import json
+import sqlite3
+import struct
+import sys
+import zlib
+from array import array
+from p2app.events.airports import StartAirportSearchEvent
+from p2app.events.continents import StartContinentSearchEvent
+from p2app.events.countries import StartCountrySearchEvent
+from p2app.events.exporting import StartExportEvent, ExportedEvent, ExportFailedEvent,\
+    EXPORT_FORMATS
+from p2app.events.regions import StartRegionSearchEvent
+from p2app.engine.database import fetch_batches
+from p2app.engine.dispatch import dispatcher
+from p2app.engine.statements import make_search
+
+
+# For each type of search event, a function returning the table it searches, the
+# dictionary of its columns to the values searched for, and that of its filters
+_SEARCHES = {
+    StartContinentSearchEvent: lambda event: (
+        'continent', {'continent_code': event.continent_code(), 'name': event.name()}, None),
+    StartCountrySearchEvent: lambda event: (
+        'country', {'country_code': event.country_code(), 'name': event.name()}, None),
+    StartRegionSearchEvent: lambda event: (
+        'region',
+        {'region_code': event.region_code(), 'local_code': event.local_code(),
+         'name': event.name()},
+        None),
+    StartAirportSearchEvent: lambda event: (
+        'airport',
+        {'airport_ident': event.airport_ident(), 'iata_code': event.iata_code(),
+         'gps_code': event.gps_code(), 'name': event.name(),
+         'municipality': event.municipality()},
+        {'country_id': event.country_id()})
+}
+
+# How many rows are fetched from the cursor at a time
+_EXPORT_BATCH_SIZE = 1024
+
+COLUMNAR_MAGIC = b'P2COLS1\0'
+
+# How many rows each group of a columnar file holds at most
+COLUMNAR_GROUP_ROWS = 8192
+
+# The types of values a column of a group can hold
+_INTEGER = b'i'
+_REAL = b'd'
+_TEXT = b't'
+_NULL = b'n'
+
+# Whether the numbers in arrays need their bytes swapped to be little-endian
+_SWAP_BYTES = sys.byteorder != 'little'
+
+
+@dispatcher.register(StartExportEvent)
+def process_start_export_event(event, connection):
+    """This function exports the results of a search to a file"""
+    try:
+        rows = export_search(connection, event.search_event(), event.path(), event.format())
+    except (OSError, ValueError, sqlite3.Error) as e:
+        yield ExportFailedEvent(f'The search could not be exported: {e}')
+    else:
+        yield ExportedEvent(event.path(), event.format(), rows)
+
+
+def export_search(connection, search_event, path, format):
+    """Writes the rows that a search event finds to a file at the given path in the
+    given format, returning how many rows were written.  A search in which nothing
+    is searched for exports every row of its table."""
+    if type(search_event) not in _SEARCHES:
+        raise ValueError(f'{type(search_event).__name__} searches cannot be exported')
+
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f'Unknown export format: {format!r}')
+
+    table, criteria, filters = _SEARCHES[type(search_event)](search_event)
+    statement, parameters = make_search(
+        table, criteria, search_event.mode(), search_event.ignore_case(), filters)
+
+    if statement is None:
+        statement, parameters = f'SELECT * FROM {table};', ()
+
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute(statement, parameters)
+        columns = [description[0] for description in cursor.description]
+        batches = fetch_batches(cursor, _EXPORT_BATCH_SIZE, search_event.limit())
+
+        if format == 'csv':
+            return _write_csv(path, columns, batches)
+        elif format == 'jsonl':
+            return _write_jsonl(path, columns, batches)
+        else:
+            return _write_columnar(path, table, columns, batches)
+    finally:
+        cursor.close()
+
+
+def _write_csv(path, columns, batches):
+    count = 0
+
+    with open(path, 'w', newline = '', encoding = 'utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+
+        for rows in batches:
+            writer.writerows(rows)
+            count += len(rows)
+
+    return count
+
+
+def _write_jsonl(path, columns, batches):
+    count = 0
+
+    with open(path, 'w', encoding = 'utf-8') as file:
+        for rows in batches:
+            file.writelines(
+                json.dumps(dict(zip(columns, row)), ensure_ascii = False) + '\n' for row in rows)
+            count += len(rows)
+
+    return count
+
+
+def _write_columnar(path, table, columns, batches):
+    count = 0
+    group = []
+
+    with open(path, 'wb') as file:
+        header = json.dumps({'table': table, 'columns': columns}).encode()
+        file.write(COLUMNAR_MAGIC + struct.pack('<I', len(header)) + header)
+
+        for rows in batches:
+            group.extend(rows)
+            count += len(rows)
+
+            if len(group) >= COLUMNAR_GROUP_ROWS:
+                _write_columnar_group(file, group)
+                group = []
+
+        if group:
+            _write_columnar_group(file, group)
+
+        file.write(struct.pack('<I', 0))
+
+    return count
+
+
+def _write_columnar_group(file, rows):
+    """Writes one group of rows to a columnar file, column by column"""
+    file.write(struct.pack('<I', len(rows)))
+
+    for values in zip(*rows):
+        value_type, data = _encode_column(values)
+        compressed = zlib.compress(data)
+        file.write(value_type + struct.pack('<I', len(compressed)) + compressed)
+
+
+def _encode_column(values):
+    """Returns the type of a column's values and the bytes that store them"""
+    nulls = bytearray((len(values) + 7) // 8)
+    present = []
+
+    for index, value in enumerate(values):
+        if value is None:
+            nulls[index // 8] |= 1 << (index % 8)
+        else:
+            present.append(value)
+
+    kinds = {type(value) for value in present}
+
+    if not present:
+        return _NULL, bytes(nulls)
+    elif kinds == {int}:
+        return _INTEGER, bytes(nulls) + _little_endian(array('q', present))
+    elif kinds <= {int, float}:
+        return _REAL, bytes(nulls) + _little_endian(array('d', map(float, present)))
+    else:
+        strings = [str(value).encode() for value in present]
+        lengths = _little_endian(array('I', map(len, strings)))
+        return _TEXT, bytes(nulls) + lengths + b''.join(strings)
+
+
+def _little_endian(values):
+    """Returns the bytes of an array of numbers in little-endian order"""
+    if _SWAP_BYTES:
+        values.byteswap()
+
+    return values.tobytes()
+
+
+def read_columnar_file(path):
+    """A generator function that yields the table and the columns of a columnar
+    file, then each of its rows as a tuple, reading one group of rows at a time"""
+    with open(path, 'rb') as file:
+        if file.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f'{path} is not a columnar export file')
+
+        header = json.loads(file.read(_read_length(file)))
+        yield header['table'], header['columns']
+
+        while (row_count := _read_length(file)) > 0:
+            columns = []
+
+            for _ in header['columns']:
+                value_type = file.read(1)
+                data = zlib.decompress(file.read(_read_length(file)))
+                columns.append(_decode_column(value_type, data, row_count))
+
+            yield from zip(*columns)
+
+
+def _read_length(file):
+    length, = struct.unpack('<I', file.read(4))
+    return length
+
+
+def _decode_column(value_type, data, row_count):
+    """Returns the values of one column of a group, given the bytes that store them"""
+    null_bytes = (row_count + 7) // 8
+    nulls, data = data[:null_bytes], data[null_bytes:]
+    is_null = [bool(nulls[index // 8] & (1 << (index % 8))) for index in range(row_count)]
+    present_count = row_count - sum(is_null)
+
+    if value_type == _NULL:
+        present = []
+    elif value_type in (_INTEGER, _REAL):
+        present = array('q' if value_type == _INTEGER else 'd')
+        present.frombytes(data)
+
+        if _SWAP_BYTES:
+            present.byteswap()
+    else:
+        lengths = array('I')
+        lengths.frombytes(data[:4 * present_count])
+
+        if _SWAP_BYTES:
+            lengths.byteswap()
+
+        present = []
+        offset = 4 * present_count
+
+        for length in lengths:
+            present.append(data[offset:offset + length].decode())
+            offset += length
+
+    values = iter(present)
+    return [None if null else next(values) for null in is_null]
@@ -0,0 +1,134 @@
+"""This module is in charge of the full-text search over names and keywords"""
+
+
+import sqlite3
+from p2app.events.fulltext import FullTextSearchResult, StartFullTextSearchEvent,\
+    FullTextSearchResultsBatchEvent, FULL_TEXT_SEARCH_TABLES
+from p2app.engine.database import fetch_batches, record_factory
+from p2app.engine.dispatch import dispatcher
+from p2app.engine.migrations import MIGRATIONS
+
+
+_make_result = record_factory(FullTextSearchResult)
+
+
+def _index_name(table):
+    """Returns the name of the FTS5 table that indexes a table"""
+    return f'{table}_search'
+
+
+def _full_text_index_statements(table):
+    """Returns the statements that create the FTS5 index over a table's name and
+    keywords, along with the triggers that keep it in sync with the table"""
+    index = _index_name(table)
+    new_row = f"new.{table}_id, new.name, new.keywords"
+    old_row = f"'delete', old.{table}_id, old.name, old.keywords"
+
+    return [
+        f"CREATE VIRTUAL TABLE {index} USING fts5("
+        f"name, keywords, content = '{table}', content_rowid = '{table}_id');",
+
+        f"CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {index} (rowid, name, keywords) VALUES ({new_row}); END;",
+
+        f"CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {index} ({index}, rowid, name, keywords) VALUES ({old_row}); END;",
+
+        f"CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {index} ({index}, rowid, name, keywords) VALUES ({old_row}); "
+        f"INSERT INTO {index} (rowid, name, keywords) VALUES ({new_row}); END;",
+
+        f"INSERT INTO {index} ({index}) VALUES ('rebuild');"
+    ]
+
+
+def create_full_text_indexes(connection):
+    """Creates whichever full-text indexes don't exist yet, doing nothing if this
+    build of SQLite doesn't include FTS5, since full-text search is optional.  If
+    the connection's full-text search is turned off, the indexes are dropped
+    instead, along with their triggers, so that saves no longer pay for them."""
+    existing = {
+        name for name, in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table';")}
+
+    if not connection.full_text_search:
+        for table in FULL_TEXT_SEARCH_TABLES:
+            if _index_name(table) in existing:
+                _drop_full_text_index(connection, table)
+
+        return
+
+    if not is_full_text_search_available(connection):
+        return
+
+    for table in FULL_TEXT_SEARCH_TABLES:
+        if _index_name(table) not in existing:
+            for statement in _full_text_index_statements(table):
+                connection.execute(statement)
+
+
+def _drop_full_text_index(connection, table):
+    """Drops a table's full-text index, along with the triggers that keep it in sync"""
+    index = _index_name(table)
+
+    for trigger in ('insert', 'delete', 'update'):
+        connection.execute(f'DROP TRIGGER IF EXISTS {index}_{trigger};')
+
+    connection.execute(f'DROP TABLE {index};')
+
+
+def is_full_text_search_available(connection):
+    """Returns True if the connection's SQLite library includes FTS5"""
+    try:
+        connection.execute('CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(text);')
+        connection.execute('DROP TABLE temp.fts5_probe;')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+MIGRATIONS.append(create_full_text_indexes)
+
+
+def make_full_text_query(text):
+    """Turns what the user typed into an FTS5 query that matches every word in it,
+    treating the last word as a prefix, since it may not have been finished yet.
+    Each word is quoted so that FTS5 doesn't interpret its punctuation."""
+    words = ['"' + word.replace('"', '""') + '"' for word in text.split()]
+
+    if words:
+        words[-1] += '*'
+
+    return ' '.join(words)
+
+
+def _full_text_search_statement(tables):
+    """Returns the statement that searches the given tables' full-text indexes,
+    merging their matches from best to worst"""
+    selects = ' UNION ALL '.join(
+        f"SELECT '{table}', rowid, name, bm25({_index_name(table)}) AS rank "
+        f"FROM {_index_name(table)} WHERE {_index_name(table)} MATCH :query"
+        for table in tables)
+
+    return f'{selects} ORDER BY rank;'
+
+
+@dispatcher.register(StartFullTextSearchEvent, errors_as_events = True)
+def process_start_full_text_search_event(event, connection):
+    """This function starts a full-text search, streaming its ranked results"""
+    if not connection.full_text_search:
+        raise RuntimeError('Full-text search is turned off')
+    # Defining parameters
+    query = make_full_text_query(event._text)
+    tables = tuple(table for table in FULL_TEXT_SEARCH_TABLES if table in event._tables)
+    if not query or not tables:
+        return
+    cursor = connection.cursor()
+    cursor.row_factory = _make_result
+    try:
+        cursor.execute(_full_text_search_statement(tables), {'query': query})
+        # Streaming results as each batch of rows is fetched, one event per batch
+        for results in fetch_batches(cursor, connection.fetch_batch_size, event._limit):
+            yield FullTextSearchResultsBatchEvent(results)
+    finally:
+        cursor.close()
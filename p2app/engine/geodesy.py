@@ -0,0 +1,92 @@
+"""This module is in charge of measuring distances over the earth's surface"""
+
+
+import math
+
+# NumPy is optional: when it's installed, distances are computed for a whole batch
+# of points at once, and otherwise one point at a time
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# The mean radius of the earth
+EARTH_RADIUS_NM = 3440.065
+
+# Half of the earth's circumference, which no two points are farther apart than
+MAX_DISTANCE_NM = math.pi * EARTH_RADIUS_NM
+
+
+def haversine_nm(latitude_deg, longitude_deg, latitudes_deg, longitudes_deg):
+    """Returns a list of the great-circle distances, in nautical miles, from one
+    point to each of the points whose latitudes and longitudes are given"""
+    if numpy is not None:
+        return _numpy_haversine_nm(
+            latitude_deg, longitude_deg, latitudes_deg, longitudes_deg).tolist()
+
+    latitude = math.radians(latitude_deg)
+    longitude = math.radians(longitude_deg)
+    cos_latitude = math.cos(latitude)
+
+    distances = []
+
+    for other_latitude_deg, other_longitude_deg in zip(latitudes_deg, longitudes_deg):
+        other_latitude = math.radians(other_latitude_deg)
+        a = math.sin((other_latitude - latitude) / 2) ** 2 + \
+            cos_latitude * math.cos(other_latitude) * \
+            math.sin((math.radians(other_longitude_deg) - longitude) / 2) ** 2
+        distances.append(2 * EARTH_RADIUS_NM * math.asin(min(1.0, math.sqrt(a))))
+
+    return distances
+
+
+def _numpy_haversine_nm(latitude_deg, longitude_deg, latitudes_deg, longitudes_deg):
+    """Returns an array of the same distances as haversine_nm, computed all at once"""
+    latitude = math.radians(latitude_deg)
+    latitudes = numpy.radians(numpy.asarray(latitudes_deg, dtype = numpy.float64))
+    longitudes = numpy.radians(numpy.asarray(longitudes_deg, dtype = numpy.float64))
+
+    a = numpy.sin((latitudes - latitude) / 2) ** 2 + \
+        math.cos(latitude) * numpy.cos(latitudes) * \
+        numpy.sin((longitudes - math.radians(longitude_deg)) / 2) ** 2
+
+    return 2 * EARTH_RADIUS_NM * numpy.arcsin(numpy.minimum(1.0, numpy.sqrt(a)))
+
+
+def bounding_box(latitude_deg, longitude_deg, distance_nm):
+    """Returns the (min_latitude_deg, min_longitude_deg, max_latitude_deg,
+    max_longitude_deg) of the smallest box that contains every point within the
+    given distance of a point.  A box that crosses the antimeridian has a
+    min_longitude_deg greater than its max_longitude_deg."""
+    angle = distance_nm / EARTH_RADIUS_NM
+    min_latitude_deg = latitude_deg - math.degrees(angle)
+    max_latitude_deg = latitude_deg + math.degrees(angle)
+
+    # A box that reaches a pole has to go all the way around it
+    if min_latitude_deg <= -90 or max_latitude_deg >= 90 or angle >= math.pi / 2:
+        return max(min_latitude_deg, -90.0), -180.0, min(max_latitude_deg, 90.0), 180.0
+
+    longitude_delta_deg = math.degrees(
+        math.asin(min(1.0, math.sin(angle) / math.cos(math.radians(latitude_deg)))))
+
+    min_longitude_deg = _wrap_longitude(longitude_deg - longitude_delta_deg)
+    max_longitude_deg = _wrap_longitude(longitude_deg + longitude_delta_deg)
+    return min_latitude_deg, min_longitude_deg, max_latitude_deg, max_longitude_deg
+
+
+def split_bounding_box(min_latitude_deg, min_longitude_deg, max_latitude_deg, max_longitude_deg):
+    """Returns a list of the boxes, never crossing the antimeridian, that together
+    cover the given box"""
+    if min_longitude_deg <= max_longitude_deg:
+        return [(min_latitude_deg, min_longitude_deg, max_latitude_deg, max_longitude_deg)]
+
+    return [
+        (min_latitude_deg, min_longitude_deg, max_latitude_deg, 180.0),
+        (min_latitude_deg, -180.0, max_latitude_deg, max_longitude_deg)
+    ]
+
+
+def _wrap_longitude(longitude_deg):
+    """Returns the equivalent longitude between -180 and 180 degrees"""
+    return (longitude_deg + 180) % 360 - 180
@@ -0,0 +1,156 @@
+"""This module is in charge of caching the records that the engine loads.
+
+Regions and airports are loaded one at a time as the user moves between them,
+often going back to the same ones, so each connection keeps the ones it has
+loaded in a bounded LRUCache per table.  Saving a record invalidates it, so the
+next load of it goes back to the database."""
+
+
+import sys
+import time
+from collections import OrderedDict, namedtuple
+from p2app.engine.diagnostics import STATISTICS_REPORTERS
+
+
+# How many records each table's cache holds at most, how many bytes they may take
+# up at most (None meaning there's no limit), and how many seconds they stay in
+# the cache at most (None meaning they stay until they're evicted or invalidated)
+LoadCacheSettings = namedtuple(
+    'LoadCacheSettings', ['max_entries', 'max_bytes', 'ttl_seconds'])
+
+DEFAULT_LOAD_CACHE_SETTINGS = LoadCacheSettings(
+    max_entries = 4096, max_bytes = 16 * 1024 * 1024, ttl_seconds = None)
+
+
+class LRUCache:
+    """A cache that holds at most a given number of values, taking up at most a
+    given number of bytes, evicting the least recently used first"""
+
+    def __init__(
+            self, max_entries, max_bytes = None, ttl_seconds = None, clock = time.monotonic):
+        """Initializes an empty cache with the given limits, telling time with clock"""
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+
+    def get(self, key):
+        """Returns the value cached for a key, or None if there isn't one, counting
+        a hit or a miss"""
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, size, expires = entry
+
+        if expires is not None and self._clock() >= expires:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+
+    def put(self, key, value):
+        """Caches a value for a key, replacing any value already cached for it, then
+        evicts the least recently used values until the cache is within its limits"""
+        self.invalidate(key)
+
+        size = estimate_size(value)
+
+        # A value that could never fit isn't cached at all
+        if self._max_entries < 1 or (self._max_bytes is not None and size > self._max_bytes):
+            return
+
+        expires = None if self._ttl_seconds is None else self._clock() + self._ttl_seconds
+        self._entries[key] = (value, size, expires)
+        self._bytes += size
+
+        while len(self._entries) > self._max_entries or \
+                (self._max_bytes is not None and self._bytes > self._max_bytes):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+
+    def invalidate(self, key):
+        """Removes the value cached for a key, if there is one"""
+        if key in self._entries:
+            self._remove(key)
+
+
+    def clear(self):
+        """Removes every cached value"""
+        self._entries.clear()
+        self._bytes = 0
+
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+    def statistics(self):
+        """Returns a dictionary of how many values are cached and the bytes they take
+        up, and how many hits, misses, evictions and expirations there have been"""
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def estimate_size(value):
+    """Returns roughly how many bytes a value takes up, counting the tuples and
+    lists within it along with everything they contain"""
+    size = sys.getsizeof(value)
+
+    if isinstance(value, (tuple, list)):
+        size += sum(estimate_size(item) for item in value)
+
+    return size
+
+
+def load_cache(connection, table):
+    """Returns a connection's LRUCache of the records loaded from a table, creating
+    it with the connection's load cache settings the first time it's needed"""
+    if connection.load_caches is None:
+        connection.load_caches = {}
+
+    cache = connection.load_caches.get(table)
+
+    if cache is None:
+        cache = connection.load_caches[table] = LRUCache(*connection.load_cache_settings)
+
+    return cache
+
+
+def report_load_cache_statistics(connection):
+    """Returns the statistics of each of a connection's load caches"""
+    caches = getattr(connection, 'load_caches', None) or {}
+
+    return {
+        f'{table} load cache {name}': value
+        for table, cache in caches.items() for name, value in cache.statistics().items()}
+
+
+STATISTICS_REPORTERS.append(report_load_cache_statistics)
@@ -0,0 +1,366 @@
+"""This module is in charge of searching for records by their location"""
+
+
+import sqlite3
+from p2app.events.locations import LocationSearchResult, StartNearestLocationSearchEvent,\
+    StartBoundingBoxSearchEvent, LocationSearchResultsBatchEvent, LOCATION_SEARCH_TABLES
+from p2app.engine.database import fetch_batches
+from p2app.engine.dispatch import dispatcher
+from p2app.engine.geodesy import haversine_nm, bounding_box, split_bounding_box,\
+    MAX_DISTANCE_NM
+from p2app.engine.migrations import MIGRATIONS
+
+
+# The expression for one coordinate of a runway's end, which is its low end if
+# both of that end's coordinates are known, and its high end otherwise
+_RUNWAY_END = \
+    'CASE WHEN {{row}}{0}_latitude_deg IS NOT NULL AND {{row}}{0}_longitude_deg IS NOT NULL ' \
+    'THEN {{row}}{0}_{2} ELSE {{row}}{1}_{2} END'
+
+# For each table whose records have a location: the columns that identify its
+# records, the expression that names them, and the expressions for the latitude
+# and longitude of both of their ends.  Only runways have two different ends.
+# Every expression is written in terms of {row}, the prefix of its columns.
+_LOCATION_SOURCES = {
+    'airport': (
+        ('airport_id',), '{row}name',
+        ('{row}latitude_deg', '{row}longitude_deg'), ('{row}latitude_deg', '{row}longitude_deg')),
+    'runway': (
+        ('runway_id',),
+        "(SELECT airport_ident FROM airport WHERE airport_id = {row}airport_id) || ' ' || "
+        "coalesce({row}le_ident, '?') || '/' || coalesce({row}he_ident, '?')",
+        (_RUNWAY_END.format('le', 'he', 'latitude_deg'),
+         _RUNWAY_END.format('le', 'he', 'longitude_deg')),
+        (_RUNWAY_END.format('he', 'le', 'latitude_deg'),
+         _RUNWAY_END.format('he', 'le', 'longitude_deg'))),
+    'navigation_aid': (
+        ('navigation_aid_id', 'filename'), "{row}name || ' (' || {row}ident || ')'",
+        ('{row}latitude_deg', '{row}longitude_deg'), ('{row}latitude_deg', '{row}longitude_deg'))
+}
+
+# How many nautical miles a nearest search first looks within, doubling the
+# distance until it has found enough records
+_INITIAL_SEARCH_DISTANCE_NM = 25.0
+
+
+def _index_name(table):
+    """Returns the name of the R*Tree that indexes a table's locations"""
+    return f'{table}_location'
+
+
+def _location_expressions(table, row):
+    """Returns a table's name expression and the four expressions for the latitudes
+    and longitudes of its ends, with their columns prefixed by row"""
+    _, name, (latitude_a, longitude_a), (latitude_b, longitude_b) = _LOCATION_SOURCES[table]
+    expressions = [name, latitude_a, longitude_a, latitude_b, longitude_b]
+    return tuple(expression.format(row = row) for expression in expressions)
+
+
+def _key_columns(table):
+    """Returns the columns that identify a table's records"""
+    return _LOCATION_SOURCES[table][0]
+
+
+def _index_key(table, row):
+    """Returns the expression for the ID of a record's entry in the table's R*Tree.
+    A table whose records are identified by more than one column has them keyed on
+    its rowid instead, with those columns stored alongside as auxiliary columns."""
+    key_columns = _key_columns(table)
+    return f'{row}{key_columns[0]}' if len(key_columns) == 1 else f'{row}rowid'
+
+
+def _auxiliary_columns(table):
+    """Returns the key columns that a table's R*Tree stores alongside each entry"""
+    key_columns = _key_columns(table)
+    return () if len(key_columns) == 1 else key_columns
+
+
+def _insert_location_statement(table, row):
+    """Returns the statement that inserts the bounding boxes of a table's located
+    records into its R*Tree, taking their columns from the given row prefix"""
+    _, latitude_a, longitude_a, latitude_b, longitude_b = _location_expressions(table, row)
+    auxiliary = ''.join(f', {row}{column}' for column in _auxiliary_columns(table))
+    source = '' if row else f' FROM {table}'
+
+    return \
+        f'INSERT INTO {_index_name(table)} SELECT {_index_key(table, row)}, ' \
+        f'min({latitude_a}, {latitude_b}), max({latitude_a}, {latitude_b}), ' \
+        f'min({longitude_a}, {longitude_b}), max({longitude_a}, {longitude_b}){auxiliary}' \
+        f'{source} ' \
+        f'WHERE {latitude_a} IS NOT NULL AND {longitude_a} IS NOT NULL ' \
+        f'AND {latitude_b} IS NOT NULL AND {longitude_b} IS NOT NULL;'
+
+
+def _location_index_statements(table):
+    """Returns the statements that create the R*Tree over a table's locations,
+    along with the triggers that keep it in sync with the table"""
+    index = _index_name(table)
+    old_key = _index_key(table, 'old.')
+    auxiliary = ''.join(f', +{column}' for column in _auxiliary_columns(table))
+
+    return [
+        f'CREATE VIRTUAL TABLE {index} USING rtree('
+        f'id, min_latitude_deg, max_latitude_deg, min_longitude_deg, max_longitude_deg'
+        f'{auxiliary});',
+
+        f'CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table} BEGIN '
+        f"{_insert_location_statement(table, 'new.')} END;",
+
+        f'CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table} BEGIN '
+        f'DELETE FROM {index} WHERE id = {old_key}; END;',
+
+        f'CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE ON {table} BEGIN '
+        f'DELETE FROM {index} WHERE id = {old_key}; '
+        f"{_insert_location_statement(table, 'new.')} END;",
+
+        _insert_location_statement(table, '')
+    ]
+
+
+def create_location_indexes(connection):
+    """Creates whichever R*Trees over the tables' locations don't exist yet, and
+    rebuilds those keyed on rowids whose rowids have changed since.  If this build
+    of SQLite doesn't include R*Trees, ordinary indexes on latitude are created
+    instead, which narrow a search down to a band of latitudes."""
+    if not is_rtree_available(connection):
+        connection.execute(
+            'CREATE INDEX IF NOT EXISTS airport_latitude ON airport (latitude_deg);')
+        connection.execute(
+            'CREATE INDEX IF NOT EXISTS navigation_aid_latitude ON navigation_aid (latitude_deg);')
+        return
+
+    existing = _existing_tables(connection)
+
+    for table in LOCATION_SEARCH_TABLES:
+        index = _index_name(table)
+
+        if index in existing and not _has_auxiliary_columns(connection, table):
+            _drop_location_index(connection, table)
+            existing.discard(index)
+
+        if index not in existing:
+            for statement in _location_index_statements(table):
+                connection.execute(statement)
+        elif _auxiliary_columns(table) and not _is_rowid_keyed_index_current(connection, table):
+            connection.execute(f'DELETE FROM {index};')
+            connection.execute(_insert_location_statement(table, ''))
+
+
+def _has_auxiliary_columns(connection, table):
+    """Returns True if a table's R*Tree stores every auxiliary column it should,
+    which those created by earlier versions of the engine didn't"""
+    columns = {
+        name for _, name, *_ in connection.execute(
+            f'PRAGMA table_info({_index_name(table)});')}
+
+    return columns.issuperset(_auxiliary_columns(table))
+
+
+def _drop_location_index(connection, table):
+    """Drops a table's R*Tree, along with the triggers that keep it in sync"""
+    index = _index_name(table)
+
+    for trigger in ('insert', 'delete', 'update'):
+        connection.execute(f'DROP TRIGGER IF EXISTS {index}_{trigger};')
+
+    connection.execute(f'DROP TABLE {index};')
+
+
+def _is_rowid_keyed_index_current(connection, table):
+    """Returns True if every entry in an R*Tree keyed on rowids still belongs to the
+    row with that rowid.  A VACUUM can renumber the rowids of a table with no
+    INTEGER PRIMARY KEY, after which the triggers would change the wrong entries."""
+    index = _index_name(table)
+    mismatches = ' OR '.join(
+        f'{table}.{column} IS NOT {index}.{column}' for column in _auxiliary_columns(table))
+
+    (is_stale,), = connection.execute(
+        f'SELECT EXISTS (SELECT 1 FROM {index} LEFT JOIN {table} ON {table}.rowid = {index}.id '
+        f'WHERE {mismatches});')
+
+    return not is_stale
+
+
+def is_rtree_available(connection):
+    """Returns True if the connection's SQLite library includes R*Trees"""
+    try:
+        connection.execute('CREATE VIRTUAL TABLE temp.rtree_probe USING rtree(id, x0, x1);')
+        connection.execute('DROP TABLE temp.rtree_probe;')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _existing_tables(connection):
+    """Returns the set of the names of the tables in the database"""
+    return {
+        name for name, in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table';")}
+
+
+MIGRATIONS.append(create_location_indexes)
+
+
+def _bounding_box_statement(table, indexed):
+    """Returns the statement that finds the records of a table within a bounding
+    box that doesn't cross the antimeridian, using its R*Tree if it's indexed, and
+    otherwise comparing the coordinates of each of its ends directly"""
+    name, latitude_a, longitude_a, latitude_b, longitude_b = \
+        _location_expressions(table, f'{table}.')
+    key_columns = _key_columns(table)
+    record_id = f'{table}.{key_columns[0]}'
+    filename = f'{table}.{key_columns[1]}' if len(key_columns) > 1 else 'NULL'
+    columns = \
+        f"'{table}', {record_id}, {filename}, {name}, " \
+        f'{latitude_a}, {longitude_a}, {latitude_b}, {longitude_b}'
+
+    if indexed:
+        # An R*Tree keyed on rowids is joined by the key columns it stores instead,
+        # so that its results are right even if the rowids have been renumbered
+        index = _index_name(table)
+
+        if _auxiliary_columns(table):
+            join = ' AND '.join(
+                f'{table}.{column} = {index}.{column}' for column in _auxiliary_columns(table))
+        else:
+            join = f'{_index_key(table, table + ".")} = {index}.id'
+
+        return \
+            f'SELECT {columns} FROM {index} JOIN {table} ON {join} ' \
+            f'WHERE {index}.max_latitude_deg >= :min_latitude ' \
+            f'AND {index}.min_latitude_deg <= :max_latitude ' \
+            f'AND {index}.max_longitude_deg >= :min_longitude ' \
+            f'AND {index}.min_longitude_deg <= :max_longitude;'
+
+    ends = dict.fromkeys([(latitude_a, longitude_a), (latitude_b, longitude_b)])
+    conditions = ' OR '.join(
+        f'({latitude} BETWEEN :min_latitude AND :max_latitude '
+        f'AND {longitude} BETWEEN :min_longitude AND :max_longitude)'
+        for latitude, longitude in ends)
+
+    return f'SELECT {columns} FROM {table} WHERE {conditions};'
+
+
+def _find_candidates(connection, table, box):
+    """A generator function that yields, in batches, the (table, record ID,
+    filename, name, and both ends' latitudes and longitudes) of every record that could be within a
+    bounding box.  Since an R*Tree stores its boxes with less precision than the
+    table, some may be just outside of it."""
+    statement = _bounding_box_statement(table, _index_name(table) in _existing_tables(connection))
+
+    for min_latitude, min_longitude, max_latitude, max_longitude in split_bounding_box(*box):
+        cursor = connection.execute(statement, {
+            'min_latitude': min_latitude, 'min_longitude': min_longitude,
+            'max_latitude': max_latitude, 'max_longitude': max_longitude})
+
+        try:
+            yield from fetch_batches(cursor, connection.fetch_batch_size)
+        finally:
+            cursor.close()
+
+
+def _is_within(latitude, longitude, box):
+    """Returns True if a point is within a bounding box, which may cross the antimeridian"""
+    min_latitude, min_longitude, max_latitude, max_longitude = box
+
+    if not min_latitude <= latitude <= max_latitude:
+        return False
+    elif min_longitude <= max_longitude:
+        return min_longitude <= longitude <= max_longitude
+    else:
+        return longitude >= min_longitude or longitude <= max_longitude
+
+
+def _measure(latitude, longitude, candidates):
+    """Returns LocationSearchResults for the candidates, measuring the distance
+    from a point to the nearer end of each, all of one batch's ends at once"""
+    distances_a = haversine_nm(
+        latitude, longitude, [row[4] for row in candidates], [row[5] for row in candidates])
+    distances_b = haversine_nm(
+        latitude, longitude, [row[6] for row in candidates], [row[7] for row in candidates])
+
+    results = []
+
+    for row, distance_a, distance_b in zip(candidates, distances_a, distances_b):
+        table, record_id, filename, name, latitude_a, longitude_a, latitude_b, longitude_b = row
+
+        if distance_a <= distance_b:
+            results.append(LocationSearchResult(
+                table, record_id, name, latitude_a, longitude_a, distance_a, filename))
+        else:
+            results.append(LocationSearchResult(
+                table, record_id, name, latitude_b, longitude_b, distance_b, filename))
+
+    return results
+
+
+def find_nearest(connection, table, latitude, longitude, count, max_distance = None):
+    """Returns a list of LocationSearchResults for the count records of a table
+    nearest to a point, from nearest to farthest, leaving out those farther than
+    max_distance nautical miles.  A count of None means there's no limit on how
+    many are found, in which case there should be a max_distance.
+
+    The search looks within a bounding box around the point, doubling its size
+    until the box contains enough records, then measures each one's distance."""
+    max_distance = MAX_DISTANCE_NM if max_distance is None else min(max_distance, MAX_DISTANCE_NM)
+    distance = max_distance if count is None else min(_INITIAL_SEARCH_DISTANCE_NM, max_distance)
+
+    while True:
+        results = {}
+
+        for candidates in _find_candidates(
+                connection, table, bounding_box(latitude, longitude, distance)):
+            for result in _measure(latitude, longitude, candidates):
+                if result.distance_nm <= distance:
+                    results[result.record_id, result.filename] = result
+
+        # Records found farther away than the box's distance may have nearer
+        # ones outside of the box, so they aren't counted
+        if (count is not None and len(results) >= count) or distance >= max_distance:
+            return sorted(results.values(), key = lambda result: result.distance_nm)[:count]
+
+        distance = min(distance * 2, max_distance)
+
+
+@dispatcher.register(StartNearestLocationSearchEvent, errors_as_events = True)
+def process_start_nearest_location_search_event(event, connection):
+    """This function finds the records nearest to a point, from nearest to farthest"""
+    # Defining parameters
+    if event._table not in LOCATION_SEARCH_TABLES:
+        return
+    results = find_nearest(
+        connection, event._table, event._latitude_deg, event._longitude_deg,
+        event._count, event._max_distance_nm)
+    # Delivering results a batch at a time, as the other searches do
+    batch_size = connection.fetch_batch_size
+    for start in range(0, len(results), batch_size):
+        yield LocationSearchResultsBatchEvent(results[start:start + batch_size])
+
+
+@dispatcher.register(StartBoundingBoxSearchEvent, errors_as_events = True)
+def process_start_bounding_box_search_event(event, connection):
+    """This function finds the records within a bounding box, streaming its results"""
+    # Defining parameters
+    if event._table not in LOCATION_SEARCH_TABLES:
+        return
+    box = (event._min_latitude_deg, event._min_longitude_deg,
+           event._max_latitude_deg, event._max_longitude_deg)
+    remaining = event._limit
+    # Streaming the records that are within the box, with either end inside it
+    for candidates in _find_candidates(connection, event._table, box):
+        results = []
+        for table, record_id, filename, name, *ends in candidates:
+            latitude_a, longitude_a, latitude_b, longitude_b = ends
+            if _is_within(latitude_a, longitude_a, box):
+                results.append(LocationSearchResult(
+                    table, record_id, name, latitude_a, longitude_a, None, filename))
+            elif _is_within(latitude_b, longitude_b, box):
+                results.append(LocationSearchResult(
+                    table, record_id, name, latitude_b, longitude_b, None, filename))
+        if remaining is not None:
+            results = results[:remaining]
+            remaining -= len(results)
+        if results:
+            yield LocationSearchResultsBatchEvent(results)
+        if remaining == 0:
+            return
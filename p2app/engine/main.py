@@ -8,25 +8,32 @@
 # This is the outermost layer of the part of the program that you'll need to build,
 # which means that YOU WILL DEFINITELY NEED TO MAKE CHANGES TO THIS FILE.
 
-import sqlite3
-
 # p2app.event modules
 
 from p2app.events.app import QuitInitiatedEvent, EndApplicationEvent, ErrorEvent
 from p2app.events.database import OpenDatabaseEvent, CloseDatabaseEvent, DatabaseClosedEvent
-from p2app.events.continents import StartContinentSearchEvent, LoadContinentEvent, SaveNewContinentEvent,SaveContinentEvent
-from p2app.events.countries import StartCountrySearchEvent, LoadCountryEvent, SaveCountryEvent, SaveNewCountryEvent
-from p2app.events.regions import StartRegionSearchEvent, LoadRegionEvent, SaveNewRegionEvent, SaveRegionEvent
 
 # p2app.engine modules
 
-from p2app.engine.database import process_open_database_event, is_sqlite_database
-from p2app.engine.continents import process_start_continent_search_event,\
-    process_load_continent_event, process_save_continent_event
-from p2app.engine.countries import process_start_country_search_event, process_load_country_event,\
-    process_save_country_event
-from p2app.engine.regions import process_start_region_search_event, process_load_region_event,\
-    process_save_region_event
+from p2app.engine.batches import group_saves, seconds_until_group_commit, commit_group
+from p2app.engine.dispatch import EventDispatcher, dispatcher
+from p2app.engine.database import ConnectionManager, DEFAULT_FETCH_BATCH_SIZE,\
+    process_open_database_event
+from p2app.engine.load_cache import DEFAULT_LOAD_CACHE_SETTINGS
+from p2app.engine.statements import DEFAULT_CACHED_STATEMENTS
+
+# The entity modules register their handlers into the dispatcher when imported
+import p2app.engine.airports
+import p2app.engine.batches
+import p2app.engine.continents
+import p2app.engine.countries
+import p2app.engine.diagnostics
+import p2app.engine.distances
+import p2app.engine.exporting
+import p2app.engine.fulltext
+import p2app.engine.locations
+import p2app.engine.navigation_aids
+import p2app.engine.regions
 
 
 class Engine:
@@ -36,69 +43,89 @@ class Engine:
     unaware of any details of how the engine is implemented.
     """
 
-    def __init__(self):
-        """Initializes the engine"""
-        pass
+    def __init__(
+            self, cached_statements = DEFAULT_CACHED_STATEMENTS,
+            fetch_batch_size = DEFAULT_FETCH_BATCH_SIZE,
+            load_cache_settings = DEFAULT_LOAD_CACHE_SETTINGS, group_commit_seconds = None,
+            full_text_search = True):
+        """Initializes the engine, whose database connection will keep the given
+        number of compiled statements cached, fetch search results the given number
+        of rows at a time, cache the regions and airports it loads within the limits
+        of the given LoadCacheSettings, commit the saves that arrive within the
+        given number of seconds of each other together, if it's not None, and keep
+        the full-text indexes that full-text searches need, if full_text_search is
+        True"""
+        self._database = ConnectionManager(
+            cached_statements, fetch_batch_size, load_cache_settings, group_commit_seconds,
+            full_text_search)
+
+        # Application-level events are handled by the engine itself, while the
+        # entity events are handled by the functions registered in the engine modules
+        self._dispatcher = EventDispatcher()
+        self._dispatcher.update(dispatcher)
+        self._dispatcher.add(QuitInitiatedEvent, self._process_quit_initiated_event)
+        self._dispatcher.add(OpenDatabaseEvent, self._process_open_database_event)
+        self._dispatcher.add(CloseDatabaseEvent, self._process_close_database_event)
+
 
     def process_event(self, event):
         """A generator function that processes one event sent from the user interface,
         yielding zero or more events in response."""
+        handler = self._dispatcher.lookup(type(event))
+        connection = self._database.connection()
 
-        # Application-Level Events
-        if isinstance(event, QuitInitiatedEvent):
-            yield EndApplicationEvent()
-        elif isinstance(event, OpenDatabaseEvent):
-            # Making connection to database global
-            yield from process_open_database_event(event)
-            try:
-                global connection
-                connection = get_connection(event)
-            except UnboundLocalError:
-                pass
-        elif isinstance(event, CloseDatabaseEvent):
-            yield DatabaseClosedEvent()
-
-        # Continent-Related Events
-        elif isinstance(event, StartContinentSearchEvent):
-            yield from process_start_continent_search_event(event, connection)
-        elif isinstance(event, LoadContinentEvent):
-            try:
-                yield from process_load_continent_event(event, connection)
-            except Exception as e:
-                yield ErrorEvent(e)
-        elif isinstance(event, (SaveNewContinentEvent, SaveContinentEvent)):
-            yield from process_save_continent_event(event, connection)
-
-        # Country-related Events
-        elif isinstance(event, StartCountrySearchEvent):
-            yield from process_start_country_search_event(event, connection)
-        elif isinstance(event, LoadCountryEvent):
-            try:
-                yield from process_load_country_event(event, connection)
-            except Exception as e:
-                yield ErrorEvent(e)
-        elif isinstance(event, (SaveNewCountryEvent, SaveCountryEvent)):
-            yield from process_save_country_event(event, connection)
-
-        # Region-related Events
-        elif isinstance(event, StartRegionSearchEvent):
-            yield from process_start_region_search_event(event, connection)
-        elif isinstance(event, LoadRegionEvent):
-            try:
-                yield from process_load_region_event(event, connection)
-            except Exception as e:
-                yield ErrorEvent(e)
-        elif isinstance(event, (SaveNewRegionEvent, SaveRegionEvent)):
-            yield from process_save_region_event(event, connection)
-        else:
+        if handler is None:
             yield ErrorEvent('ErrorEvent')
+        else:
+            if connection is not None:
+                yield from group_saves(event, connection)
+
+            yield from handler(event, connection)
+
+
+    def seconds_until_commit(self):
+        """Returns how many seconds are left before the saves grouped so far are due
+        to be committed, or None if there aren't any"""
+        connection = self._database.connection()
+        return None if connection is None else seconds_until_group_commit(connection)
+
+
+    def commit_pending_saves(self):
+        """Commits the saves grouped so far, without waiting for their window to pass"""
+        connection = self._database.connection()
+
+        if connection is not None:
+            commit_group(connection)
+
+
+    def interrupt(self):
+        """Interrupts the query the engine is running, if there is one, which makes it
+        fail with an sqlite3.OperationalError.  Unlike the engine's other methods, this
+        one may be called from any thread."""
+        connection = self._database.connection()
+
+        if connection is not None:
+            connection.interrupt()
+
+
+    def database(self):
+        """Returns the connection manager that owns the engine's database connection"""
+        return self._database
+
+
+    def _process_quit_initiated_event(self, event, connection):
+        """Closes the database and ends the application"""
+        self._database.close()
+        yield EndApplicationEvent()
+
+
+    def _process_open_database_event(self, event, connection):
+        """Opens the database, keeping its connection for the events that follow"""
+        yield from process_open_database_event(event, self._database)
+
 
+    def _process_close_database_event(self, event, connection):
+        """Closes the database"""
+        self._database.close()
+        yield DatabaseClosedEvent()
 
-def get_connection(event):
-    database_path = event.path()
-    # Checks if it's a database file
-    db_checker = is_sqlite_database(database_path)
-    if db_checker:
-        # Allowing only one connection at a time and turning on data integrity
-        connection = sqlite3.connect(database_path, isolation_level = None)
-    return connection
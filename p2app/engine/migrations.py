@@ -0,0 +1,50 @@
+"""This module is in charge of the changes the engine makes to a database's schema"""
+
+
+import sqlite3
+
+
+# The migrations that bring a database's schema up to what the engine expects,
+# each either a statement or a function that's called with the connection.  Every
+# migration must be safe to run again on a database it has already changed.  The
+# engine modules append the migrations that their own features depend on.
+MIGRATIONS = [
+    # Exact and prefix searches by name or code
+    'CREATE INDEX IF NOT EXISTS continent_name ON continent (name);',
+    'CREATE INDEX IF NOT EXISTS country_name ON country (name);',
+    'CREATE INDEX IF NOT EXISTS region_name ON region (name);',
+    'CREATE INDEX IF NOT EXISTS region_local_code ON region (local_code);',
+
+    # Case-insensitive exact and prefix searches
+    'CREATE INDEX IF NOT EXISTS continent_name_nocase ON continent (name COLLATE NOCASE);',
+    'CREATE INDEX IF NOT EXISTS country_name_nocase ON country (name COLLATE NOCASE);',
+    'CREATE INDEX IF NOT EXISTS country_code_nocase ON country (country_code COLLATE NOCASE);',
+    'CREATE INDEX IF NOT EXISTS region_name_nocase ON region (name COLLATE NOCASE);',
+    'CREATE INDEX IF NOT EXISTS region_code_nocase ON region (region_code COLLATE NOCASE);',
+    'CREATE INDEX IF NOT EXISTS region_local_code_nocase ON region (local_code COLLATE NOCASE);'
+]
+
+
+def apply_migrations(connection):
+    """Runs every migration in one transaction, returning True if they were applied,
+    or False if the database couldn't be changed (e.g., because it's read-only), in
+    which case everything still works, only without the help of the new indexes"""
+    try:
+        connection.execute('BEGIN;')
+        run_migrations(connection)
+        connection.execute('COMMIT;')
+        return True
+    except sqlite3.OperationalError:
+        if connection.in_transaction:
+            connection.execute('ROLLBACK;')
+
+        return False
+
+
+def run_migrations(connection):
+    """Runs every migration within whatever transaction the connection is in"""
+    for migration in MIGRATIONS:
+        if callable(migration):
+            migration(connection)
+        else:
+            connection.execute(migration)
@@ -0,0 +1,157 @@
+"""This module is in charge of handling navigation aid functions"""
+
+
+import sqlite3
+from p2app.events.navigation_aids import NavigationAid, NavigationAidSummary,\
+    StartNavigationAidSearchEvent, NavigationAidSearchResultsBatchEvent, LoadNavigationAidEvent,\
+    NavigationAidLoadedEvent, SaveNewNavigationAidEvent, SaveNavigationAidEvent,\
+    NavigationAidSavedEvent, SaveNavigationAidFailedEvent
+from p2app.engine.database import fetch_batches, record_factory
+from p2app.engine.dispatch import dispatcher
+from p2app.engine.migrations import MIGRATIONS
+from p2app.engine.statements import make_search
+
+
+_make_navigation_aid = record_factory(NavigationAid)
+_make_navigation_aid_summary = record_factory(NavigationAidSummary)
+
+# The columns of a NavigationAidSummary, which the covering indexes below include
+_SUMMARY_COLUMNS = ', '.join(NavigationAidSummary._fields)
+
+_INSERT_NAVIGATION_AID = \
+    f'INSERT INTO navigation_aid ({", ".join(NavigationAid._fields)}) ' \
+    f'VALUES ({", ".join("?" * len(NavigationAid._fields))});'
+
+_UPDATE_NAVIGATION_AID = \
+    f'UPDATE navigation_aid ' \
+    f'SET {", ".join(f"{field} = ?" for field in NavigationAid._fields[2:])} ' \
+    f'WHERE navigation_aid_id = ? AND filename = ?;'
+
+
+def create_navigation_aid_key(connection):
+    """Creates a unique index on the navigation aids' composite key, so that no two
+    can be saved with the same one.  If the table already holds navigation aids
+    with the same key, an ordinary index is created instead, so that loading by
+    the key is still an index lookup."""
+    (exists,), = connection.execute(
+        "SELECT EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'index' "
+        "AND name IN ('navigation_aid_key', 'navigation_aid_key_nonunique'));")
+
+    if exists:
+        return
+
+    (duplicated,), = connection.execute(
+        'SELECT EXISTS (SELECT 1 FROM navigation_aid GROUP BY navigation_aid_id, filename '
+        'HAVING count(*) > 1);')
+
+    if duplicated:
+        connection.execute(
+            'CREATE INDEX navigation_aid_key_nonunique '
+            'ON navigation_aid (navigation_aid_id, filename);')
+    else:
+        connection.execute(
+            'CREATE UNIQUE INDEX navigation_aid_key '
+            'ON navigation_aid (navigation_aid_id, filename);')
+
+
+MIGRATIONS.extend([
+    create_navigation_aid_key,
+
+    # Searches by country and type, or by airport, answered by the index alone
+    f'CREATE INDEX IF NOT EXISTS navigation_aid_country_type '
+    f'ON navigation_aid (iso_country, type, {_SUMMARY_COLUMNS});',
+    f'CREATE INDEX IF NOT EXISTS navigation_aid_airport_id '
+    f'ON navigation_aid (airport_id, {_SUMMARY_COLUMNS});',
+
+    # Searches by ident, with or without case
+    'CREATE INDEX IF NOT EXISTS navigation_aid_ident ON navigation_aid (ident);',
+    'CREATE INDEX IF NOT EXISTS navigation_aid_ident_nocase '
+    'ON navigation_aid (ident COLLATE NOCASE);'
+])
+
+
+@dispatcher.register(StartNavigationAidSearchEvent, errors_as_events = True)
+def process_start_navigation_aid_search_event(event, connection):
+    """This function starts navigation aid search event"""
+    # Defining parameters
+    filters = {
+        'iso_country': event._iso_country,
+        'type': event._type,
+        'airport_id': event._airport_id
+    }
+    statement, parameters = make_search(
+        'navigation_aid', {'ident': event._ident}, event._mode, event._ignore_case,
+        filters, _SUMMARY_COLUMNS)
+    if statement is None:
+        return
+    cursor = connection.cursor()
+    cursor.row_factory = _make_navigation_aid_summary
+    try:
+        cursor.execute(statement, parameters)
+        # Streaming results as each batch of rows is fetched, one event per batch
+        for navigation_aids in fetch_batches(cursor, connection.fetch_batch_size, event._limit):
+            yield NavigationAidSearchResultsBatchEvent(navigation_aids)
+    finally:
+        cursor.close()
+
+
+@dispatcher.register(LoadNavigationAidEvent, errors_as_events = True)
+def process_load_navigation_aid_event(event, connection):
+    """This function loads navigation aid based on its id and filename"""
+    # Defining parameters
+    cursor = connection.cursor()
+    cursor.row_factory = _make_navigation_aid
+    cursor.execute(
+        'SELECT * FROM navigation_aid WHERE navigation_aid_id = ? AND filename = ?;',
+        (event._navigation_aid_id, event._filename))
+    # Fetching result
+    result = cursor.fetchone()
+    if result is not None:
+        yield NavigationAidLoadedEvent(result)
+    else:
+        yield ()
+    cursor.close()
+
+
+@dispatcher.register(SaveNewNavigationAidEvent, SaveNavigationAidEvent)
+def process_save_navigation_aid_event(event, connection):
+    """This function saves navigation aid information, old and new navigation aids.
+    A navigation aid's id and filename are its key, so saving an existing one
+    changes everything else about it, and a new one without an id is given the
+    next one after the highest id in use."""
+    # Defining parameters
+    navigation_aid = event._navigation_aid
+    key = (navigation_aid.navigation_aid_id, navigation_aid.filename)
+    cursor = connection.cursor()
+    # Filtering New Navigation Aid Event versus Existing Navigation Aid Event
+    try:
+        if isinstance(event, SaveNewNavigationAidEvent):
+            if navigation_aid.navigation_aid_id is None:
+                (navigation_aid_id,), = cursor.execute(
+                    'SELECT coalesce(max(navigation_aid_id), 0) + 1 FROM navigation_aid;')
+                navigation_aid = navigation_aid._replace(navigation_aid_id = navigation_aid_id)
+            elif _key_exists(cursor, key):
+                yield SaveNavigationAidFailedEvent(
+                    f'A navigation aid with id {key[0]} and filename {key[1]!r} already exists')
+                return
+            cursor.execute(_INSERT_NAVIGATION_AID, navigation_aid)
+        elif isinstance(event, SaveNavigationAidEvent):
+            cursor.execute(_UPDATE_NAVIGATION_AID, (*navigation_aid[2:], *key))
+            if cursor.rowcount == 0:
+                yield SaveNavigationAidFailedEvent(
+                    f'There is no navigation aid with id {key[0]} and filename {key[1]!r}')
+                return
+    except sqlite3.IntegrityError as e:
+        yield SaveNavigationAidFailedEvent(e)
+    else:
+        yield NavigationAidSavedEvent(navigation_aid)
+    finally:
+        cursor.close()
+
+
+def _key_exists(cursor, key):
+    """Returns True if a navigation aid already has the given key"""
+    (exists,), = cursor.execute(
+        'SELECT EXISTS (SELECT 1 FROM navigation_aid '
+        'WHERE navigation_aid_id = ? AND filename = ?);', key)
+    return bool(exists)
@@ -0,0 +1,592 @@
+"""This module is in charge of importing the CSV files published by OurAirports.
+
+The files are read one row at a time and handed straight to executemany, so no
+file is ever held in memory, and everything is imported in a single transaction,
+so a failed import leaves the database as it was.  The indexes, triggers and
+full-text and location indexes on the imported tables are dropped before their
+rows are replaced and built again once they've all been inserted, which is far
+quicker than keeping them up to date one row at a time.
+
+When only a few rows change between snapshots, the files can be synced instead.
+A hash of every row is kept in the ourairports_row_hash table, and only the rows
+whose hashes differ are inserted, updated or deleted.  The records that the
+engine can save are saved by sending them through its own save handlers, so a
+sync fails in exactly the cases in which saving them in the application would."""
+
+
+import csv
+import hashlib
+import json
+import sqlite3
+import time
+from collections import namedtuple
+from pathlib import Path
+from p2app.events.airports import Airport, SaveNewAirportEvent, SaveAirportEvent,\
+    SaveAirportFailedEvent
+from p2app.events.countries import Country, SaveNewCountryEvent, SaveCountryEvent,\
+    SaveCountryFailedEvent
+from p2app.events.navigation_aids import NavigationAid, SaveNewNavigationAidEvent,\
+    SaveNavigationAidEvent, SaveNavigationAidFailedEvent
+from p2app.events.regions import Region, SaveNewRegionEvent, SaveRegionEvent,\
+    SaveRegionFailedEvent
+from p2app.engine.dispatch import dispatcher
+from p2app.engine.migrations import run_migrations
+
+# The engine modules append the migrations that build their indexes when imported
+import p2app.engine.main
+
+
+class CsvImportError(Exception):
+    """Raised when the CSV files can't be imported, saying which file and line, if
+    any, were the cause"""
+    pass
+
+
+# A column whose value is the id of the record in another table with a given code,
+# which is None rather than an error when no record has that code if optional
+_Lookup = namedtuple('_Lookup', ['table', 'code_column', 'id_expression', 'optional'])
+
+# The table a CSV file is imported into, for each of its columns, the CSV column
+# its values come from and either a function converting them or a _Lookup, and
+# how many of its leading columns make up its key
+_CsvFile = namedtuple('_CsvFile', ['table', 'filename', 'columns', 'key_length'], defaults = [1])
+
+# How many rows were imported into a table and how many seconds it took
+ImportedTable = namedtuple('ImportedTable', ['table', 'filename', 'rows', 'seconds'])
+
+# The tables that were imported, and how many seconds it took to rebuild the indexes
+ImportSummary = namedtuple('ImportSummary', ['tables', 'index_seconds'])
+
+# How many of a table's rows a sync inserted, updated, deleted and left unchanged,
+# and how many seconds it took
+SyncedTable = namedtuple(
+    'SyncedTable',
+    ['table', 'filename', 'inserted', 'updated', 'deleted', 'unchanged', 'seconds'])
+
+
+def _text(value):
+    return value
+
+
+def _optional_text(value):
+    return value if value != '' else None
+
+
+def _integer(value):
+    return int(value) if value != '' else None
+
+
+def _real(value):
+    return float(value) if value != '' else None
+
+
+def _yes_no(value):
+    return 1 if value == 'yes' else 0
+
+
+_CONTINENT = _Lookup('continent', 'continent_code', 'continent_id', False)
+_COUNTRY = _Lookup('country', 'country_code', 'country_id', False)
+_REGION = _Lookup('region', 'region_code', 'region_id', False)
+
+# In the order they're imported, so that every record is imported after those it refers to
+CSV_FILES = (
+    _CsvFile('country', 'countries.csv', (
+        ('country_id', 'id', _integer),
+        ('country_code', 'code', _text),
+        ('name', 'name', _text),
+        ('continent_id', 'continent', _CONTINENT),
+        ('wikipedia_link', 'wikipedia_link', _text),
+        ('keywords', 'keywords', _optional_text))),
+
+    _CsvFile('region', 'regions.csv', (
+        ('region_id', 'id', _integer),
+        ('region_code', 'code', _text),
+        ('local_code', 'local_code', _text),
+        ('name', 'name', _text),
+        ('continent_id', 'continent', _CONTINENT),
+        ('country_id', 'iso_country', _COUNTRY),
+        ('wikipedia_link', 'wikipedia_link', _optional_text),
+        ('keywords', 'keywords', _optional_text))),
+
+    _CsvFile('airport', 'airports.csv', (
+        ('airport_id', 'id', _integer),
+        ('airport_ident', 'ident', _text),
+        ('type', 'type', _text),
+        ('name', 'name', _text),
+        ('latitude_deg', 'latitude_deg', _real),
+        ('longitude_deg', 'longitude_deg', _real),
+        ('elevation_ft', 'elevation_ft', _integer),
+        # The airport table stores its continent's id as text
+        ('continent_id', 'continent',
+         _Lookup('continent', 'continent_code', 'CAST(continent_id AS TEXT)', False)),
+        ('country_id', 'iso_country', _COUNTRY),
+        ('region_id', 'iso_region', _REGION),
+        ('municipality', 'municipality', _optional_text),
+        ('scheduled_service', 'scheduled_service', _yes_no),
+        ('gps_code', 'gps_code', _optional_text),
+        ('iata_code', 'iata_code', _optional_text),
+        ('local_code', 'local_code', _optional_text),
+        ('home_link', 'home_link', _optional_text),
+        ('wikipedia_link', 'wikipedia_link', _optional_text),
+        ('keywords', 'keywords', _optional_text))),
+
+    _CsvFile('runway', 'runways.csv', (
+        ('runway_id', 'id', _integer),
+        ('airport_id', 'airport_ref', _integer),
+        ('length_ft', 'length_ft', _integer),
+        ('width_ft', 'width_ft', _integer),
+        ('surface', 'surface', _optional_text),
+        ('lighted', 'lighted', _integer),
+        ('closed', 'closed', _integer),
+        ('le_ident', 'le_ident', _optional_text),
+        ('le_latitude_deg', 'le_latitude_deg', _real),
+        ('le_longitude_deg', 'le_longitude_deg', _real),
+        ('le_elevation_ft', 'le_elevation_ft', _integer),
+        ('le_heading_deg', 'le_heading_degT', _real),
+        ('le_displaced_threshold_ft', 'le_displaced_threshold_ft', _integer),
+        ('he_ident', 'he_ident', _optional_text),
+        ('he_latitude_deg', 'he_latitude_deg', _real),
+        ('he_longitude_deg', 'he_longitude_deg', _real),
+        ('he_elevation_ft', 'he_elevation_ft', _integer),
+        ('he_heading_deg', 'he_heading_degT', _real),
+        ('he_displaced_threshold_ft', 'he_displaced_threshold_ft', _integer))),
+
+    _CsvFile('airport_frequency', 'airport-frequencies.csv', (
+        ('airport_frequency_id', 'id', _integer),
+        ('airport_id', 'airport_ref', _integer),
+        ('type', 'type', _text),
+        ('description', 'description', _optional_text),
+        ('frequency_mhz', 'frequency_mhz', _real))),
+
+    _CsvFile('navigation_aid', 'navaids.csv', (
+        ('navigation_aid_id', 'id', _integer),
+        ('filename', 'filename', _text),
+        ('ident', 'ident', _text),
+        ('name', 'name', _text),
+        ('type', 'type', _text),
+        ('frequency_khz', 'frequency_khz', _integer),
+        ('latitude_deg', 'latitude_deg', _real),
+        ('longitude_deg', 'longitude_deg', _real),
+        ('elevation_ft', 'elevation_ft', _integer),
+        ('iso_country', 'iso_country', _text),
+        ('dme_frequency_khz', 'dme_frequency_khz', _integer),
+        ('dme_channel', 'dme_channel', _optional_text),
+        ('dme_latitude_deg', 'dme_latitude_deg', _real),
+        ('dme_longitude_deg', 'dme_longitude_deg', _real),
+        ('dme_elevation_ft', 'dme_elevation_ft', _integer),
+        ('adjusted_variation_deg', 'slaved_variation_deg', _real),
+        ('magnetic_variation_deg', 'magnetic_variation_deg', _real),
+        ('usage_type', 'usageType', _optional_text),
+        ('power', 'power', _optional_text),
+        ('airport_id', 'associated_airport',
+         _Lookup('airport', 'airport_ident', 'airport_id', True))),
+        key_length = 2)
+)
+
+# For the tables whose records the engine can save, the type of their records and
+# the events that save new and existing ones and report that saving one failed
+_SAVE_EVENTS = {
+    'country': (Country, SaveNewCountryEvent, SaveCountryEvent, SaveCountryFailedEvent),
+    'region': (Region, SaveNewRegionEvent, SaveRegionEvent, SaveRegionFailedEvent),
+    'airport': (Airport, SaveNewAirportEvent, SaveAirportEvent, SaveAirportFailedEvent),
+    'navigation_aid': (
+        NavigationAid, SaveNewNavigationAidEvent, SaveNavigationAidEvent,
+        SaveNavigationAidFailedEvent)
+}
+
+# The names of the continents, by their codes, for continents that aren't yet in the database
+_CONTINENT_NAMES = {
+    'AF': 'Africa', 'AN': 'Antarctica', 'AS': 'Asia', 'EU': 'Europe',
+    'NA': 'North America', 'OC': 'Oceania', 'SA': 'South America'
+}
+
+
+def import_csv_files(connection, directory, progress = None):
+    """Replaces the rows of each table with those of its CSV file in a directory,
+    skipping the tables whose files aren't there, then rebuilds the indexes.  The
+    connection must have been opened with isolation_level = None.  If progress is
+    given, it's called with an ImportedTable as each table is finished.  Returns an
+    ImportSummary, or raises a CsvImportError if the files can't be imported, in
+    which case the database is left unchanged."""
+    directory = Path(directory)
+    csv_files = [csv_file for csv_file in CSV_FILES if (directory / csv_file.filename).exists()]
+
+    if not csv_files:
+        raise CsvImportError(f'There are no OurAirports CSV files in {directory}')
+
+    tables = [csv_file.table for csv_file in csv_files]
+    imported = []
+
+    # The foreign keys are checked once everything has been imported, since they
+    # can't be turned off or on within a transaction
+    (foreign_keys,), = connection.execute('PRAGMA foreign_keys;')
+    connection.execute('PRAGMA foreign_keys = OFF;')
+
+    try:
+        connection.execute('BEGIN;')
+        deferred = _drop_indexes(connection, tables)
+
+        # Children are deleted before the records they refer to
+        for table in reversed(tables):
+            connection.execute(f'DELETE FROM {table};')
+
+        # The hashes of the rows that were replaced no longer mean anything
+        _create_row_hash_table(connection)
+        placeholders = ', '.join('?' * len(tables))
+        connection.execute(
+            f'DELETE FROM ourairports_row_hash WHERE table_name IN ({placeholders});', tables)
+
+        for csv_file in csv_files:
+            start = time.perf_counter()
+            rows = _import_csv_file(connection, directory / csv_file.filename, csv_file)
+            imported.append(
+                ImportedTable(csv_file.table, csv_file.filename, rows, time.perf_counter() - start))
+
+            if progress is not None:
+                progress(imported[-1])
+
+        start = time.perf_counter()
+        _rebuild_indexes(connection, deferred)
+        index_seconds = time.perf_counter() - start
+
+        _check_foreign_keys(connection, tables)
+        connection.execute('COMMIT;')
+    except BaseException:
+        if connection.in_transaction:
+            connection.execute('ROLLBACK;')
+
+        raise
+    finally:
+        connection.execute(f'PRAGMA foreign_keys = {foreign_keys};')
+
+    return ImportSummary(imported, index_seconds)
+
+
+def _import_csv_file(connection, path, csv_file):
+    """Inserts the rows of a CSV file into its table, returning how many there were"""
+    with open(path, newline = '', encoding = 'utf-8') as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+
+        if header is None:
+            return 0
+
+        converters = _converters(connection, path, header, csv_file)
+        columns = ', '.join(column for column, _, _ in csv_file.columns)
+        placeholders = ', '.join('?' * len(csv_file.columns))
+        rows = _rows(reader, path, converters)
+
+        try:
+            connection.executemany(
+                f'INSERT INTO {csv_file.table} ({columns}) VALUES ({placeholders});', rows)
+        except sqlite3.IntegrityError as e:
+            raise CsvImportError(f'{path.name}, line {reader.line_num}: {e}') from e
+
+        (count,), = connection.execute(f'SELECT count(*) FROM {csv_file.table};')
+        return count
+
+
+def _converters(connection, path, header, csv_file):
+    """Returns, for each of a table's columns, the position of its CSV column in
+    the header and the function that converts that column's values"""
+    positions = {name: position for position, name in enumerate(header)}
+    converters = []
+
+    for column, csv_column, convert in csv_file.columns:
+        if csv_column not in positions:
+            raise CsvImportError(f'{path.name} has no {csv_column} column')
+
+        if isinstance(convert, _Lookup):
+            convert = _lookup_converter(connection, convert)
+
+        converters.append((positions[csv_column], convert))
+
+    return converters
+
+
+def _lookup_converter(connection, lookup):
+    """Returns a function that converts a code to the id of the record that has it"""
+    if lookup.table == 'continent':
+        _add_missing_continents(connection)
+
+    ids = dict(connection.execute(
+        f'SELECT {lookup.code_column}, {lookup.id_expression} FROM {lookup.table};'))
+
+    def convert(code):
+        if code in ids:
+            return ids[code]
+        elif lookup.optional:
+            return None
+        else:
+            raise ValueError(f'there is no {lookup.table} with the code {code!r}')
+
+    return convert
+
+
+def _add_missing_continents(connection):
+    """Adds any of the seven continents that the database doesn't have yet"""
+    existing = {code for code, in connection.execute('SELECT continent_code FROM continent;')}
+
+    for code, name in _CONTINENT_NAMES.items():
+        if code not in existing:
+            connection.execute(
+                'INSERT INTO continent (continent_code, name) VALUES (?, ?);', (code, name))
+
+
+def _rows(reader, path, converters):
+    """A generator function that yields each row of a CSV file converted into the
+    values of its table's columns"""
+    for record in reader:
+        try:
+            yield [convert(record[position]) for position, convert in converters]
+        except (ValueError, IndexError) as e:
+            raise CsvImportError(f'{path.name}, line {reader.line_num}: {e}') from e
+
+
+def _drop_indexes(connection, tables):
+    """Drops the indexes and triggers on the given tables, along with every virtual
+    table, which only ever holds the engine's full-text and location indexes.
+    Returns the name, type and statement of each index and trigger dropped."""
+    placeholders = ', '.join('?' * len(tables))
+    dropped = connection.execute(
+        f"SELECT name, type, sql FROM sqlite_master WHERE type IN ('index', 'trigger') "
+        f"AND sql IS NOT NULL AND tbl_name IN ({placeholders});", tables).fetchall()
+    virtual_tables = connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' "
+        "AND sql LIKE 'CREATE VIRTUAL TABLE%';").fetchall()
+
+    for name, object_type, _ in dropped:
+        connection.execute(f'DROP {object_type.upper()} {name};')
+
+    for name, in virtual_tables:
+        connection.execute(f'DROP TABLE {name};')
+
+    return dropped
+
+
+def _rebuild_indexes(connection, dropped):
+    """Builds the engine's indexes again by running its migrations, then creates
+    whichever of the dropped indexes and triggers the migrations didn't"""
+    run_migrations(connection)
+
+    existing = {name for name, in connection.execute('SELECT name FROM sqlite_master;')}
+
+    for name, _, statement in dropped:
+        if name not in existing:
+            connection.execute(statement)
+
+
+def _check_foreign_keys(connection, tables):
+    """Raises a CsvImportError if any imported record refers to one that doesn't
+    exist, or if any record in another table refers to one that was replaced by
+    the import and no longer exists"""
+    for table in _tables_referring_to(connection, tables):
+        violation = connection.execute(f'PRAGMA foreign_key_check ({table});').fetchone()
+
+        if violation is not None:
+            child, rowid, parent, _ = violation
+            raise CsvImportError(
+                f'The {child} with rowid {rowid} refers to a missing {parent}')
+
+
+def _tables_referring_to(connection, tables):
+    """Returns the given tables, followed by every other table with a foreign key
+    that refers to one of them"""
+    referring = list(tables)
+    all_tables = [
+        name for name, in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table';")]
+
+    for table in all_tables:
+        if table not in referring and any(
+                parent in tables
+                for _, _, parent, *_ in connection.execute(f'PRAGMA foreign_key_list ({table});')):
+            referring.append(table)
+
+    return referring
+
+
+def sync_csv_files(connection, directory):
+    """Brings each table up to date with its CSV file in a directory, skipping the
+    tables whose files aren't there, by inserting, updating and deleting only the
+    rows whose hashes have changed since the last sync.  The connection must be an
+    EngineConnection opened with isolation_level = None.  Returns a list of the
+    SyncedTables, or raises a CsvImportError if the files can't be synced, in
+    which case the database is left unchanged."""
+    directory = Path(directory)
+    csv_files = [csv_file for csv_file in CSV_FILES if (directory / csv_file.filename).exists()]
+
+    if not csv_files:
+        raise CsvImportError(f'There are no OurAirports CSV files in {directory}')
+
+    synced = []
+
+    # Unlike an import, a sync checks each row's foreign keys as it's saved
+    (foreign_keys,), = connection.execute('PRAGMA foreign_keys;')
+    connection.execute('PRAGMA foreign_keys = ON;')
+
+    try:
+        connection.execute('BEGIN;')
+        _create_row_hash_table(connection)
+        removed = []
+
+        for csv_file in csv_files:
+            start = time.perf_counter()
+            inserted, updated, unchanged, removed_keys = \
+                _sync_csv_file(connection, directory / csv_file.filename, csv_file)
+            synced.append(SyncedTable(
+                csv_file.table, csv_file.filename, inserted, updated, len(removed_keys),
+                unchanged, time.perf_counter() - start))
+            removed.append(removed_keys)
+
+        # Children are deleted before the records they refer to
+        for index in reversed(range(len(csv_files))):
+            start = time.perf_counter()
+            _delete_rows(connection, csv_files[index], removed[index])
+            synced[index] = synced[index]._replace(
+                seconds = synced[index].seconds + time.perf_counter() - start)
+
+        connection.execute('COMMIT;')
+    except BaseException:
+        if connection.in_transaction:
+            connection.execute('ROLLBACK;')
+
+        raise
+    finally:
+        connection.execute(f'PRAGMA foreign_keys = {foreign_keys};')
+
+    return synced
+
+
+def _sync_csv_file(connection, path, csv_file):
+    """Saves the rows of a CSV file whose hashes have changed, returning how many
+    were inserted, updated and left unchanged, and the keys of the rows that are no
+    longer in the file"""
+    stored = _stored_hashes(connection, csv_file)
+    inserted = updated = unchanged = 0
+    changed_hashes = []
+
+    with open(path, newline = '', encoding = 'utf-8') as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        converters = _converters(connection, path, header, csv_file) if header else []
+
+        for row in _rows(reader, path, converters):
+            key = _row_key(csv_file, row)
+            row_hash = _row_hash(row)
+            stored_hash = stored.pop(key, None)
+
+            if stored_hash == row_hash:
+                unchanged += 1
+                continue
+
+            failure = _save_row(connection, csv_file, row, is_new = stored_hash is None)
+
+            if failure is not None:
+                raise CsvImportError(f'{path.name}, line {reader.line_num}: {failure}')
+
+            if stored_hash is None:
+                inserted += 1
+            else:
+                updated += 1
+
+            changed_hashes.append((csv_file.table, key, row_hash))
+
+    connection.executemany(
+        'INSERT OR REPLACE INTO ourairports_row_hash (table_name, row_key, row_hash) '
+        'VALUES (?, ?, ?);', changed_hashes)
+
+    # Whatever is left of the stored hashes belongs to rows that aren't in the file
+    return inserted, updated, unchanged, list(stored)
+
+
+def _create_row_hash_table(connection):
+    connection.execute(
+        'CREATE TABLE IF NOT EXISTS ourairports_row_hash ('
+        'table_name TEXT NOT NULL, row_key TEXT NOT NULL, row_hash BLOB NOT NULL, '
+        'PRIMARY KEY (table_name, row_key)) WITHOUT ROWID;')
+
+
+def _stored_hashes(connection, csv_file):
+    """Returns a dictionary of the stored hashes of a table's rows, by their keys.
+    If none are stored yet, they're first stored from the rows in the table."""
+    stored = dict(connection.execute(
+        'SELECT row_key, row_hash FROM ourairports_row_hash WHERE table_name = ?;',
+        (csv_file.table,)))
+
+    if not stored:
+        columns = ', '.join(column for column, _, _ in csv_file.columns)
+
+        for row in connection.execute(f'SELECT {columns} FROM {csv_file.table};'):
+            stored[_row_key(csv_file, row)] = _row_hash(row)
+
+        connection.executemany(
+            'INSERT INTO ourairports_row_hash (table_name, row_key, row_hash) VALUES (?, ?, ?);',
+            ((csv_file.table, key, row_hash) for key, row_hash in stored.items()))
+
+    return stored
+
+
+def _row_key(csv_file, row):
+    """Returns the text that identifies a row among the rows of its table"""
+    return json.dumps(list(row[:csv_file.key_length]))
+
+
+def _row_hash(row):
+    """Returns a hash of the values of a row's columns"""
+    return hashlib.blake2b(repr(tuple(row)).encode(), digest_size = 16).digest()
+
+
+def _save_row(connection, csv_file, row, is_new):
+    """Inserts or updates a row, returning None if it was saved, or the reason it
+    couldn't be otherwise.  The records that the engine can save are saved by its
+    own save handlers, and the rest by inserting or updating them directly."""
+    if csv_file.table in _SAVE_EVENTS:
+        record_type, save_new_event_type, save_event_type, failed_event_type = \
+            _SAVE_EVENTS[csv_file.table]
+        event_type = save_new_event_type if is_new else save_event_type
+        event = event_type(record_type(*row))
+
+        for result in dispatcher.lookup(event_type)(event, connection):
+            if isinstance(result, failed_event_type):
+                return str(result.reason())
+
+        return None
+
+    columns = [column for column, _, _ in csv_file.columns]
+    key_columns = columns[:csv_file.key_length]
+
+    try:
+        if is_new:
+            connection.execute(
+                f'INSERT INTO {csv_file.table} ({", ".join(columns)}) '
+                f'VALUES ({", ".join("?" * len(columns))});', row)
+        else:
+            assignments = ', '.join(f'{column} = ?' for column in columns[csv_file.key_length:])
+            connection.execute(
+                f'UPDATE {csv_file.table} SET {assignments} WHERE {_key_condition(key_columns)};',
+                (*row[csv_file.key_length:], *row[:csv_file.key_length]))
+    except sqlite3.IntegrityError as e:
+        return str(e)
+
+    return None
+
+
+def _delete_rows(connection, csv_file, keys):
+    """Deletes the rows with the given keys from a table, along with their hashes"""
+    key_columns = [column for column, _, _ in csv_file.columns[:csv_file.key_length]]
+
+    try:
+        connection.executemany(
+            f'DELETE FROM {csv_file.table} WHERE {_key_condition(key_columns)};',
+            (json.loads(key) for key in keys))
+    except sqlite3.IntegrityError as e:
+        raise CsvImportError(f'{csv_file.filename}: a removed row could not be deleted: {e}') from e
+
+    connection.executemany(
+        'DELETE FROM ourairports_row_hash WHERE table_name = ? AND row_key = ?;',
+        ((csv_file.table, key) for key in keys))
+
+
+def _key_condition(key_columns):
+    return ' AND '.join(f'{column} = ?' for column in key_columns)
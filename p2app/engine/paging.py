@@ -0,0 +1,74 @@
+"""This module is in charge of fetching the results of searches a page at a time.
+
+Each page is ordered by a key made up of a table's name and ID, and begins after
+the key of the last row on the page before it.  Since every table has an index on
+its names, whose entries end with the rows' IDs, the database finds the first row
+of a page by seeking that index to the key, then reads no more rows than fit on
+the page, so fetching a page costs the same however far into the results it is.
+
+The key is given to the caller as a continuation token, a string that is given
+back unchanged to ask for the next page, so that callers needn't know what makes
+up the key."""
+
+
+import base64
+import binascii
+import json
+from p2app.engine.statements import make_page_search
+
+
+def encode_page_token(key):
+    """Returns the continuation token for a page that begins after the given key"""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_page_token(token, key_length):
+    """Returns the key that a continuation token stands for, or None if the token
+    is None, raising a ValueError if it isn't a token for a key of the given length"""
+    if token is None:
+        return None
+
+    try:
+        key = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError(f'Invalid page token: {token!r}') from None
+
+    if not isinstance(key, list) or len(key) != key_length:
+        raise ValueError(f'Invalid page token: {token!r}')
+
+    return tuple(key)
+
+
+def search_page(
+        connection, table, criteria, key_columns, row_factory, page_size, after_token,
+        mode, ignore_case, filters = None):
+    """Searches a table for one page of rows, ordered by the key columns and made
+    into records by the row factory, returning the list of them and the token that
+    continues the search after them, which is None if there are no more.  Returns
+    None if no column is being searched."""
+    if page_size < 1:
+        raise ValueError(f'A page must hold at least one row, not {page_size}')
+
+    after_key = decode_page_token(after_token, len(key_columns))
+
+    # Fetching one more row than fits on the page, to learn whether there's another
+    statement, parameters = make_page_search(
+        table, criteria, key_columns, after_key, page_size + 1, mode, ignore_case, filters)
+
+    if statement is None:
+        return None
+
+    cursor = connection.cursor()
+    cursor.row_factory = row_factory
+
+    try:
+        rows = cursor.execute(statement, parameters).fetchall()
+    finally:
+        cursor.close()
+
+    if len(rows) <= page_size:
+        return rows, None
+
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_page_token([getattr(last, column) for column in key_columns])
@@ -0,0 +1,227 @@
+"""This module is in charge of keeping the continents and countries in memory.
+
+The continent and country tables are tiny and read constantly, so each is loaded
+into a CachedTable as soon as the database is opened.  Searches and loads are
+then answered from it without going to the database, and saves update it once
+they've been written.  Searches match the way the database's would, comparing
+case-insensitively only the ASCII letters, as SQLite's NOCASE and LIKE do."""
+
+
+import sqlite3
+import string
+from p2app.events.continents import Continent
+from p2app.events.countries import Country
+from p2app.events.searching import EXACT_MATCH, PREFIX_MATCH, SUBSTRING_MATCH
+from p2app.engine.database import CONNECTION_INITIALIZERS, record_factory
+from p2app.engine.diagnostics import STATISTICS_REPORTERS
+
+
+_ASCII_LOWERCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _fold(value):
+    """Returns a value with its ASCII letters lowercased, as SQLite compares them
+    when ignoring case"""
+    return value.translate(_ASCII_LOWERCASE)
+
+
+class CachedTable:
+    """The records of one table, by their ids, along with indexes of the values of
+    the columns that they can be searched by"""
+
+    def __init__(self, record_type, search_fields):
+        """Initializes an empty table of records of the given namedtuple type, whose
+        first field is their id, searchable by the given fields"""
+        self._record_type = record_type
+        self._records = {}
+        self._indexes = {field: ({}, {}) for field in search_fields}
+        self.hits = 0
+        self.misses = 0
+
+
+    def load(self, connection, table):
+        """Replaces the records with every row of a table in the database"""
+        cursor = connection.cursor()
+        cursor.row_factory = record_factory(self._record_type)
+
+        try:
+            records = cursor.execute(f'SELECT * FROM {table};').fetchall()
+        finally:
+            cursor.close()
+
+        self._records.clear()
+
+        for exact, folded in self._indexes.values():
+            exact.clear()
+            folded.clear()
+
+        for record in records:
+            self.put(record)
+
+
+    def get(self, record_id):
+        """Returns the record with the given id, or None if it isn't cached,
+        counting a hit or a miss"""
+        record = self._records.get(record_id)
+
+        if record is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return record
+
+
+    def put(self, record):
+        """Adds a record, replacing any record that has the same id"""
+        self.remove(record[0])
+        self._records[record[0]] = record
+
+        for field, (exact, folded) in self._indexes.items():
+            value = getattr(record, field)
+
+            if value is not None:
+                exact.setdefault(value, set()).add(record[0])
+                folded.setdefault(_fold(value), set()).add(record[0])
+
+
+    def remove(self, record_id):
+        """Removes the record with the given id, if it's cached"""
+        record = self._records.pop(record_id, None)
+
+        if record is None:
+            return
+
+        for field, (exact, folded) in self._indexes.items():
+            value = getattr(record, field)
+
+            if value is not None:
+                _discard(exact, value, record_id)
+                _discard(folded, _fold(value), record_id)
+
+
+    def search(self, criteria, mode = EXACT_MATCH, ignore_case = False):
+        """Given a dictionary mapping the search fields to the values searched for,
+        with None meaning the field isn't searched, returns a list of the matching
+        records in order of their ids, or None if no field is being searched"""
+        criteria = {field: value for field, value in criteria.items() if value is not None}
+
+        if not criteria:
+            return None
+
+        self.hits += 1
+
+        if mode == EXACT_MATCH:
+            record_ids = None
+
+            # Intersecting the ids that each field's index finds for its value
+            for field, value in criteria.items():
+                exact, folded = self._indexes[field]
+                found = folded.get(_fold(value), set()) if ignore_case else exact.get(value, set())
+                record_ids = found if record_ids is None else record_ids & found
+
+            records = [self._records[record_id] for record_id in record_ids]
+        else:
+            matches = _matcher(mode, ignore_case)
+            records = [
+                record for record in self._records.values()
+                if all(
+                    matches(getattr(record, field), value) for field, value in criteria.items())]
+
+        return sorted(records, key = lambda record: record[0])
+
+
+    def __len__(self):
+        return len(self._records)
+
+
+def _discard(index, value, record_id):
+    """Removes a record's id from the ids an index has for a value"""
+    record_ids = index.get(value)
+
+    if record_ids is not None:
+        record_ids.discard(record_id)
+
+        if not record_ids:
+            del index[value]
+
+
+def _matcher(mode, ignore_case):
+    """Returns a function that decides whether a record's value matches the value
+    searched for in a prefix or substring search"""
+    if mode == PREFIX_MATCH and ignore_case:
+        matches = lambda value, searched: _fold(value).startswith(_fold(searched))
+    elif mode == PREFIX_MATCH:
+        matches = lambda value, searched: value.startswith(searched)
+    elif mode == SUBSTRING_MATCH and ignore_case:
+        matches = lambda value, searched: _fold(searched) in _fold(value)
+    elif mode == SUBSTRING_MATCH:
+        matches = lambda value, searched: searched in value
+    else:
+        raise ValueError(f'Unknown search mode: {mode!r}')
+
+    # A missing value never matches, as NULL never does in the database
+    return lambda value, searched: value is not None and matches(value, searched)
+
+
+class ReferenceCache:
+    """The cached continents and countries of one database"""
+
+    def __init__(self):
+        """Initializes an empty cache"""
+        self.continents = CachedTable(Continent, ('continent_code', 'name'))
+        self.countries = CachedTable(Country, ('country_code', 'name'))
+
+
+    def load(self, connection):
+        """Loads every continent and country from the database"""
+        self.continents.load(connection, 'continent')
+        self.countries.load(connection, 'country')
+
+
+    def statistics(self):
+        """Returns a dictionary of how many records are cached, and how many hits
+        and misses there have been, for each table"""
+        return {
+            'continents cached': len(self.continents),
+            'continent cache hits': self.continents.hits,
+            'continent cache misses': self.continents.misses,
+            'countries cached': len(self.countries),
+            'country cache hits': self.countries.hits,
+            'country cache misses': self.countries.misses
+        }
+
+
+def preload_reference_cache(connection):
+    """Gives a newly opened connection a ReferenceCache holding its database's
+    continents and countries.  If they can't be read, the connection is left
+    without one, and its searches and loads go to the database as usual."""
+    cache = ReferenceCache()
+
+    try:
+        cache.load(connection)
+    except sqlite3.OperationalError:
+        return
+
+    connection.reference_cache = cache
+
+
+def batches(records, batch_size, limit = None):
+    """A generator function that yields a list of records in lists of at most
+    batch_size records, stopping once limit records have been yielded if there's
+    a limit, as fetch_batches does for a cursor's rows"""
+    if limit is not None:
+        records = records[:limit]
+
+    for start in range(0, len(records), batch_size):
+        yield records[start:start + batch_size]
+
+
+def report_reference_cache_statistics(connection):
+    """Returns the statistics of a connection's ReferenceCache, if it has one"""
+    cache = getattr(connection, 'reference_cache', None)
+    return {} if cache is None else cache.statistics()
+
+
+CONNECTION_INITIALIZERS.append(preload_reference_cache)
+STATISTICS_REPORTERS.append(report_reference_cache_statistics)
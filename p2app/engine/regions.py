@@ -2,75 +2,83 @@
 
 
 import sqlite3
-from p2app.events.regions import RegionSearchResultEvent, RegionLoadedEvent, SaveNewRegionEvent,\
-    SaveRegionEvent, RegionSavedEvent, SaveRegionFailedEvent
-from collections import namedtuple
+from p2app.events.regions import Region, StartRegionSearchEvent,\
+    RegionSearchResultsBatchEvent, StartRegionPageSearchEvent, RegionSearchPageEvent,\
+    LoadRegionEvent, RegionLoadedEvent, SaveNewRegionEvent, SaveRegionEvent, RegionSavedEvent,\
+    SaveRegionFailedEvent
+from p2app.engine.database import fetch_batches, record_factory
+from p2app.engine.dispatch import dispatcher
+from p2app.engine.load_cache import load_cache
+from p2app.engine.paging import search_page
+from p2app.engine.statements import make_search
 
-def define_globals():
-    """This function defines the global namedtuples of the functions"""
-    global Region
-    Region = namedtuple('Region', ['region_id', 'region_code', 'local_code', 'name',
-                                   'continent_id', 'country_id', 'wikipedia_link', 'keywords'])
 
+_make_region = record_factory(Region)
 
+
+@dispatcher.register(StartRegionSearchEvent, errors_as_events = True)
 def process_start_region_search_event(event, connection):
     """This function starts region search event"""
     # Defining parameters
-    define_globals()
     region_name = event._name
     region_code = event._region_code
     region_local_code = event._local_code
+    statement, parameters = make_search(
+        'region',
+        {'region_code': region_code, 'local_code': region_local_code, 'name': region_name},
+        event._mode, event._ignore_case)
+    if statement is None:
+        return
     cursor = connection.cursor()
-    # Checking all cases of search parameters
-    if region_name is not None and region_code is not None and region_local_code is not None:
-        cursor.execute("SELECT * FROM region WHERE region_code = ? AND name = ? AND local_code = ?;",
-                       (region_code, region_name, region_local_code))
-    elif region_name is not None and region_code is not None:
-        cursor.execute("SELECT * FROM region WHERE region_code = ? AND name = ?;",
-                       (region_code, region_name,))
-    elif region_name is not None and region_local_code is not None:
-        cursor.execute("SELECT * FROM region WHERE local_code = ? AND name = ?;",
-                       (region_local_code, region_name,))
-    elif region_code is not None and region_local_code is not None:
-        cursor.execute("SELECT * FROM region WHERE local_code = ? AND region_code = ?;",
-                       (region_local_code, region_code,))
-    elif region_name is not None:
-        cursor.execute("SELECT * FROM region WHERE name = ?;",
-                       (region_name,))
-    elif region_code is not None:
-        cursor.execute("SELECT * FROM region WHERE region_code = ?;",
-                       (region_code,))
-    elif region_local_code is not None:
-        cursor.execute("SELECT * FROM region WHERE local_code = ?;",
-                       (region_local_code,))
-    # Fetching result
-    result = cursor.fetchall()
-    if result is not None:
-        for region in result:
-            region = Region._make(region)
-            yield RegionSearchResultEvent(region)
-    else:
-        yield ()
-    cursor.close()
+    cursor.row_factory = _make_region
+    try:
+        cursor.execute(statement, parameters)
+        # Streaming results as each batch of rows is fetched, one event per batch
+        for regions in fetch_batches(cursor, connection.fetch_batch_size, event._limit):
+            yield RegionSearchResultsBatchEvent(regions)
+    finally:
+        cursor.close()
+
+
+@dispatcher.register(StartRegionPageSearchEvent, errors_as_events = True)
+def process_start_region_page_search_event(event, connection):
+    """This function searches for one page of regions, ordered by name and id"""
+    # Defining parameters
+    criteria = {
+        'region_code': event._region_code, 'local_code': event._local_code, 'name': event._name}
+    page = search_page(
+        connection, 'region', criteria, ('name', 'region_id'), _make_region, event._page_size,
+        event._after_key, event._mode, event._ignore_case)
+    if page is not None:
+        regions, next_key = page
+        yield RegionSearchPageEvent(regions, event._after_key, next_key)
 
 
+@dispatcher.register(LoadRegionEvent, errors_as_events = True)
 def process_load_region_event(event, connection):
     """This function loads region based on id"""
     # Defining parameters
     region_id = event._region_id
+    cache = load_cache(connection, 'region')
+    # Loading the region from the cache when it was loaded recently
+    if (result := cache.get(region_id)) is not None:
+        yield RegionLoadedEvent(result)
+        return
     cursor = connection.cursor()
+    cursor.row_factory = _make_region
     cursor.execute("SELECT * FROM region WHERE region_id = ?;",
                    (region_id,))
     # Fetching result
     result = cursor.fetchone()
     if result is not None:
-        result = Region._make(result)
+        cache.put(region_id, result)
         yield RegionLoadedEvent(result)
     else:
         yield ()
     cursor.close()
 
 
+@dispatcher.register(SaveNewRegionEvent, SaveRegionEvent)
 def process_save_region_event(event, connection):
     """This function saves region information, old and new regions"""
     # Defining parameters
@@ -97,7 +105,10 @@ def process_save_region_event(event, connection):
     except sqlite3.IntegrityError as e:
         yield SaveRegionFailedEvent(e)
     else:
-        # Fetching result
-        result = cursor.fetchone()
-        yield RegionSavedEvent(result)
+        # New regions are given their id by the database
+        if isinstance(event, SaveNewRegionEvent):
+            region = region._replace(region_id = cursor.lastrowid)
+        # The region will be loaded from the database the next time it's needed
+        load_cache(connection, 'region').invalidate(region.region_id)
+        yield RegionSavedEvent(region)
     cursor.close()
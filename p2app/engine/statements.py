@@ -0,0 +1,167 @@
+"""This module is in charge of building the SQL statements the engine executes"""
+
+
+import functools
+import sys
+from p2app.events.searching import EXACT_MATCH, PREFIX_MATCH, SUBSTRING_MATCH
+
+
+# How many distinct statements each connection keeps compiled.  sqlite3 looks its
+# cache up by the statement's text, so a statement whose text is built the same
+# way every time is parsed and planned only once per connection.
+DEFAULT_CACHED_STATEMENTS = 256
+
+# The character that escapes the wildcards in a LIKE pattern
+_LIKE_ESCAPE = '\\'
+
+# The range of code points set aside for UTF-16 surrogates
+_FIRST_SURROGATE = 0xD800
+_LAST_SURROGATE = 0xDFFF
+
+
+@functools.lru_cache(maxsize = 128)
+def search_statement(
+        table, columns, mode = EXACT_MATCH, ignore_case = False, filter_columns = (),
+        select = '*'):
+    """Returns the statement that searches a table for the rows whose columns
+    match the given values in the given mode, in the order the columns are given,
+    and whose filter columns, if any, are equal to the values given for them,
+    selecting the given result columns from each.
+
+    Every condition is written so that an index can answer it: exact matches by an
+    index on the column, case-sensitive prefixes by a range over that index, and
+    case-insensitive matches by an index on the column with NOCASE collation.
+    Substring matches can't use an index, so they scan the table."""
+    conditions = _search_conditions(columns, mode, ignore_case, filter_columns)
+    return f'SELECT {select} FROM {table} WHERE {" AND ".join(conditions)};'
+
+
+@functools.lru_cache(maxsize = 128)
+def page_statement(
+        table, columns, mode, ignore_case, filter_columns, key_columns, is_after_key):
+    """Returns the statement that fetches one page of a search like the one that
+    search_statement returns, ordered by the key columns and limited to the number
+    of rows given as its last parameter.  If is_after_key is True, the page begins
+    after the key given by the first parameters, so that each page is found by
+    seeking to its first row rather than by skipping every row before it."""
+    conditions = _search_conditions(columns, mode, ignore_case, filter_columns)
+
+    # The key's condition comes first, since when it and a search condition both
+    # bound the same column, the planner seeks the index by the one it sees first
+    if is_after_key:
+        conditions.insert(
+            0, f'({", ".join(key_columns)}) > ({", ".join("?" * len(key_columns))})')
+
+    return \
+        f'SELECT * FROM {table} WHERE {" AND ".join(conditions)} ' \
+        f'ORDER BY {", ".join(key_columns)} LIMIT ?;'
+
+
+def _search_conditions(columns, mode, ignore_case, filter_columns):
+    """Returns the list of conditions that a search's rows must meet"""
+    conditions = [_search_condition(column, mode, ignore_case) for column in columns]
+    conditions.extend(f'{column} = ?' for column in filter_columns)
+    return conditions
+
+
+def make_search(
+        table, criteria, mode = EXACT_MATCH, ignore_case = False, filters = None,
+        select = '*'):
+    """Given a table and a dictionary mapping its columns to the values searched
+    for, with None meaning the column isn't searched, returns the statement and its
+    parameters, or (None, ()) if no column is being searched.  The filters are a
+    similar dictionary of columns whose values must always match exactly, and
+    select is the result columns, every one of them by default."""
+    columns = tuple(column for column, value in criteria.items() if value is not None)
+    filters = filters or {}
+    filter_columns = tuple(column for column, value in filters.items() if value is not None)
+
+    if not columns and not filter_columns:
+        return None, ()
+
+    parameters = []
+
+    for column in columns:
+        parameters.extend(_search_parameters(criteria[column], mode, ignore_case))
+
+    parameters.extend(filters[column] for column in filter_columns)
+
+    statement = search_statement(table, columns, mode, ignore_case, filter_columns, select)
+    return statement, tuple(parameters)
+
+
+def make_page_search(
+        table, criteria, key_columns, after_key, limit, mode = EXACT_MATCH,
+        ignore_case = False, filters = None):
+    """Given the same arguments as make_search, along with the columns whose values
+    make up the key that the rows are ordered by, the key of the row that the page
+    begins after (None meaning it begins with the first row), and the most rows
+    it can hold, returns the statement that fetches the page and its parameters,
+    or (None, ()) if no column is being searched"""
+    statement, parameters = make_search(table, criteria, mode, ignore_case, filters)
+
+    if statement is None:
+        return None, ()
+
+    columns = tuple(column for column, value in criteria.items() if value is not None)
+    filters = filters or {}
+    filter_columns = tuple(column for column, value in filters.items() if value is not None)
+    statement = page_statement(
+        table, columns, mode, ignore_case, filter_columns, tuple(key_columns),
+        after_key is not None)
+
+    return statement, (*(after_key or ()), *parameters, limit)
+
+
+def _search_condition(column, mode, ignore_case):
+    """Returns the condition that matches one column in the given mode"""
+    if mode == EXACT_MATCH:
+        return f'{column} = ? COLLATE NOCASE' if ignore_case else f'{column} = ?'
+    elif mode == PREFIX_MATCH and not ignore_case:
+        return f'({column} >= ? AND {column} < ?)'
+    elif mode in (PREFIX_MATCH, SUBSTRING_MATCH) and ignore_case:
+        return f"{column} LIKE ? ESCAPE '{_LIKE_ESCAPE}'"
+    elif mode == SUBSTRING_MATCH:
+        return f'instr({column}, ?) > 0'
+    else:
+        raise ValueError(f'Unknown search mode: {mode!r}')
+
+
+def _search_parameters(value, mode, ignore_case):
+    """Returns the parameters that the condition for one column is given"""
+    if mode == PREFIX_MATCH and not ignore_case:
+        return value, _prefix_upper_bound(value)
+    elif mode == PREFIX_MATCH:
+        return _escape_like(value) + '%',
+    elif mode == SUBSTRING_MATCH and ignore_case:
+        return '%' + _escape_like(value) + '%',
+    else:
+        return value,
+
+
+def _prefix_upper_bound(prefix):
+    """Returns the least string that sorts after every value beginning with the
+    prefix, or, if there's no such string, an empty BLOB, which SQLite sorts after
+    every string"""
+    # A last character that can't be followed is dropped, and the one before it
+    # followed instead, since nothing can come between them
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+
+    if len(prefix) == 0:
+        return b''
+
+    following = ord(prefix[-1]) + 1
+
+    # The surrogates can't be encoded on their own, so none of them is ever stored
+    if _FIRST_SURROGATE <= following <= _LAST_SURROGATE:
+        following = _LAST_SURROGATE + 1
+
+    return prefix[:-1] + chr(following)
+
+
+def _escape_like(value):
+    """Escapes the wildcards in a value so that LIKE matches them literally"""
+    for special in (_LIKE_ESCAPE, '%', '_'):
+        value = value.replace(special, _LIKE_ESCAPE + special)
+
+    return value
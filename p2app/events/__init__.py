@@ -8,8 +8,19 @@
 # YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
 
 from .event_bus import EventBus
+from .threaded_event_bus import ThreadedEventBus
+from .queued_event_bus import QueuedEventBus
 from .app import *
+from .airports import *
+from .batches import *
 from .continents import *
 from .countries import *
 from .database import *
+from .diagnostics import *
+from .distances import *
+from .exporting import *
+from .fulltext import *
+from .locations import *
+from .navigation_aids import *
 from .regions import *
+from .searching import *
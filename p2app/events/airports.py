@@ -0,0 +1,352 @@
+# p2app/events/airports.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# Events that are either related to searching for, creating, or editing airports
+# in the database.
+
+from collections import namedtuple
+from .searching import EXACT_MATCH
+
+
+
+Airport = namedtuple(
+    'Airport',
+    ['airport_id', 'airport_ident', 'type', 'name', 'latitude_deg', 'longitude_deg',
+     'elevation_ft', 'continent_id', 'country_id', 'region_id', 'municipality',
+     'scheduled_service', 'gps_code', 'iata_code', 'local_code', 'home_link',
+     'wikipedia_link', 'keywords'])
+
+Airport.__annotations__ = {
+    'airport_id': int | None,
+    'airport_ident': str | None,
+    'type': str | None,
+    'name': str | None,
+    'latitude_deg': float | None,
+    'longitude_deg': float | None,
+    'elevation_ft': int | None,
+    'continent_id': str | None,
+    'country_id': int | None,
+    'region_id': int | None,
+    'municipality': str | None,
+    'scheduled_service': int | None,
+    'gps_code': str | None,
+    'iata_code': str | None,
+    'local_code': str | None,
+    'home_link': str | None,
+    'wikipedia_link': str | None,
+    'keywords': str | None
+}
+
+
+
+Runway = namedtuple(
+    'Runway',
+    ['runway_id', 'airport_id', 'length_ft', 'width_ft', 'surface', 'lighted', 'closed',
+     'le_ident', 'le_latitude_deg', 'le_longitude_deg', 'le_elevation_ft', 'le_heading_deg',
+     'le_displaced_threshold_ft', 'he_ident', 'he_latitude_deg', 'he_longitude_deg',
+     'he_elevation_ft', 'he_heading_deg', 'he_displaced_threshold_ft'])
+
+Runway.__annotations__ = {
+    'runway_id': int | None,
+    'airport_id': int | None,
+    'length_ft': int | None,
+    'width_ft': int | None,
+    'surface': str | None,
+    'lighted': int | None,
+    'closed': int | None,
+    'le_ident': str | None,
+    'le_latitude_deg': float | None,
+    'le_longitude_deg': float | None,
+    'le_elevation_ft': int | None,
+    'le_heading_deg': float | None,
+    'le_displaced_threshold_ft': int | None,
+    'he_ident': str | None,
+    'he_latitude_deg': float | None,
+    'he_longitude_deg': float | None,
+    'he_elevation_ft': int | None,
+    'he_heading_deg': float | None,
+    'he_displaced_threshold_ft': int | None
+}
+
+
+
+AirportFrequency = namedtuple(
+    'AirportFrequency',
+    ['airport_frequency_id', 'airport_id', 'type', 'description', 'frequency_mhz'])
+
+AirportFrequency.__annotations__ = {
+    'airport_frequency_id': int | None,
+    'airport_id': int | None,
+    'type': str | None,
+    'description': str | None,
+    'frequency_mhz': float | None
+}
+
+
+
+class StartAirportSearchEvent:
+    def __init__(
+            self, airport_ident: str, iata_code: str, gps_code: str, name: str,
+            municipality: str, country_id: int | None = None, limit: int | None = None,
+            mode: str = EXACT_MATCH, ignore_case: bool = False):
+        self._airport_ident = airport_ident
+        self._iata_code = iata_code
+        self._gps_code = gps_code
+        self._name = name
+        self._municipality = municipality
+        self._country_id = country_id
+        self._limit = limit
+        self._mode = mode
+        self._ignore_case = ignore_case
+
+
+    def airport_ident(self) -> str:
+        return self._airport_ident
+
+
+    def iata_code(self) -> str:
+        return self._iata_code
+
+
+    def gps_code(self) -> str:
+        return self._gps_code
+
+
+    def name(self) -> str:
+        return self._name
+
+
+    def municipality(self) -> str:
+        return self._municipality
+
+
+    def country_id(self) -> int | None:
+        return self._country_id
+
+
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def mode(self) -> str:
+        return self._mode
+
+
+    def ignore_case(self) -> bool:
+        return self._ignore_case
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: airport_ident = {repr(self._airport_ident)}, ' + \
+               f'iata_code = {repr(self._iata_code)}, gps_code = {repr(self._gps_code)}, ' + \
+               f'name = {repr(self._name)}, municipality = {repr(self._municipality)}, ' + \
+               f'country_id = {repr(self._country_id)}, limit = {repr(self._limit)}, ' + \
+               f'mode = {repr(self._mode)}, ignore_case = {repr(self._ignore_case)}'
+
+
+
+class AirportSearchResultsBatchEvent:
+    def __init__(self, airports: list[Airport]):
+        self._airports = airports
+
+
+    def airports(self) -> list[Airport]:
+        return self._airports
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: {len(self._airports)} airports'
+
+
+
+# A page of airports holds the airports found by a search, ordered by their names
+# and then their IDs.  Each page begins after the one whose next_key, a continuation
+# token, is given as its after_key, with None meaning it's the first page.
+class StartAirportPageSearchEvent:
+    def __init__(
+            self, airport_ident: str, iata_code: str, gps_code: str, name: str,
+            municipality: str, country_id: int | None = None, page_size: int = 100,
+            after_key: str | None = None, mode: str = EXACT_MATCH, ignore_case: bool = False):
+        self._airport_ident = airport_ident
+        self._iata_code = iata_code
+        self._gps_code = gps_code
+        self._name = name
+        self._municipality = municipality
+        self._country_id = country_id
+        self._page_size = page_size
+        self._after_key = after_key
+        self._mode = mode
+        self._ignore_case = ignore_case
+
+
+    def airport_ident(self) -> str:
+        return self._airport_ident
+
+
+    def iata_code(self) -> str:
+        return self._iata_code
+
+
+    def gps_code(self) -> str:
+        return self._gps_code
+
+
+    def name(self) -> str:
+        return self._name
+
+
+    def municipality(self) -> str:
+        return self._municipality
+
+
+    def country_id(self) -> int | None:
+        return self._country_id
+
+
+    def page_size(self) -> int:
+        return self._page_size
+
+
+    def after_key(self) -> str | None:
+        return self._after_key
+
+
+    def mode(self) -> str:
+        return self._mode
+
+
+    def ignore_case(self) -> bool:
+        return self._ignore_case
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: airport_ident = {repr(self._airport_ident)}, ' + \
+               f'iata_code = {repr(self._iata_code)}, gps_code = {repr(self._gps_code)}, ' + \
+               f'name = {repr(self._name)}, municipality = {repr(self._municipality)}, ' + \
+               f'country_id = {repr(self._country_id)}, page_size = {repr(self._page_size)}, ' + \
+               f'after_key = {repr(self._after_key)}, mode = {repr(self._mode)}, ' + \
+               f'ignore_case = {repr(self._ignore_case)}'
+
+
+
+class AirportSearchPageEvent:
+    def __init__(self, airports: list[Airport], after_key: str | None, next_key: str | None):
+        self._airports = airports
+        self._after_key = after_key
+        self._next_key = next_key
+
+
+    def airports(self) -> list[Airport]:
+        return self._airports
+
+
+    def after_key(self) -> str | None:
+        return self._after_key
+
+
+    def next_key(self) -> str | None:
+        return self._next_key
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: {len(self._airports)} airports, ' + \
+               f'after_key = {repr(self._after_key)}, next_key = {repr(self._next_key)}'
+
+
+
+class LoadAirportEvent:
+    def __init__(self, airport_id: int):
+        self._airport_id = airport_id
+
+
+    def airport_id(self) -> int:
+        return self._airport_id
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: airport_id = {repr(self._airport_id)}'
+
+
+
+class AirportLoadedEvent:
+    def __init__(
+            self, airport: Airport, runways: list[Runway] = (),
+            frequencies: list[AirportFrequency] = ()):
+        self._airport = airport
+        self._runways = runways
+        self._frequencies = frequencies
+
+
+    def airport(self) -> Airport:
+        return self._airport
+
+
+    def runways(self) -> list[Runway]:
+        return self._runways
+
+
+    def frequencies(self) -> list[AirportFrequency]:
+        return self._frequencies
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: airport = {repr(self._airport)}, ' + \
+               f'{len(self._runways)} runways, {len(self._frequencies)} frequencies'
+
+
+
+class SaveNewAirportEvent:
+    def __init__(self, airport: Airport):
+        self._airport = airport
+
+
+    def airport(self) -> Airport:
+        return self._airport
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: airport = {repr(self._airport)}'
+
+
+
+class SaveAirportEvent:
+    def __init__(self, airport: Airport):
+        self._airport = airport
+
+
+    def airport(self) -> Airport:
+        return self._airport
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: airport = {repr(self._airport)}'
+
+
+
+class AirportSavedEvent:
+    def __init__(self, airport: Airport):
+        self._airport = airport
+
+
+    def airport(self) -> Airport:
+        return self._airport
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: airport = {repr(self._airport)}'
+
+
+
+class SaveAirportFailedEvent:
+    def __init__(self, reason: str):
+        self._reason = reason
+
+
+    def reason(self) -> str:
+        return self._reason
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: reason = {repr(self._reason)}'
@@ -0,0 +1,60 @@
+# p2app/events/batches.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# Events that are related to grouping saves into one transaction, so that many
+# edits are committed to the database at once, or not at all.
+#
+# Every save sent between a BeginBatchEvent and a CommitBatchEvent is committed
+# when the batch is, while a RollbackBatchEvent undoes all of them.
+
+
+
+class BeginBatchEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class CommitBatchEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class RollbackBatchEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class BatchBegunEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class BatchCommittedEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class BatchRolledBackEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class BatchFailedEvent:
+    def __init__(self, reason: str):
+        self._reason = reason
+
+
+    def reason(self) -> str:
+        return self._reason
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: reason = {repr(self._reason)}'
@@ -11,6 +11,7 @@
 # YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
 
 from collections import namedtuple
+from .searching import EXACT_MATCH
 
 
 
@@ -25,9 +26,14 @@ Continent.__annotations__ = {
 
 
 class StartContinentSearchEvent:
-    def __init__(self, continent_code: str, name: str):
+    def __init__(
+            self, continent_code: str, name: str, limit: int | None = None,
+            mode: str = EXACT_MATCH, ignore_case: bool = False):
         self._continent_code = continent_code
         self._name = name
+        self._limit = limit
+        self._mode = mode
+        self._ignore_case = ignore_case
 
 
     def continent_code(self) -> str:
@@ -38,8 +44,22 @@ class StartContinentSearchEvent:
         return self._name
 
 
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def mode(self) -> str:
+        return self._mode
+
+
+    def ignore_case(self) -> bool:
+        return self._ignore_case
+
+
     def __repr__(self) -> str:
-        return f'{type(self).__name__}: continent_code = {repr(self._continent_code)}, name = {repr(self._name)}'
+        return f'{type(self).__name__}: continent_code = {repr(self._continent_code)}, ' + \
+               f'name = {repr(self._name)}, limit = {repr(self._limit)}, ' + \
+               f'mode = {repr(self._mode)}, ignore_case = {repr(self._ignore_case)}'
 
 
 
@@ -57,6 +77,92 @@ class ContinentSearchResultEvent:
 
 
 
+class ContinentSearchResultsBatchEvent:
+    def __init__(self, continents: list[Continent]):
+        self._continents = continents
+
+
+    def continents(self) -> list[Continent]:
+        return self._continents
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: {len(self._continents)} continents'
+
+
+
+# A page of continents holds the continents found by a search, ordered by their names
+# and then their IDs.  Each page begins after the one whose next_key, a continuation
+# token, is given as its after_key, with None meaning it's the first page.
+class StartContinentPageSearchEvent:
+    def __init__(
+            self, continent_code: str, name: str, page_size: int = 100,
+            after_key: str | None = None, mode: str = EXACT_MATCH, ignore_case: bool = False):
+        self._continent_code = continent_code
+        self._name = name
+        self._page_size = page_size
+        self._after_key = after_key
+        self._mode = mode
+        self._ignore_case = ignore_case
+
+
+    def continent_code(self) -> str:
+        return self._continent_code
+
+
+    def name(self) -> str:
+        return self._name
+
+
+    def page_size(self) -> int:
+        return self._page_size
+
+
+    def after_key(self) -> str | None:
+        return self._after_key
+
+
+    def mode(self) -> str:
+        return self._mode
+
+
+    def ignore_case(self) -> bool:
+        return self._ignore_case
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: continent_code = {repr(self._continent_code)}, ' + \
+               f'name = {repr(self._name)}, page_size = {repr(self._page_size)}, ' + \
+               f'after_key = {repr(self._after_key)}, mode = {repr(self._mode)}, ' + \
+               f'ignore_case = {repr(self._ignore_case)}'
+
+
+
+class ContinentSearchPageEvent:
+    def __init__(self, continents: list[Continent], after_key: str | None, next_key: str | None):
+        self._continents = continents
+        self._after_key = after_key
+        self._next_key = next_key
+
+
+    def continents(self) -> list[Continent]:
+        return self._continents
+
+
+    def after_key(self) -> str | None:
+        return self._after_key
+
+
+    def next_key(self) -> str | None:
+        return self._next_key
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: {len(self._continents)} continents, ' + \
+               f'after_key = {repr(self._after_key)}, next_key = {repr(self._next_key)}'
+
+
+
 class LoadContinentEvent:
     def __init__(self, continent_id: int):
         self._continent_id = continent_id
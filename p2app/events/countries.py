@@ -11,6 +11,7 @@
 # YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
 
 from collections import namedtuple
+from .searching import EXACT_MATCH
 
 
 
@@ -30,9 +31,14 @@ Country.__annotations__ = {
 
 
 class StartCountrySearchEvent:
-    def __init__(self, country_code: str, name: str):
+    def __init__(
+            self, country_code: str, name: str, limit: int | None = None,
+            mode: str = EXACT_MATCH, ignore_case: bool = False):
         self._country_code = country_code
         self._name = name
+        self._limit = limit
+        self._mode = mode
+        self._ignore_case = ignore_case
 
 
     def country_code(self) -> str:
@@ -43,8 +49,22 @@ class StartCountrySearchEvent:
         return self._name
 
 
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def mode(self) -> str:
+        return self._mode
+
+
+    def ignore_case(self) -> bool:
+        return self._ignore_case
+
+
     def __repr__(self) -> str:
-        return f'{type(self).__name__}: country_code = {repr(self._country_code)}, name = {repr(self._name)}'
+        return f'{type(self).__name__}: country_code = {repr(self._country_code)}, ' + \
+               f'name = {repr(self._name)}, limit = {repr(self._limit)}, ' + \
+               f'mode = {repr(self._mode)}, ignore_case = {repr(self._ignore_case)}'
 
 
 
@@ -62,6 +82,92 @@ class CountrySearchResultEvent:
 
 
 
+class CountrySearchResultsBatchEvent:
+    def __init__(self, countries: list[Country]):
+        self._countries = countries
+
+
+    def countries(self) -> list[Country]:
+        return self._countries
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: {len(self._countries)} countries'
+
+
+
+# A page of countries holds the countries found by a search, ordered by their names
+# and then their IDs.  Each page begins after the one whose next_key, a continuation
+# token, is given as its after_key, with None meaning it's the first page.
+class StartCountryPageSearchEvent:
+    def __init__(
+            self, country_code: str, name: str, page_size: int = 100,
+            after_key: str | None = None, mode: str = EXACT_MATCH, ignore_case: bool = False):
+        self._country_code = country_code
+        self._name = name
+        self._page_size = page_size
+        self._after_key = after_key
+        self._mode = mode
+        self._ignore_case = ignore_case
+
+
+    def country_code(self) -> str:
+        return self._country_code
+
+
+    def name(self) -> str:
+        return self._name
+
+
+    def page_size(self) -> int:
+        return self._page_size
+
+
+    def after_key(self) -> str | None:
+        return self._after_key
+
+
+    def mode(self) -> str:
+        return self._mode
+
+
+    def ignore_case(self) -> bool:
+        return self._ignore_case
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: country_code = {repr(self._country_code)}, ' + \
+               f'name = {repr(self._name)}, page_size = {repr(self._page_size)}, ' + \
+               f'after_key = {repr(self._after_key)}, mode = {repr(self._mode)}, ' + \
+               f'ignore_case = {repr(self._ignore_case)}'
+
+
+
+class CountrySearchPageEvent:
+    def __init__(self, countries: list[Country], after_key: str | None, next_key: str | None):
+        self._countries = countries
+        self._after_key = after_key
+        self._next_key = next_key
+
+
+    def countries(self) -> list[Country]:
+        return self._countries
+
+
+    def after_key(self) -> str | None:
+        return self._after_key
+
+
+    def next_key(self) -> str | None:
+        return self._next_key
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: {len(self._countries)} countries, ' + \
+               f'after_key = {repr(self._after_key)}, next_key = {repr(self._next_key)}'
+
+
+
 class LoadCountryEvent:
     def __init__(self, country_id: int):
         self._country_id = country_id
@@ -0,0 +1,27 @@
+# p2app/events/diagnostics.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# Events that are related to reporting on what the engine has been doing, such
+# as how often its caches have been able to answer without the database.
+
+
+
+class ReportEngineStatisticsEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class EngineStatisticsEvent:
+    def __init__(self, statistics: dict[str, int | float]):
+        self._statistics = statistics
+
+
+    def statistics(self) -> dict[str, int | float]:
+        return self._statistics
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: statistics = {repr(self._statistics)}'
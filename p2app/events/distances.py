@@ -0,0 +1,61 @@
+# p2app/events/distances.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# Events that are related to measuring the distance between every airport in
+# one selection of airports and every airport in another.
+#
+# A selection is a dictionary mapping airport columns to the values they must
+# have, where a list or tuple of values means the column may have any of them
+# (e.g., {'region_id': 42} or {'country_id': [12, 34]}), and an empty selection
+# means every airport.  The distances are delivered as NumPy arrays, a block of
+# rows at a time, and the event bus lets the engine get no more than a couple of
+# blocks ahead of the view, so that however many airports are selected, only a
+# few blocks of the matrix are held in memory at once.  No view sends these
+# events yet; they're meant for code that drives the engine through the bus.
+
+
+
+class StartDistanceMatrixEvent:
+    def __init__(self, from_selection: dict, to_selection: dict):
+        self._from_selection = from_selection
+        self._to_selection = to_selection
+
+
+    def from_selection(self) -> dict:
+        return self._from_selection
+
+
+    def to_selection(self) -> dict:
+        return self._to_selection
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: from_selection = {repr(self._from_selection)}, ' + \
+               f'to_selection = {repr(self._to_selection)}'
+
+
+
+class DistanceMatrixBlockEvent:
+    def __init__(self, from_airport_ids, to_airport_ids, distances_nm):
+        self._from_airport_ids = from_airport_ids
+        self._to_airport_ids = to_airport_ids
+        self._distances_nm = distances_nm
+
+
+    def from_airport_ids(self):
+        return self._from_airport_ids
+
+
+    def to_airport_ids(self):
+        return self._to_airport_ids
+
+
+    def distances_nm(self):
+        return self._distances_nm
+
+
+    def __repr__(self) -> str:
+        rows, columns = self._distances_nm.shape
+        return f'{type(self).__name__}: {rows} x {columns} distances'
@@ -10,8 +10,22 @@
 #   results routed back to the user interface.
 # * The user interface's internal events are routed back to the user interface
 #   to be processed, with the engine never seeing them.
-#
-# YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
+# * When the engine is grouping saves into one commit, they're committed once
+#   their window has passed without another event arriving.
+# * In debug mode, every event sent to the engine is traced to a trace file,
+#   which view_trace.py summarizes.  Since this bus hands each result to the view
+#   as soon as the engine produces it, the time it records for an event is only
+#   the time spent in the engine, leaving out the time the view spent handling
+#   the results in between.
+
+import logging
+import time
+from .app import ErrorEvent
+from .tracing import EventTracer
+
+
+
+_logger = logging.getLogger(__name__)
 
 
 
@@ -19,7 +33,9 @@ class EventBus:
     def __init__(self):
         self._view = None
         self._engine = None
-        self._is_debug_mode = False
+        self._trace_path = None
+        self._tracer = None
+        self._commit_id = None
 
 
     def register_view(self, view):
@@ -30,20 +46,73 @@ class EventBus:
         self._engine = engine
 
 
+    def set_trace_path(self, path):
+        """Sets the file that events are traced to in debug mode, whose suffix chooses
+        its format: JSON Lines if it's .jsonl, or binary otherwise"""
+        self._trace_path = path
+
+
     def enable_debug_mode(self):
-        self._is_debug_mode = True
+        if self._tracer is None:
+            path = self._trace_path or time.strftime('p2app-trace-%Y%m%d-%H%M%S.trace')
+
+            try:
+                self._tracer = EventTracer(path)
+                _logger.info('Tracing events to %s', path)
+            except OSError as e:
+                self._view.handle_event(ErrorEvent(f'Events cannot be traced to {path}: {e}'))
 
 
     def disable_debug_mode(self):
-        self._is_debug_mode = False
+        if self._tracer is not None:
+            self._tracer.close()
+            self._tracer = None
+
+
+    def statistics(self):
+        return {}
 
 
     def initiate_event(self, event):
-        if self._is_debug_mode:
-            print(f'Sent by view  : {event}')
+        tracer = self._tracer
+        sent_ns = time.perf_counter_ns()
+        engine_ns = 0
+        results = 0
 
-        for result_event in self._engine.process_event(event):
-            if self._is_debug_mode:
-                print(f'Sent by engine: {result_event}')
+        # Only the time spent asking the engine for each result is counted
+        step_started_ns = sent_ns
 
+        for result_event in self._engine.process_event(event):
+            engine_ns += time.perf_counter_ns() - step_started_ns
+            results += 1
             self._view.handle_event(result_event)
+            step_started_ns = time.perf_counter_ns()
+
+        engine_ns += time.perf_counter_ns() - step_started_ns
+
+        if tracer is not None:
+            tracer.record(event, sent_ns, sent_ns, sent_ns + engine_ns, results)
+
+        self._schedule_commit()
+
+
+    def _schedule_commit(self):
+        # With nothing left to do, the engine's grouped saves are committed once
+        # their window has passed, if another event hasn't committed them first
+        timeout = self._engine.seconds_until_commit()
+
+        if timeout is not None and self._commit_id is None:
+            self._commit_id = self._view.after(int(timeout * 1000) + 1, self._commit)
+
+
+    def _commit(self):
+        self._commit_id = None
+        timeout = self._engine.seconds_until_commit()
+
+        if timeout is not None and timeout > 0:
+            self._schedule_commit()
+        elif timeout is not None:
+            try:
+                self._engine.commit_pending_saves()
+            except Exception as e:
+                self._view.handle_event(ErrorEvent(e))
@@ -0,0 +1,84 @@
+# p2app/events/exporting.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# Events that are related to exporting the results of a search to a file.
+#
+# Any continent, country, region or airport search event can be exported, and a
+# search in which nothing is searched for exports every row of its table.  The
+# rows are written as they're fetched, so exporting a whole table takes no more
+# memory than exporting one row.  The formats are:
+#
+# * 'csv', with a header naming the columns
+# * 'jsonl', with one JSON object per row
+# * 'columnar', a compact binary file in which the rows are stored in groups,
+#   each column of a group stored and compressed together
+
+
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'columnar')
+
+
+
+class StartExportEvent:
+    def __init__(self, search_event, path: str, format: str = 'csv'):
+        self._search_event = search_event
+        self._path = path
+        self._format = format
+
+
+    def search_event(self):
+        return self._search_event
+
+
+    def path(self) -> str:
+        return self._path
+
+
+    def format(self) -> str:
+        return self._format
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: search_event = {repr(self._search_event)}, ' + \
+               f'path = {repr(self._path)}, format = {repr(self._format)}'
+
+
+
+class ExportedEvent:
+    def __init__(self, path: str, format: str, rows: int):
+        self._path = path
+        self._format = format
+        self._rows = rows
+
+
+    def path(self) -> str:
+        return self._path
+
+
+    def format(self) -> str:
+        return self._format
+
+
+    def rows(self) -> int:
+        return self._rows
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: path = {repr(self._path)}, ' + \
+               f'format = {repr(self._format)}, rows = {repr(self._rows)}'
+
+
+
+class ExportFailedEvent:
+    def __init__(self, reason: str):
+        self._reason = reason
+
+
+    def reason(self) -> str:
+        return self._reason
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: reason = {repr(self._reason)}'
@@ -0,0 +1,67 @@
+# p2app/events/fulltext.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# Events that are related to searching the names and keywords of countries,
+# regions and airports all at once, with the best matches coming first.
+
+from collections import namedtuple
+
+
+
+# The tables whose names and keywords a full-text search can search
+FULL_TEXT_SEARCH_TABLES = ('country', 'region', 'airport')
+
+
+
+FullTextSearchResult = namedtuple(
+    'FullTextSearchResult', ['table', 'record_id', 'name', 'rank'])
+
+FullTextSearchResult.__annotations__ = {
+    'table': str,
+    'record_id': int,
+    'name': str,
+    'rank': float
+}
+
+
+
+class StartFullTextSearchEvent:
+    def __init__(
+            self, text: str, tables: tuple[str, ...] = FULL_TEXT_SEARCH_TABLES,
+            limit: int | None = None):
+        self._text = text
+        self._tables = tables
+        self._limit = limit
+
+
+    def text(self) -> str:
+        return self._text
+
+
+    def tables(self) -> tuple[str, ...]:
+        return self._tables
+
+
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: text = {repr(self._text)}, ' + \
+               f'tables = {repr(self._tables)}, limit = {repr(self._limit)}'
+
+
+
+class FullTextSearchResultsBatchEvent:
+    def __init__(self, results: list[FullTextSearchResult]):
+        self._results = results
+
+
+    def results(self) -> list[FullTextSearchResult]:
+        return self._results
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: {len(self._results)} results'
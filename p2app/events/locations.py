@@ -0,0 +1,135 @@
+# p2app/events/locations.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# Events that are related to searching for airports, runways and navigation aids
+# by where they are, either within a bounding box or nearest to a point.
+
+from collections import namedtuple
+
+
+
+# The tables whose records can be searched for by location
+LOCATION_SEARCH_TABLES = ('airport', 'runway', 'navigation_aid')
+
+
+
+# A record found by location.  A runway's location is whichever of its ends is
+# nearest to the point searched from, or its low end when searching a bounding
+# box, where there's no point to measure distances from and distance_nm is None.
+# A navigation aid is identified by its navigation_aid_id, which is its record_id,
+# together with its filename, which is None for every other kind of record.
+LocationSearchResult = namedtuple(
+    'LocationSearchResult',
+    ['table', 'record_id', 'name', 'latitude_deg', 'longitude_deg', 'distance_nm', 'filename'],
+    defaults = [None])
+
+LocationSearchResult.__annotations__ = {
+    'table': str,
+    'record_id': int,
+    'name': str,
+    'latitude_deg': float,
+    'longitude_deg': float,
+    'distance_nm': float | None,
+    'filename': str | None
+}
+
+
+
+class StartNearestLocationSearchEvent:
+    def __init__(
+            self, table: str, latitude_deg: float, longitude_deg: float,
+            count: int | None = 10, max_distance_nm: float | None = None):
+        self._table = table
+        self._latitude_deg = latitude_deg
+        self._longitude_deg = longitude_deg
+        self._count = count
+        self._max_distance_nm = max_distance_nm
+
+
+    def table(self) -> str:
+        return self._table
+
+
+    def latitude_deg(self) -> float:
+        return self._latitude_deg
+
+
+    def longitude_deg(self) -> float:
+        return self._longitude_deg
+
+
+    def count(self) -> int | None:
+        return self._count
+
+
+    def max_distance_nm(self) -> float | None:
+        return self._max_distance_nm
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: table = {repr(self._table)}, ' + \
+               f'latitude_deg = {repr(self._latitude_deg)}, ' + \
+               f'longitude_deg = {repr(self._longitude_deg)}, count = {repr(self._count)}, ' + \
+               f'max_distance_nm = {repr(self._max_distance_nm)}'
+
+
+
+class StartBoundingBoxSearchEvent:
+    def __init__(
+            self, table: str, min_latitude_deg: float, min_longitude_deg: float,
+            max_latitude_deg: float, max_longitude_deg: float, limit: int | None = None):
+        self._table = table
+        self._min_latitude_deg = min_latitude_deg
+        self._min_longitude_deg = min_longitude_deg
+        self._max_latitude_deg = max_latitude_deg
+        self._max_longitude_deg = max_longitude_deg
+        self._limit = limit
+
+
+    def table(self) -> str:
+        return self._table
+
+
+    def min_latitude_deg(self) -> float:
+        return self._min_latitude_deg
+
+
+    def min_longitude_deg(self) -> float:
+        return self._min_longitude_deg
+
+
+    def max_latitude_deg(self) -> float:
+        return self._max_latitude_deg
+
+
+    def max_longitude_deg(self) -> float:
+        return self._max_longitude_deg
+
+
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: table = {repr(self._table)}, ' + \
+               f'min_latitude_deg = {repr(self._min_latitude_deg)}, ' + \
+               f'min_longitude_deg = {repr(self._min_longitude_deg)}, ' + \
+               f'max_latitude_deg = {repr(self._max_latitude_deg)}, ' + \
+               f'max_longitude_deg = {repr(self._max_longitude_deg)}, ' + \
+               f'limit = {repr(self._limit)}'
+
+
+
+class LocationSearchResultsBatchEvent:
+    def __init__(self, results: list[LocationSearchResult]):
+        self._results = results
+
+
+    def results(self) -> list[LocationSearchResult]:
+        return self._results
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: {len(self._results)} results'
@@ -0,0 +1,219 @@
+# p2app/events/navigation_aids.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# Events that are either related to searching for, creating, or editing
+# navigation aids in the database.
+#
+# The navigation_aid table has no primary key, and its navigation_aid_id isn't
+# unique on its own, so a navigation aid is identified by the combination of its
+# navigation_aid_id and its filename.  Searches find NavigationAidSummaries, which
+# hold the key along with the columns needed to list the navigation aids found;
+# loading one by its key gives the whole NavigationAid.
+
+from collections import namedtuple
+from .searching import EXACT_MATCH
+
+
+
+NavigationAid = namedtuple(
+    'NavigationAid',
+    ['navigation_aid_id', 'filename', 'ident', 'name', 'type', 'frequency_khz',
+     'latitude_deg', 'longitude_deg', 'elevation_ft', 'iso_country', 'dme_frequency_khz',
+     'dme_channel', 'dme_latitude_deg', 'dme_longitude_deg', 'dme_elevation_ft',
+     'adjusted_variation_deg', 'magnetic_variation_deg', 'usage_type', 'power', 'airport_id'])
+
+NavigationAid.__annotations__ = {
+    'navigation_aid_id': int | None,
+    'filename': str | None,
+    'ident': str | None,
+    'name': str | None,
+    'type': str | None,
+    'frequency_khz': int | None,
+    'latitude_deg': float | None,
+    'longitude_deg': float | None,
+    'elevation_ft': int | None,
+    'iso_country': str | None,
+    'dme_frequency_khz': int | None,
+    'dme_channel': str | None,
+    'dme_latitude_deg': float | None,
+    'dme_longitude_deg': float | None,
+    'dme_elevation_ft': int | None,
+    'adjusted_variation_deg': float | None,
+    'magnetic_variation_deg': float | None,
+    'usage_type': str | None,
+    'power': str | None,
+    'airport_id': int | None
+}
+
+
+
+NavigationAidSummary = namedtuple(
+    'NavigationAidSummary',
+    ['navigation_aid_id', 'filename', 'ident', 'name', 'type', 'iso_country', 'airport_id'])
+
+NavigationAidSummary.__annotations__ = {
+    'navigation_aid_id': int,
+    'filename': str,
+    'ident': str,
+    'name': str,
+    'type': str,
+    'iso_country': str,
+    'airport_id': int | None
+}
+
+
+
+class StartNavigationAidSearchEvent:
+    def __init__(
+            self, ident: str | None = None, type: str | None = None,
+            iso_country: str | None = None, airport_id: int | None = None,
+            limit: int | None = None, mode: str = EXACT_MATCH, ignore_case: bool = False):
+        self._ident = ident
+        self._type = type
+        self._iso_country = iso_country
+        self._airport_id = airport_id
+        self._limit = limit
+        self._mode = mode
+        self._ignore_case = ignore_case
+
+
+    def ident(self) -> str | None:
+        return self._ident
+
+
+    def type(self) -> str | None:
+        return self._type
+
+
+    def iso_country(self) -> str | None:
+        return self._iso_country
+
+
+    def airport_id(self) -> int | None:
+        return self._airport_id
+
+
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def mode(self) -> str:
+        return self._mode
+
+
+    def ignore_case(self) -> bool:
+        return self._ignore_case
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: ident = {repr(self._ident)}, ' + \
+               f'type = {repr(self._type)}, iso_country = {repr(self._iso_country)}, ' + \
+               f'airport_id = {repr(self._airport_id)}, limit = {repr(self._limit)}, ' + \
+               f'mode = {repr(self._mode)}, ignore_case = {repr(self._ignore_case)}'
+
+
+
+class NavigationAidSearchResultsBatchEvent:
+    def __init__(self, navigation_aids: list[NavigationAidSummary]):
+        self._navigation_aids = navigation_aids
+
+
+    def navigation_aids(self) -> list[NavigationAidSummary]:
+        return self._navigation_aids
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: {len(self._navigation_aids)} navigation aids'
+
+
+
+class LoadNavigationAidEvent:
+    def __init__(self, navigation_aid_id: int, filename: str):
+        self._navigation_aid_id = navigation_aid_id
+        self._filename = filename
+
+
+    def navigation_aid_id(self) -> int:
+        return self._navigation_aid_id
+
+
+    def filename(self) -> str:
+        return self._filename
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: ' + \
+               f'navigation_aid_id = {repr(self._navigation_aid_id)}, ' + \
+               f'filename = {repr(self._filename)}'
+
+
+
+class NavigationAidLoadedEvent:
+    def __init__(self, navigation_aid: NavigationAid):
+        self._navigation_aid = navigation_aid
+
+
+    def navigation_aid(self) -> NavigationAid:
+        return self._navigation_aid
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: navigation_aid = {repr(self._navigation_aid)}'
+
+
+
+class SaveNewNavigationAidEvent:
+    def __init__(self, navigation_aid: NavigationAid):
+        self._navigation_aid = navigation_aid
+
+
+    def navigation_aid(self) -> NavigationAid:
+        return self._navigation_aid
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: navigation_aid = {repr(self._navigation_aid)}'
+
+
+
+class SaveNavigationAidEvent:
+    def __init__(self, navigation_aid: NavigationAid):
+        self._navigation_aid = navigation_aid
+
+
+    def navigation_aid(self) -> NavigationAid:
+        return self._navigation_aid
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: navigation_aid = {repr(self._navigation_aid)}'
+
+
+
+class NavigationAidSavedEvent:
+    def __init__(self, navigation_aid: NavigationAid):
+        self._navigation_aid = navigation_aid
+
+
+    def navigation_aid(self) -> NavigationAid:
+        return self._navigation_aid
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: navigation_aid = {repr(self._navigation_aid)}'
+
+
+
+class SaveNavigationAidFailedEvent:
+    def __init__(self, reason: str):
+        self._reason = reason
+
+
+    def reason(self) -> str:
+        return self._reason
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: reason = {repr(self._reason)}'
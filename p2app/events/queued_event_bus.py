@@ -0,0 +1,343 @@
+# p2app/events/queued_event_bus.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# An event bus that runs the engine on the user interface's own thread, but never
+# for longer than it takes to produce one batch of results, so that a handler
+# yielding a flood of results can't keep the window from redrawing.
+#
+# * Events sent by the view are queued rather than processed right away, then
+#   processed one at a time, in the order they were sent, by a pump that runs
+#   from the tkinter mainloop with after().  The queue has a fixed capacity, which
+#   only searches are held to; every other event, such as a save or the user
+#   quitting, is always queued.  When a search finds the queue full, the searches
+#   it and earlier ones superseded are dropped from it to make room, and if there's
+#   still none, the search is rejected, with an ErrorEvent sent to the view in its
+#   place.
+# * The results are held in a ring buffer of a fixed capacity.  Each time the
+#   pump runs, it hands the view a batch of them, then advances the engine until
+#   the buffer is full again or its share of the frame has been spent.  Once the
+#   buffer is full, the engine isn't advanced again until the view has drained a
+#   batch, so it can never get further ahead of the view than the buffer holds.
+# * As with ThreadedEventBus, a search sent while an earlier search of the same
+#   kind is still queued or running supersedes it, so the earlier one stops and
+#   whatever results it hasn't yet delivered are dropped.  Since the engine runs
+#   on this same thread, a superseded search can only be stopped between its
+#   results, so one that's slow to produce a single result still holds up the
+#   user interface until it does; ThreadedEventBus, which can interrupt the
+#   engine's query from another thread, doesn't have that limitation.
+# * The bus measures how deep its queue and buffer get, and how long each event
+#   takes from being sent to being fully processed.
+
+import collections
+import time
+from .app import EndApplicationEvent, ErrorEvent
+from .event_bus import EventBus
+from .threaded_event_bus import SUPERSEDABLE_EVENT_TYPES
+
+
+
+# How many events can be queued by default
+DEFAULT_QUEUE_CAPACITY = 256
+
+# How many results the buffer can hold by default
+DEFAULT_BUFFER_CAPACITY = 64
+
+# How many results are handed to the view each time the pump runs, by default
+DEFAULT_DRAIN_BATCH_SIZE = 16
+
+# How long, in seconds, the engine is advanced for each time the pump runs, which
+# leaves most of a 60 frames per second frame for the user interface
+_ENGINE_SECONDS_PER_PUMP = 0.008
+
+
+
+class _RingBuffer:
+    def __init__(self, capacity):
+        self._items = [None] * capacity
+        self._first = 0
+        self._length = 0
+
+
+    def __len__(self):
+        return self._length
+
+
+    def is_full(self):
+        return self._length == len(self._items)
+
+
+    def put(self, item):
+        if self.is_full():
+            raise OverflowError('The ring buffer is full')
+
+        self._items[(self._first + self._length) % len(self._items)] = item
+        self._length += 1
+
+
+    def get(self):
+        if self._length == 0:
+            raise IndexError('The ring buffer is empty')
+
+        item = self._items[self._first]
+        self._items[self._first] = None
+        self._first = (self._first + 1) % len(self._items)
+        self._length -= 1
+        return item
+
+
+
+# What the bus knows about an event it's processing or has queued
+_Request = collections.namedtuple(
+    '_Request', ['request_id', 'event_type', 'event', 'sent_ns'])
+
+
+
+class QueuedEventBus(EventBus):
+    def __init__(
+            self, buffer_capacity = DEFAULT_BUFFER_CAPACITY,
+            drain_batch_size = DEFAULT_DRAIN_BATCH_SIZE, queue_capacity = DEFAULT_QUEUE_CAPACITY):
+        super().__init__()
+        self._requests = collections.deque()
+        self._queue_capacity = queue_capacity
+        self._results = _RingBuffer(buffer_capacity)
+        self._drain_batch_size = drain_batch_size
+        self._running = None
+        self._running_results = None
+        self._running_started_ns = None
+        self._running_result_count = 0
+        self._next_request_id = 0
+        self._latest_request_ids = {}
+        self._pump_id = None
+        self._commit_id = None
+        self._is_stopped = False
+
+        self._most_queued_events = 0
+        self._dropped_events = 0
+        self._rejected_events = 0
+        self._most_buffered_results = 0
+        self._delivered_results = 0
+        self._dropped_results = 0
+        self._latencies = {}
+
+
+    def initiate_event(self, event):
+        event_type = type(event) if isinstance(event, SUPERSEDABLE_EVENT_TYPES) else None
+
+        # Only searches, which can be superseded anyway, can be turned away
+        if event_type is not None and len(self._requests) >= self._queue_capacity:
+            self._drop_superseded_requests(event_type)
+
+        if event_type is not None and len(self._requests) >= self._queue_capacity:
+            self._rejected_events += 1
+            self._view.handle_event(ErrorEvent(
+                f'{type(event).__name__} was rejected because at least '
+                f'{self._queue_capacity} events are already waiting to be processed'))
+            return
+
+        self._next_request_id += 1
+
+        if event_type is not None:
+            self._latest_request_ids[event_type] = self._next_request_id
+
+        self._requests.append(
+            _Request(self._next_request_id, event_type, event, time.perf_counter_ns()))
+
+        self._most_queued_events = max(self._most_queued_events, len(self._requests))
+        self._schedule_pump(0)
+
+
+    def stop(self):
+        """Stops processing events, abandoning whatever events and results are waiting"""
+        self._is_stopped = True
+
+        if self._running_results is not None:
+            self._running_results.close()
+            self._running_results = None
+
+        for after_id in (self._pump_id, self._commit_id):
+            if after_id is not None:
+                self._view.after_cancel(after_id)
+
+        self._pump_id = None
+        self._commit_id = None
+
+
+    def statistics(self):
+        """Returns how deep the bus's queue and buffer are and have been, how many
+        events it has dropped from the queue or rejected, how many results it has
+        delivered or dropped, and how long events have taken, in milliseconds, from
+        being sent to being fully processed"""
+        counts = [count for count, _, _ in self._latencies.values()]
+        totals = [total for _, total, _ in self._latencies.values()]
+        longest = [most for _, _, most in self._latencies.values()]
+
+        return {
+            'queued events': len(self._requests),
+            'queue capacity': self._queue_capacity,
+            'most queued events': self._most_queued_events,
+            'dropped events': self._dropped_events,
+            'rejected events': self._rejected_events,
+            'buffered results': len(self._results),
+            'most buffered results': self._most_buffered_results,
+            'delivered results': self._delivered_results,
+            'dropped results': self._dropped_results,
+            'processed events': sum(counts),
+            'mean event latency (ms)': round(sum(totals) / max(sum(counts), 1) * 1000, 3),
+            'longest event latency (ms)': round(max(longest, default = 0) * 1000, 3)
+        }
+
+
+    def event_latencies(self):
+        """Returns a dictionary mapping the name of each type of event processed so
+        far to how many there have been, and their mean and longest latencies, in
+        milliseconds"""
+        return {
+            event_type.__name__: (count, round(total / count * 1000, 3), round(most * 1000, 3))
+            for event_type, (count, total, most) in self._latencies.items()
+        }
+
+
+    def _is_stale(self, request):
+        return request.event_type is not None \
+            and self._latest_request_ids[request.event_type] != request.request_id
+
+
+    def _drop_superseded_requests(self, event_type):
+        """Drops the queued requests that have been superseded, along with those that
+        an event of the given type is about to supersede"""
+        requests = [
+            request for request in self._requests
+            if not self._is_stale(request)
+                and (event_type is None or request.event_type is not event_type)
+        ]
+
+        self._dropped_events += len(self._requests) - len(requests)
+        self._requests = collections.deque(requests)
+
+
+    def _schedule_pump(self, delay):
+        if self._pump_id is None and not self._is_stopped:
+            self._pump_id = self._view.after(delay, self._pump)
+
+
+    def _pump(self):
+        self._pump_id = None
+
+        # Handing the view one batch of results, which makes room in the buffer
+        for _ in range(min(self._drain_batch_size, len(self._results))):
+            self._deliver(*self._results.get())
+
+            if self._is_stopped:
+                return
+
+        # Advancing the engine to fill the room that was made, for as long as its
+        # share of the frame allows
+        deadline = time.perf_counter() + _ENGINE_SECONDS_PER_PUMP
+
+        while not self._results.is_full() and self._advance():
+            if time.perf_counter() >= deadline:
+                break
+
+        if len(self._results) > 0 or self._running is not None or self._requests:
+            self._schedule_pump(1)
+        else:
+            self._schedule_commit()
+
+
+    def _advance(self):
+        """Asks the engine for the next result, beginning the next queued event if
+        none is running, and buffers it, returning False if there was nothing to do"""
+        while self._running is None:
+            if not self._requests:
+                return False
+
+            request = self._requests.popleft()
+
+            # A search superseded while it waited in the queue is never begun
+            if not self._is_stale(request):
+                self._running = request
+                self._running_results = self._engine.process_event(request.event)
+                self._running_started_ns = time.perf_counter_ns()
+                self._running_result_count = 0
+
+        request = self._running
+
+        # A superseded search stops running, rather than producing results that
+        # would only be thrown away
+        if self._is_stale(request):
+            self._finish_running()
+            return True
+
+        try:
+            result_event = next(self._running_results)
+        except StopIteration:
+            self._finish_running()
+            return True
+        except Exception as e:
+            self._finish_running()
+            result_event = ErrorEvent(e)
+
+        self._results.put((request, result_event))
+        self._running_result_count += 1
+        self._most_buffered_results = max(self._most_buffered_results, len(self._results))
+        return True
+
+
+    def _finish_running(self):
+        request = self._running
+        self._running_results.close()
+        self._running = None
+        self._running_results = None
+
+        finished_ns = time.perf_counter_ns()
+
+        if self._tracer is not None:
+            self._tracer.record(
+                request.event, request.sent_ns, self._running_started_ns, finished_ns,
+                self._running_result_count)
+
+        latency = (finished_ns - request.sent_ns) / 1e9
+        event_type = type(request.event)
+        count, total, most = self._latencies.get(event_type, (0, 0.0, 0.0))
+        self._latencies[event_type] = (count + 1, total + latency, max(most, latency))
+
+
+    def _deliver(self, request, result_event):
+        if self._is_stale(request):
+            self._dropped_results += 1
+            return
+
+        if isinstance(result_event, EndApplicationEvent):
+            self.stop()
+
+        self._delivered_results += 1
+        self._view.handle_event(result_event)
+
+
+    def _schedule_commit(self):
+        # With nothing left to do, the engine's grouped saves are committed once
+        # their window has passed, if another event hasn't committed them first
+        timeout = self._engine.seconds_until_commit()
+
+        if timeout is not None and self._commit_id is None and not self._is_stopped:
+            self._commit_id = self._view.after(int(timeout * 1000) + 1, self._commit)
+
+
+    def _commit(self):
+        self._commit_id = None
+
+        # An event being processed leaves the commit to the pump, once it's done
+        if self._running is not None or self._requests:
+            return
+
+        timeout = self._engine.seconds_until_commit()
+
+        if timeout is not None and timeout > 0:
+            self._schedule_commit()
+        elif timeout is not None:
+            try:
+                self._engine.commit_pending_saves()
+            except Exception as e:
+                self._view.handle_event(ErrorEvent(e))
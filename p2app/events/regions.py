@@ -11,6 +11,7 @@
 # YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
 
 from collections import namedtuple
+from .searching import EXACT_MATCH
 
 
 
@@ -33,10 +34,15 @@ Region.__annotations__ = {
 
 
 class StartRegionSearchEvent:
-    def __init__(self, region_code: str, local_code: str, name: str):
+    def __init__(
+            self, region_code: str, local_code: str, name: str, limit: int | None = None,
+            mode: str = EXACT_MATCH, ignore_case: bool = False):
         self._region_code = region_code
         self._local_code = local_code
         self._name = name
+        self._limit = limit
+        self._mode = mode
+        self._ignore_case = ignore_case
 
 
     def region_code(self) -> str:
@@ -51,9 +57,23 @@ class StartRegionSearchEvent:
         return self._name
 
 
+    def limit(self) -> int | None:
+        return self._limit
+
+
+    def mode(self) -> str:
+        return self._mode
+
+
+    def ignore_case(self) -> bool:
+        return self._ignore_case
+
+
     def __repr__(self) -> str:
         return f'{type(self).__name__}: region_code = {repr(self._region_code)}, ' + \
-               f'local_name = {repr(self._local_code)}, name = {repr(self._name)}'
+               f'local_name = {repr(self._local_code)}, name = {repr(self._name)}, ' + \
+               f'limit = {repr(self._limit)}, mode = {repr(self._mode)}, ' + \
+               f'ignore_case = {repr(self._ignore_case)}'
 
 
 
@@ -71,6 +91,98 @@ class RegionSearchResultEvent:
 
 
 
+class RegionSearchResultsBatchEvent:
+    def __init__(self, regions: list[Region]):
+        self._regions = regions
+
+
+    def regions(self) -> list[Region]:
+        return self._regions
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: {len(self._regions)} regions'
+
+
+
+# A page of regions holds the regions found by a search, ordered by their names
+# and then their IDs.  Each page begins after the one whose next_key, a continuation
+# token, is given as its after_key, with None meaning it's the first page.
+class StartRegionPageSearchEvent:
+    def __init__(
+            self, region_code: str, local_code: str, name: str, page_size: int = 100,
+            after_key: str | None = None, mode: str = EXACT_MATCH, ignore_case: bool = False):
+        self._region_code = region_code
+        self._local_code = local_code
+        self._name = name
+        self._page_size = page_size
+        self._after_key = after_key
+        self._mode = mode
+        self._ignore_case = ignore_case
+
+
+    def region_code(self) -> str:
+        return self._region_code
+
+
+    def local_code(self) -> str:
+        return self._local_code
+
+
+    def name(self) -> str:
+        return self._name
+
+
+    def page_size(self) -> int:
+        return self._page_size
+
+
+    def after_key(self) -> str | None:
+        return self._after_key
+
+
+    def mode(self) -> str:
+        return self._mode
+
+
+    def ignore_case(self) -> bool:
+        return self._ignore_case
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: region_code = {repr(self._region_code)}, ' + \
+               f'local_code = {repr(self._local_code)}, name = {repr(self._name)}, ' + \
+               f'page_size = {repr(self._page_size)}, ' + \
+               f'after_key = {repr(self._after_key)}, mode = {repr(self._mode)}, ' + \
+               f'ignore_case = {repr(self._ignore_case)}'
+
+
+
+class RegionSearchPageEvent:
+    def __init__(self, regions: list[Region], after_key: str | None, next_key: str | None):
+        self._regions = regions
+        self._after_key = after_key
+        self._next_key = next_key
+
+
+    def regions(self) -> list[Region]:
+        return self._regions
+
+
+    def after_key(self) -> str | None:
+        return self._after_key
+
+
+    def next_key(self) -> str | None:
+        return self._next_key
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: {len(self._regions)} regions, ' + \
+               f'after_key = {repr(self._after_key)}, next_key = {repr(self._next_key)}'
+
+
+
 class LoadRegionEvent:
     def __init__(self, region_id: int):
         self._region_id = region_id
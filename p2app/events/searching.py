@@ -0,0 +1,21 @@
+# p2app/events/searching.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# The ways in which the search events can match the values they search for.
+#
+# * EXACT_MATCH finds the values that are equal to the one searched for.
+# * PREFIX_MATCH finds the values that begin with the one searched for.
+# * SUBSTRING_MATCH finds the values that contain the one searched for.
+#
+# Any of these can also be made to ignore the difference between upper and
+# lower case letters.
+
+
+
+EXACT_MATCH = 'exact'
+PREFIX_MATCH = 'prefix'
+SUBSTRING_MATCH = 'contains'
+
+SEARCH_MODES = (EXACT_MATCH, PREFIX_MATCH, SUBSTRING_MATCH)
@@ -0,0 +1,284 @@
+# p2app/events/threaded_event_bus.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# An event bus that runs the engine on a worker thread of its own, so that a
+# slow query never blocks the user interface.
+#
+# * Events sent by the view are queued for the worker thread, which passes them
+#   to the engine one at a time.  Because the engine opens the database while
+#   handling an OpenDatabaseEvent, its connection belongs to the worker thread.
+# * The engine's results are queued for the user interface, which picks them up
+#   by polling the queue with after(), so the view is only ever touched from the
+#   thread running the tkinter mainloop.  The queue holds a limited number of
+#   results, and only a couple of bulky ones, such as the blocks of a distance
+#   matrix; once it's full, the worker thread waits for the user interface to
+#   catch up, so the engine can never get far ahead of the view.
+# * Every event is given a request ID.  When a search is started while an earlier
+#   search of the same kind is still running, the earlier search is superseded,
+#   and whatever results it hasn't yet delivered are dropped.  If the engine is in
+#   the middle of running it, its query is interrupted, and if it hasn't begun, it
+#   never does.
+# * When the engine is grouping saves into one commit, the worker thread asks it
+#   to commit them once their window has passed without another event arriving.
+#   It also commits them before beginning a search that could be superseded, so
+#   that interrupting the search can never interrupt the commit, and a commit
+#   that fails is always reported, whichever search was running.
+
+import queue
+import threading
+import time
+from .airports import StartAirportSearchEvent, StartAirportPageSearchEvent
+from .app import EndApplicationEvent, ErrorEvent
+from .continents import StartContinentSearchEvent, StartContinentPageSearchEvent
+from .countries import StartCountrySearchEvent, StartCountryPageSearchEvent
+from .distances import StartDistanceMatrixEvent, DistanceMatrixBlockEvent
+from .event_bus import EventBus
+from .fulltext import StartFullTextSearchEvent
+from .locations import StartNearestLocationSearchEvent, StartBoundingBoxSearchEvent
+from .navigation_aids import StartNavigationAidSearchEvent
+from .regions import StartRegionSearchEvent, StartRegionPageSearchEvent
+
+
+
+# Events whose results are superseded by a later event of the same type
+SUPERSEDABLE_EVENT_TYPES = (
+    StartContinentSearchEvent, StartCountrySearchEvent, StartRegionSearchEvent,
+    StartAirportSearchEvent, StartFullTextSearchEvent, StartNearestLocationSearchEvent,
+    StartBoundingBoxSearchEvent, StartDistanceMatrixEvent, StartNavigationAidSearchEvent,
+    StartContinentPageSearchEvent, StartCountryPageSearchEvent, StartRegionPageSearchEvent,
+    StartAirportPageSearchEvent
+)
+
+# How often, in milliseconds, the user interface checks for results
+_POLL_INTERVAL_MILLISECONDS = 20
+
+# How many results are handed to the view each time it checks, so that a flood of
+# results can't keep the mainloop from redrawing the window
+_MAX_RESULTS_PER_POLL = 64
+
+# How many results can be waiting for the user interface before the worker thread
+# waits for it to catch up
+_MAX_QUEUED_RESULTS = 256
+
+# Results that are large enough that only a few of them can be waiting at once,
+# and how many that is
+_BULKY_RESULT_TYPES = (DistanceMatrixBlockEvent,)
+_MAX_QUEUED_BULKY_RESULTS = 2
+
+# How often, in seconds, the worker thread checks whether it should give up
+# waiting for room in the results queue, because it's stopping or the event it
+# was processing has been superseded
+_QUEUE_WAIT_SECONDS = 0.05
+
+# The value queued to ask the worker thread to stop
+_STOP = None
+
+# The value standing in for a request that didn't arrive before the engine's
+# grouped saves were due to be committed
+_NO_REQUEST = object()
+
+
+
+class ThreadedEventBus(EventBus):
+    def __init__(self):
+        super().__init__()
+        self._requests = queue.SimpleQueue()
+        self._results = queue.Queue(maxsize = _MAX_QUEUED_RESULTS)
+        self._bulky_results = threading.BoundedSemaphore(_MAX_QUEUED_BULKY_RESULTS)
+        self._worker = None
+        self._is_stopping = None
+        self._next_request_id = 0
+        self._latest_request_ids = {}
+        self._is_polling = False
+
+        # The type of the supersedable event the worker thread is processing, if
+        # any, which it changes only while holding the lock
+        self._running_event_type = None
+        self._running_lock = threading.Lock()
+
+
+    def register_view(self, view):
+        super().register_view(view)
+        self._is_polling = True
+        self._view.after(_POLL_INTERVAL_MILLISECONDS, self._poll)
+
+
+    def initiate_event(self, event):
+        sent_ns = time.perf_counter_ns()
+        self._next_request_id += 1
+        request_id = self._next_request_id
+        supersedes = isinstance(event, SUPERSEDABLE_EVENT_TYPES)
+
+        if supersedes:
+            self._latest_request_ids[type(event)] = request_id
+            self._interrupt_superseded(type(event))
+
+        self._start_worker()
+        self._requests.put((request_id, supersedes, event, sent_ns))
+
+
+    def stop(self):
+        """Asks the worker thread to stop once it has finished its current event"""
+        if self._worker is not None:
+            self._requests.put(_STOP)
+            self._is_stopping.set()
+            self._worker = None
+
+        self._is_polling = False
+
+
+    def _is_stale(self, request_id, event_type):
+        return self._latest_request_ids.get(event_type, request_id) != request_id
+
+
+    def _interrupt_superseded(self, event_type):
+        # Holding the lock ensures the engine is still running the superseded event,
+        # rather than one that came after it, when its query is interrupted
+        with self._running_lock:
+            if self._running_event_type is event_type:
+                self._engine.interrupt()
+
+
+    def _start_worker(self):
+        if self._worker is None:
+            self._is_stopping = threading.Event()
+            self._worker = threading.Thread(
+                target = self._process_requests, args = (self._is_stopping,),
+                name = 'engine', daemon = True)
+
+            self._worker.start()
+
+
+    def _process_requests(self, is_stopping):
+        while (request := self._next_request(is_stopping)) is not _STOP:
+            if request is _NO_REQUEST:
+                continue
+
+            request_id, supersedes, event, sent_ns = request
+            event_type = type(event) if supersedes else None
+
+            # A search superseded while it waited in the queue is never begun
+            if supersedes and self._is_stale(request_id, event_type):
+                continue
+
+            # The grouped saves are committed before the search can be interrupted,
+            # rather than by the engine once it has begun, so that they're committed
+            # a little early instead of risking being rolled back
+            if supersedes:
+                self._commit_pending_saves(is_stopping)
+
+            with self._running_lock:
+                self._running_event_type = event_type
+
+            tracer = self._tracer
+            started_ns = time.perf_counter_ns()
+            results = 0
+            result_events = self._engine.process_event(event)
+
+            try:
+                for result_event in result_events:
+                    # A superseded search stops running, rather than producing
+                    # results that would only be thrown away, including the error
+                    # that reports its query being interrupted
+                    if supersedes and self._is_stale(request_id, event_type):
+                        break
+
+                    if not self._put_result(request_id, event_type, result_event, is_stopping):
+                        break
+
+                    results += 1
+            except Exception as e:
+                self._put_result(request_id, event_type, ErrorEvent(e), is_stopping)
+            finally:
+                result_events.close()
+
+                with self._running_lock:
+                    self._running_event_type = None
+
+                if tracer is not None:
+                    tracer.record(event, sent_ns, started_ns, time.perf_counter_ns(), results)
+
+
+    def _put_result(self, request_id, event_type, result_event, is_stopping):
+        """Queues a result for the user interface, waiting until there's room for it,
+        and returns True, or returns False if the bus stopped or the event was
+        superseded while waiting"""
+        def is_abandoned():
+            return is_stopping.is_set() \
+                or (event_type is not None and self._is_stale(request_id, event_type))
+
+        is_bulky = isinstance(result_event, _BULKY_RESULT_TYPES)
+
+        if is_bulky:
+            while not self._bulky_results.acquire(timeout = _QUEUE_WAIT_SECONDS):
+                if is_abandoned():
+                    return False
+
+        while True:
+            try:
+                self._results.put(
+                    (request_id, event_type, result_event), timeout = _QUEUE_WAIT_SECONDS)
+                return True
+            except queue.Full:
+                if is_abandoned():
+                    if is_bulky:
+                        self._bulky_results.release()
+
+                    return False
+
+
+    def _next_request(self, is_stopping):
+        # Waiting for the next request only as long as the engine's grouped saves
+        # can wait, committing them if it doesn't arrive in time
+        timeout = self._engine.seconds_until_commit()
+
+        try:
+            return self._requests.get(timeout = None if timeout is None else max(timeout, 0))
+        except queue.Empty:
+            self._commit_pending_saves(is_stopping)
+            return _NO_REQUEST
+
+
+    def _commit_pending_saves(self, is_stopping):
+        # A failure belongs to no request, so it's delivered whatever has been superseded
+        if self._engine.seconds_until_commit() is None:
+            return
+
+        try:
+            self._engine.commit_pending_saves()
+        except Exception as e:
+            self._put_result(None, None, ErrorEvent(e), is_stopping)
+
+
+    def _poll(self):
+        if not self._is_polling:
+            return
+
+        delay = _POLL_INTERVAL_MILLISECONDS
+
+        for _ in range(_MAX_RESULTS_PER_POLL):
+            try:
+                request_id, event_type, result_event = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            if isinstance(result_event, _BULKY_RESULT_TYPES):
+                self._bulky_results.release()
+
+            if event_type is not None and self._is_stale(request_id, event_type):
+                continue
+
+            if isinstance(result_event, EndApplicationEvent):
+                self.stop()
+
+            self._view.handle_event(result_event)
+
+            if not self._is_polling:
+                return
+        else:
+            # There may be more results waiting, so check again right away
+            delay = 1
+
+        self._view.after(delay, self._poll)
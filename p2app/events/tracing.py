@@ -0,0 +1,234 @@
+# p2app/events/tracing.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# Records which events the engine was sent, when, how long it took to handle
+# them and how many results it produced, cheaply enough to leave on while the
+# application is being used.
+#
+# * Recording an event only stores its type's name, three timestamps and a count
+#   into the next slot of a ring buffer that's allocated once, so it never formats
+#   the event or touches a file, and costs about a microsecond.
+# * A thread of the tracer's own flushes the records to the trace file every so
+#   often.  If the records ever come faster than it can write them, the oldest
+#   ones are overwritten, and the file says how many were lost.
+# * A trace file is either JSON Lines, one object per line, or a binary format
+#   that's smaller and faster to write.  Both begin with a header relating the
+#   timestamps, which are from time.perf_counter_ns(), to the wall clock.
+#
+# The binary format begins with the magic bytes and the header's two 64-bit
+# integers.  Each record after that begins with a byte saying what kind it is: an
+# event record holds its three timestamps as 64-bit integers, its count of results
+# as a 32-bit integer, then the length and UTF-8 bytes of the event type's name,
+# while a gap record holds the number of records that were lost as a 64-bit
+# integer.  Every number is little-endian.
+
+import atexit
+import collections
+import json
+import struct
+import threading
+import time
+
+
+
+# How many records the ring buffer holds by default
+DEFAULT_TRACE_CAPACITY = 65536
+
+# How often, in seconds, the records are flushed to the trace file by default
+DEFAULT_FLUSH_SECONDS = 0.5
+
+TRACE_FORMATS = ('jsonl', 'binary')
+
+TRACE_MAGIC = b'P2TRACE1'
+
+_HEADER = struct.Struct('<qq')
+_EVENT_RECORD = struct.Struct('<qqqIH')
+_GAP_RECORD = struct.Struct('<Q')
+_EVENT_KIND = b'E'
+_GAP_KIND = b'G'
+
+
+
+# One event that the engine was sent: the name of its type, when it was sent,
+# when the engine began handling it and when it finished, in nanoseconds, and
+# how many results the engine produced
+TraceRecord = collections.namedtuple(
+    'TraceRecord', ['event_type', 'sent_ns', 'started_ns', 'finished_ns', 'results'])
+
+# A number of records that were lost because they weren't flushed in time
+TraceGap = collections.namedtuple('TraceGap', ['records'])
+
+
+
+def trace_format(path):
+    """Returns the format of a trace file, which is chosen by its suffix"""
+    return 'jsonl' if str(path).lower().endswith('.jsonl') else 'binary'
+
+
+
+class EventTracer:
+    def __init__(
+            self, path, format = None, capacity = DEFAULT_TRACE_CAPACITY,
+            flush_seconds = DEFAULT_FLUSH_SECONDS):
+        self._path = path
+        self._format = format or trace_format(path)
+
+        if self._format not in TRACE_FORMATS:
+            raise ValueError(f'Unknown trace format: {self._format!r}')
+
+        self._slots = [None] * capacity
+        self._recorded = 0
+        self._flushed = 0
+        self._lock = threading.Lock()
+
+        if self._format == 'jsonl':
+            self._file = open(path, 'w', encoding = 'utf-8')
+        else:
+            self._file = open(path, 'wb')
+        self._write_header(time.time_ns(), time.perf_counter_ns())
+
+        self._flush_seconds = flush_seconds
+        self._is_closing = threading.Event()
+        self._flusher = threading.Thread(
+            target = self._flush_periodically, name = 'tracer', daemon = True)
+
+        self._flusher.start()
+        atexit.register(self.close)
+
+
+    def path(self):
+        return self._path
+
+
+    def record(self, event, sent_ns, started_ns, finished_ns, results):
+        """Records that an event, sent at the first of the given times, was handled
+        by the engine between the other two, producing the given number of results"""
+        record = (type(event).__name__, sent_ns, started_ns, finished_ns, results)
+
+        with self._lock:
+            self._slots[self._recorded % len(self._slots)] = record
+            self._recorded += 1
+
+
+    def close(self):
+        """Stops the flushing thread, then flushes whatever records are left and
+        closes the trace file"""
+        if self._is_closing.is_set():
+            return
+
+        self._is_closing.set()
+        self._flusher.join()
+        self._flush()
+        self._file.close()
+        atexit.unregister(self.close)
+
+
+    def _flush_periodically(self):
+        while not self._is_closing.wait(self._flush_seconds):
+            self._flush()
+
+
+    def _flush(self):
+        # Copying the records out while holding the lock, but writing them without
+        # it, so that recording never waits for the file
+        with self._lock:
+            lost = max(self._recorded - self._flushed - len(self._slots), 0)
+            first = self._flushed + lost
+            records = [
+                self._slots[index % len(self._slots)] for index in range(first, self._recorded)
+            ]
+            self._flushed = self._recorded
+
+        if lost > 0:
+            self._write_gap(lost)
+
+        if records:
+            self._write_records(records)
+
+        self._file.flush()
+
+
+    def _write_header(self, wall_clock_ns, perf_counter_ns):
+        if self._format == 'jsonl':
+            header = {
+                'format': 'p2app-trace', 'version': 1,
+                'wall_clock_ns': wall_clock_ns, 'perf_counter_ns': perf_counter_ns
+            }
+
+            self._file.write(json.dumps(header) + '\n')
+        else:
+            self._file.write(TRACE_MAGIC + _HEADER.pack(wall_clock_ns, perf_counter_ns))
+
+
+    def _write_gap(self, lost):
+        if self._format == 'jsonl':
+            self._file.write(json.dumps({'lost': lost}) + '\n')
+        else:
+            self._file.write(_GAP_KIND + _GAP_RECORD.pack(lost))
+
+
+    def _write_records(self, records):
+        if self._format == 'jsonl':
+            self._file.writelines(
+                json.dumps(dict(zip(TraceRecord._fields, record))) + '\n' for record in records)
+        else:
+            self._file.write(b''.join(_encode_record(*record) for record in records))
+
+
+
+def _encode_record(event_type, sent_ns, started_ns, finished_ns, results):
+    name = event_type.encode()
+    fields = _EVENT_RECORD.pack(sent_ns, started_ns, finished_ns, results, len(name))
+    return _EVENT_KIND + fields + name
+
+
+def read_trace_file(path):
+    """A generator function that yields the header of a trace file, as a dictionary
+    of its wall_clock_ns and perf_counter_ns, then each of its records, as either a
+    TraceRecord or a TraceGap"""
+    if trace_format(path) == 'jsonl':
+        yield from _read_jsonl_trace(path)
+    else:
+        yield from _read_binary_trace(path)
+
+
+def _read_jsonl_trace(path):
+    with open(path, encoding = 'utf-8') as file:
+        header = json.loads(file.readline() or 'null')
+
+        if not isinstance(header, dict) or header.get('format') != 'p2app-trace':
+            raise ValueError(f'{path} is not a trace file')
+
+        yield {'wall_clock_ns': header['wall_clock_ns'],
+               'perf_counter_ns': header['perf_counter_ns']}
+
+        for line in file:
+            record = json.loads(line)
+
+            if 'lost' in record:
+                yield TraceGap(record['lost'])
+            else:
+                yield TraceRecord(**record)
+
+
+def _read_binary_trace(path):
+    with open(path, 'rb') as file:
+        if file.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError(f'{path} is not a trace file')
+
+        wall_clock_ns, perf_counter_ns = _HEADER.unpack(file.read(_HEADER.size))
+        yield {'wall_clock_ns': wall_clock_ns, 'perf_counter_ns': perf_counter_ns}
+
+        while kind := file.read(1):
+            if kind == _GAP_KIND:
+                lost, = _GAP_RECORD.unpack(file.read(_GAP_RECORD.size))
+                yield TraceGap(lost)
+            elif kind == _EVENT_KIND:
+                *times, results, name_length = _EVENT_RECORD.unpack(
+                    file.read(_EVENT_RECORD.size))
+
+                yield TraceRecord(file.read(name_length).decode(), *times, results)
+            else:
+                raise ValueError(f'{path} has a record of an unknown kind: {kind!r}')
@@ -0,0 +1,373 @@
+# p2app/views/airports.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# This is the portion of the user interface that is displayed when the
+# Edit / Airports menu item is selected.
+
+import tkinter
+import tkinter.messagebox
+from p2app.events import *
+from .event_handling import EventHandler
+from .events import *
+
+
+
+class AirportsView(tkinter.Frame, EventHandler):
+    def __init__(self, parent):
+        super().__init__(parent)
+
+        search_view = _AirportsSearchView(self)
+        search_view.grid(row = 0, column = 0, sticky = tkinter.NSEW)
+
+        self._edit_view = None
+        self._children = None
+
+        self.rowconfigure(0, weight = 0)
+        self.rowconfigure(1, weight = 1)
+        self.columnconfigure(0, weight = 1)
+
+
+    def on_event(self, event):
+        if isinstance(event, SaveAirportFailedEvent):
+            tkinter.messagebox.showerror('Save Airport Failed', event.reason())
+
+
+    def on_event_post(self, event):
+        if isinstance(event, DiscardAirportEvent):
+            self._switch_edit_view(None)
+        elif isinstance(event, NewAirportEvent):
+            self._children = None
+            self._switch_edit_view(_AirportEditorView(self, True, True, None, None))
+        elif isinstance(event, StartEditingAirportEvent):
+            self._switch_edit_view(_AirportEditorLoadingView(self))
+        elif isinstance(event, AirportLoadedEvent):
+            self._children = (event.airport().airport_id, event.runways(), event.frequencies())
+            self._switch_edit_view(
+                _AirportEditorView(self, False, True, event.airport(), self._children[1:]))
+        elif isinstance(event, AirportSavedEvent):
+            self._switch_edit_view(_AirportEditorView(
+                self, False, False, event.airport(), self._saved_children(event.airport())))
+
+
+    def _saved_children(self, airport):
+        # Saving an airport doesn't change its runways and frequencies, so the ones
+        # loaded along with it are still the ones to show
+        if self._children and self._children[0] == airport.airport_id:
+            return self._children[1:]
+        else:
+            return None
+
+
+    def _switch_edit_view(self, edit_view):
+        if self._edit_view:
+            self._edit_view.destroy()
+            self._edit_view = None
+
+        if edit_view:
+            self._edit_view = edit_view
+            self._edit_view.grid(row = 1, column = 0, padx = 5, pady = 5, sticky = tkinter.NSEW)
+
+
+
+class _AirportsSearchView(tkinter.LabelFrame, EventHandler):
+    def __init__(self, parent):
+        super().__init__(parent, text = 'Airport Search')
+
+        self._search_ident = self._make_search_field(0, 0, 'Ident: ', 10)
+        self._search_iata_code = self._make_search_field(1, 0, 'IATA Code: ', 10)
+        self._search_gps_code = self._make_search_field(2, 0, 'GPS Code: ', 10)
+        self._search_name = self._make_search_field(0, 2, 'Name: ', 25)
+        self._search_municipality = self._make_search_field(1, 2, 'Municipality: ', 25)
+
+        self._search_button = tkinter.Button(
+            self, text = 'Search', state = tkinter.DISABLED,
+            command = self._on_search_button_clicked)
+
+        self._search_button.grid(row = 2, column = 3, sticky = tkinter.E, padx = 5, pady = 5)
+
+        self._search_list = tkinter.Listbox(
+            self, height = 4,
+            activestyle = tkinter.NONE, selectmode = tkinter.SINGLE)
+
+        self._search_list.bind('<<ListboxSelect>>', self._on_search_selection_changed)
+        self._search_list.grid(
+            row = 0, column = 4, rowspan = 4, columnspan = 1, sticky = tkinter.NSEW,
+            padx = 5, pady = 5)
+
+        self._search_airport_ids = []
+
+        button_frame = tkinter.Frame(self)
+        button_frame.grid(row = 4, column = 4, sticky = tkinter.E, padx = 5, pady = 5)
+
+        self._new_button = tkinter.Button(
+            button_frame, text = 'New Airport',
+            command = self._on_new_airport)
+
+        self._new_button.grid(row = 0, column = 0, padx = 5, pady = 5)
+
+        self._edit_button = tkinter.Button(
+            button_frame, text = 'Edit Airport', state = tkinter.DISABLED,
+            command = self._on_edit_airport)
+
+        self._edit_button.grid(row = 0, column = 1, padx = 5, pady = 5)
+
+        self.rowconfigure(0, weight = 0)
+        self.rowconfigure(1, weight = 0)
+        self.rowconfigure(2, weight = 0)
+        self.rowconfigure(3, weight = 1)
+        self.rowconfigure(4, weight = 0)
+        self.columnconfigure(0, weight = 0)
+        self.columnconfigure(1, weight = 0)
+        self.columnconfigure(2, weight = 0)
+        self.columnconfigure(3, weight = 1)
+        self.columnconfigure(4, weight = 2)
+
+
+    def _make_search_field(self, row, column, label_text, width):
+        label = tkinter.Label(self, text = label_text)
+        label.grid(row = row, column = column, padx = 5, pady = 5, sticky = tkinter.E)
+
+        variable = tkinter.StringVar()
+        variable.trace_add('write', self._on_search_changed)
+
+        entry = tkinter.Entry(self, textvariable = variable, width = width)
+        entry.grid(row = row, column = column + 1, sticky = tkinter.W, padx = 5, pady = 5)
+
+        return variable
+
+
+    def _search_variables(self):
+        return [
+            self._search_ident, self._search_iata_code, self._search_gps_code,
+            self._search_name, self._search_municipality
+        ]
+
+
+    def _on_search_button_clicked(self):
+        self.initiate_event(ClearAirportsSearchListEvent())
+        self.initiate_event(StartAirportSearchEvent(
+            *(self._get_search_value(variable) for variable in self._search_variables())))
+
+
+    @staticmethod
+    def _get_search_value(variable):
+        value = variable.get().strip()
+        return value if len(value) > 0 else None
+
+
+    def _get_selected_search_airport_id(self):
+        selection, *_ = self._search_list.curselection()
+        return self._search_airport_ids[selection]
+
+
+    def _on_search_changed(self, *args):
+        if any(len(variable.get().strip()) > 0 for variable in self._search_variables()):
+            new_state = tkinter.NORMAL
+        else:
+            new_state = tkinter.DISABLED
+
+        self._search_button['state'] = new_state
+        return True
+
+
+    def _on_search_selection_changed(self, event):
+        if event.widget.curselection():
+            new_state = tkinter.NORMAL
+        else:
+            new_state = tkinter.DISABLED
+
+        self._edit_button['state'] = new_state
+
+
+    def _on_new_airport(self):
+        self.initiate_event(DiscardAirportEvent())
+        self.initiate_event(NewAirportEvent())
+
+
+    def _on_edit_airport(self):
+        self.initiate_event(DiscardAirportEvent())
+        self.initiate_event(StartEditingAirportEvent())
+        self.initiate_event(LoadAirportEvent(self._get_selected_search_airport_id()))
+
+
+    def on_event(self, event):
+        if isinstance(event, ClearAirportsSearchListEvent):
+            self._search_list.delete(0, tkinter.END)
+            self._search_airport_ids = []
+            self._edit_button['state'] = tkinter.DISABLED
+        elif isinstance(event, AirportSearchResultsBatchEvent):
+            display_names = [
+                f'{airport.airport_ident} - {airport.name}' for airport in event.airports()]
+
+            self._search_list.insert(tkinter.END, *display_names)
+            self._search_airport_ids.extend(airport.airport_id for airport in event.airports())
+
+
+
+class _AirportEditorLoadingView(tkinter.LabelFrame, EventHandler):
+    def __init__(self, parent):
+        super().__init__(parent)
+
+        loading_label = tkinter.Label(self, text = 'Loading...')
+        loading_label.grid(row = 0, column = 0, padx = 5, pady = 5, sticky = tkinter.W)
+
+
+
+class _AirportEditorView(tkinter.LabelFrame, EventHandler):
+    def __init__(self, parent, is_new, is_editable, airport, children):
+        if is_new:
+            frame_text = 'New Airport'
+        elif is_editable:
+            frame_text = 'Edit Airport'
+        else:
+            frame_text = 'Airport Saved'
+
+        super().__init__(parent, text = frame_text)
+
+        self._is_new = is_new
+        self._is_editable = is_editable
+        self._airport_id = airport.airport_id if airport else None
+
+        airport_id_label = tkinter.Label(self, text = 'Airport ID: ')
+        airport_id_label.grid(row = 0, column = 0, padx = 5, pady = 5, sticky = tkinter.E)
+
+        airport_id_value_label_text = f'{self._airport_id if self._airport_id else "(New)"}'
+        airport_id_value_label = tkinter.Label(self, text = airport_id_value_label_text)
+        airport_id_value_label.grid(row = 0, column = 1, padx = 5, pady = 5, sticky = tkinter.W)
+
+        # The fields are laid out in two columns, each a label followed by its value
+        self._airport_ident = self._make_field(airport, 'airport_ident', 1, 0, 'Ident: ', 10)
+        self._type = self._make_field(airport, 'type', 2, 0, 'Type: ', 20)
+        self._airport_name = self._make_field(airport, 'name', 3, 0, 'Name: ', 30)
+        self._latitude_deg = self._make_field(airport, 'latitude_deg', 4, 0, 'Latitude: ', 12)
+        self._longitude_deg = self._make_field(airport, 'longitude_deg', 5, 0, 'Longitude: ', 12)
+        self._elevation_ft = self._make_field(airport, 'elevation_ft', 6, 0, 'Elevation (ft): ', 10)
+        self._continent_id = self._make_field(airport, 'continent_id', 7, 0, 'Continent ID: ', 10)
+        self._country_id = self._make_field(airport, 'country_id', 8, 0, 'Country ID: ', 10)
+        self._region_id = self._make_field(airport, 'region_id', 9, 0, 'Region ID: ', 10)
+        self._municipality = self._make_field(airport, 'municipality', 1, 2, 'Municipality: ', 30)
+        self._gps_code = self._make_field(airport, 'gps_code', 2, 2, 'GPS Code: ', 10)
+        self._iata_code = self._make_field(airport, 'iata_code', 3, 2, 'IATA Code: ', 10)
+        self._local_code = self._make_field(airport, 'local_code', 4, 2, 'Local Code: ', 10)
+        self._home_link = self._make_field(airport, 'home_link', 5, 2, 'Home Link: ', 30)
+        self._wikipedia_link = self._make_field(
+            airport, 'wikipedia_link', 6, 2, 'Wikipedia Link: ', 30)
+        self._keywords = self._make_field(airport, 'keywords', 7, 2, 'Keywords: ', 30)
+
+        self._scheduled_service = tkinter.IntVar()
+        self._scheduled_service.set(airport.scheduled_service if airport else 0)
+
+        scheduled_service_check = tkinter.Checkbutton(
+            self, text = 'Scheduled Service', variable = self._scheduled_service,
+            state = tkinter.NORMAL if is_editable else tkinter.DISABLED)
+
+        scheduled_service_check.grid(row = 8, column = 3, padx = 5, pady = 5, sticky = tkinter.W)
+
+        if children is not None:
+            self._make_children_list(*children)
+
+        button_frame = tkinter.Frame(self)
+        button_frame.grid(row = 11, column = 3, padx = 5, pady = 5, sticky = tkinter.SE)
+
+        if is_editable:
+            save_button = tkinter.Button(button_frame, text = 'Save', command = self._on_save)
+            save_button.grid(row = 0, column = 0, padx = 5, pady = 5)
+
+        discard_button = tkinter.Button(button_frame, text = 'Discard', command = self._on_discard)
+        discard_button.grid(row = 0, column = 1, padx = 5, pady = 5)
+
+        for row in range(10):
+            self.rowconfigure(row, weight = 0)
+
+        self.rowconfigure(10, weight = 1)
+        self.rowconfigure(11, weight = 0)
+        self.columnconfigure(0, weight = 0)
+        self.columnconfigure(1, weight = 1)
+        self.columnconfigure(2, weight = 0)
+        self.columnconfigure(3, weight = 1)
+
+
+    def _make_children_list(self, runways, frequencies):
+        children_label = tkinter.Label(self, text = 'Runways and Frequencies: ')
+        children_label.grid(row = 9, column = 2, padx = 5, pady = 5, sticky = tkinter.NE)
+
+        children_list = tkinter.Listbox(self, height = 5, activestyle = tkinter.NONE)
+        children_list.grid(
+            row = 9, column = 3, rowspan = 2, padx = 5, pady = 5, sticky = tkinter.NSEW)
+
+        for runway in runways:
+            if runway.length_ft is not None:
+                length = f'{runway.length_ft:,} ft'
+            else:
+                length = 'length unknown'
+
+            children_list.insert(
+                tkinter.END,
+                f'Runway {runway.le_ident or "?"}/{runway.he_ident or "?"} - {length}, '
+                f'{runway.surface or "surface unknown"}{" (closed)" if runway.closed else ""}')
+
+        for frequency in frequencies:
+            children_list.insert(
+                tkinter.END,
+                f'{frequency.type} {frequency.frequency_mhz:.3f} MHz'
+                f'{" - " + frequency.description if frequency.description else ""}')
+
+
+    def _make_field(self, airport, field, row, column, label_text, width):
+        value = getattr(airport, field) if airport else None
+
+        variable = tkinter.StringVar()
+        variable.set('' if value is None else str(value))
+
+        label = tkinter.Label(self, text = label_text)
+        label.grid(row = row, column = column, padx = 5, pady = 5, sticky = tkinter.E)
+
+        if self._is_editable:
+            entry = tkinter.Entry(self, textvariable = variable, width = width)
+        else:
+            entry = tkinter.Label(self, textvariable = variable)
+
+        entry.grid(row = row, column = column + 1, padx = 5, pady = 5, sticky = tkinter.W)
+
+        return variable
+
+
+    def _on_save(self):
+        try:
+            airport = self._make_airport()
+        except ValueError as e:
+            tkinter.messagebox.showerror('Save Airport Failed', f'Invalid value: {e}')
+            return
+
+        if self._is_new:
+            self.initiate_event(SaveNewAirportEvent(airport))
+        else:
+            self.initiate_event(SaveAirportEvent(airport))
+
+
+    def _on_discard(self):
+        self.initiate_event(DiscardAirportEvent())
+
+
+    def _make_airport(self):
+        return Airport(
+            self._airport_id, self._airport_ident.get(), self._type.get(),
+            self._airport_name.get(), float(self._latitude_deg.get()),
+            float(self._longitude_deg.get()), self._nullify_int(self._elevation_ft.get()),
+            self._continent_id.get(), int(self._country_id.get()), int(self._region_id.get()),
+            self._nullify(self._municipality.get()), self._scheduled_service.get(),
+            self._nullify(self._gps_code.get()), self._nullify(self._iata_code.get()),
+            self._nullify(self._local_code.get()), self._nullify(self._home_link.get()),
+            self._nullify(self._wikipedia_link.get()), self._nullify(self._keywords.get()))
+
+
+    @staticmethod
+    def _nullify(value):
+        return None if len(value) == 0 else value
+
+
+    @staticmethod
+    def _nullify_int(value):
+        return None if len(value) == 0 else int(value)
@@ -0,0 +1,133 @@
+# p2app/views/fulltext.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# This is the portion of the user interface that is displayed when the
+# Edit / Search Names and Keywords menu item is selected.  It searches the
+# names and keywords of countries, regions and airports all at once, listing
+# the best matches first, and lets the user edit any of them.
+
+import tkinter
+from p2app.events import *
+from .event_handling import EventHandler
+from .events import *
+
+
+
+# For each table whose records can be edited from the search results, the events
+# that switch to its view and then load the selected record into its editor
+_EDIT_EVENTS = {
+    'country': (ShowEditCountriesViewEvent, DiscardCountryEvent, StartEditingCountryEvent,
+                LoadCountryEvent),
+    'region': (ShowEditRegionsViewEvent, DiscardRegionEvent, StartEditingRegionEvent,
+               LoadRegionEvent),
+    'airport': (ShowEditAirportsViewEvent, DiscardAirportEvent, StartEditingAirportEvent,
+                LoadAirportEvent)
+}
+
+_TABLE_NAMES = {
+    'country': 'Country',
+    'region': 'Region',
+    'airport': 'Airport'
+}
+
+
+
+class FullTextSearchView(tkinter.LabelFrame, EventHandler):
+    def __init__(self, parent):
+        super().__init__(parent, text = 'Search Names and Keywords')
+
+        text_label = tkinter.Label(self, text = 'Words: ')
+        text_label.grid(row = 0, column = 0, padx = 5, pady = 5, sticky = tkinter.E)
+
+        self._search_text = tkinter.StringVar()
+        self._search_text.trace_add('write', self._on_search_changed)
+
+        text_entry = tkinter.Entry(self, textvariable = self._search_text, width = 30)
+        text_entry.grid(row = 0, column = 1, sticky = tkinter.EW, padx = 5, pady = 5)
+
+        self._search_button = tkinter.Button(
+            self, text = 'Search', state = tkinter.DISABLED,
+            command = self._on_search_button_clicked)
+
+        self._search_button.grid(row = 1, column = 1, sticky = tkinter.E, padx = 5, pady = 5)
+
+        self._search_list = tkinter.Listbox(
+            self, activestyle = tkinter.NONE, selectmode = tkinter.SINGLE)
+
+        self._search_list.bind('<<ListboxSelect>>', self._on_search_selection_changed)
+        self._search_list.grid(
+            row = 0, column = 2, rowspan = 3, columnspan = 1, sticky = tkinter.NSEW,
+            padx = 5, pady = 5)
+
+        self._search_results = []
+
+        self._edit_button = tkinter.Button(
+            self, text = 'Edit', state = tkinter.DISABLED,
+            command = self._on_edit_result)
+
+        self._edit_button.grid(row = 3, column = 2, sticky = tkinter.E, padx = 5, pady = 5)
+
+        self.rowconfigure(0, weight = 0)
+        self.rowconfigure(1, weight = 0)
+        self.rowconfigure(2, weight = 1)
+        self.rowconfigure(3, weight = 0)
+        self.columnconfigure(0, weight = 0)
+        self.columnconfigure(1, weight = 1)
+        self.columnconfigure(2, weight = 2)
+
+
+    def _on_search_button_clicked(self):
+        self.initiate_event(ClearFullTextSearchListEvent())
+        self.initiate_event(StartFullTextSearchEvent(self._search_text.get().strip()))
+
+
+    def _on_search_changed(self, *args):
+        if len(self._search_text.get().strip()) > 0:
+            new_state = tkinter.NORMAL
+        else:
+            new_state = tkinter.DISABLED
+
+        self._search_button['state'] = new_state
+        return True
+
+
+    def _get_selected_search_result(self):
+        selection, *_ = self._search_list.curselection()
+        return self._search_results[selection]
+
+
+    def _on_search_selection_changed(self, event):
+        if event.widget.curselection() and self._get_selected_search_result().table in _EDIT_EVENTS:
+            new_state = tkinter.NORMAL
+        else:
+            new_state = tkinter.DISABLED
+
+        self._edit_button['state'] = new_state
+
+
+    def _on_edit_result(self):
+        result = self._get_selected_search_result()
+        show_event, discard_event, start_editing_event, load_event = _EDIT_EVENTS[result.table]
+
+        # Showing the table's view replaces this one, so the events are sent from
+        # the main window rather than from this soon-to-be-destroyed view
+        main_view = self.winfo_toplevel()
+        main_view.initiate_event(show_event())
+        main_view.initiate_event(discard_event())
+        main_view.initiate_event(start_editing_event())
+        main_view.initiate_event(load_event(result.record_id))
+
+
+    def on_event(self, event):
+        if isinstance(event, ClearFullTextSearchListEvent):
+            self._search_list.delete(0, tkinter.END)
+            self._search_results = []
+            self._edit_button['state'] = tkinter.DISABLED
+        elif isinstance(event, FullTextSearchResultsBatchEvent):
+            display_names = [
+                f'{_TABLE_NAMES[result.table]} - {result.name}' for result in event.results()]
+
+            self._search_list.insert(tkinter.END, *display_names)
+            self._search_results.extend(event.results())
@@ -10,11 +10,13 @@
 import tkinter
 import tkinter.messagebox
 from p2app.events import *
+from .airports import AirportsView
 from .continents import ContinentsView
 from .countries import CountriesView
 from .empty import EmptyView
 from .events import *
 from .event_handling import EventHandler
+from .fulltext import FullTextSearchView
 from .menus import MainMenu
 from .regions import RegionsView
 
@@ -58,6 +60,10 @@ class MainView(tkinter.Tk, EventHandler):
             self._switch_view(CountriesView(self))
         elif isinstance(event, ShowEditRegionsViewEvent):
             self._switch_view(RegionsView(self))
+        elif isinstance(event, ShowEditAirportsViewEvent):
+            self._switch_view(AirportsView(self))
+        elif isinstance(event, ShowFullTextSearchViewEvent):
+            self._switch_view(FullTextSearchView(self))
         elif isinstance(event, DatabaseOpenedEvent):
             self._update_database_path(event.path())
         elif isinstance(event, DatabaseClosedEvent):
@@ -67,6 +73,8 @@ class MainView(tkinter.Tk, EventHandler):
             self._update_database_path(None)
             self._switch_view(EmptyView(self))
             tkinter.messagebox.showerror('Could Not Open Database', event.reason())
+        elif isinstance(event, EngineStatisticsEvent):
+            self._show_engine_statistics(event.statistics() | self._event_bus.statistics())
         elif isinstance(event, EnableDebugModeEvent):
             self._event_bus.enable_debug_mode()
         elif isinstance(event, DisableDebugModeEvent):
@@ -88,6 +96,15 @@ class MainView(tkinter.Tk, EventHandler):
         self._current_view.grid(row = 0, column = 0, sticky = tkinter.NSEW, padx = 5, pady = 5)
 
 
+    def _show_engine_statistics(self, statistics):
+        if statistics:
+            message = '\n'.join(f'{name}: {value:,}' for name, value in statistics.items())
+        else:
+            message = 'There are no statistics while no database is open.'
+
+        tkinter.messagebox.showinfo('Engine Statistics', message)
+
+
     def _update_database_path(self, path):
         if path:
             visible_name = path.name
@@ -81,6 +81,10 @@ class EditMenu(BaseMenu):
         self.add_command(label = 'Continents', command = self._on_edit_continents)
         self.add_command(label = 'Countries', command = self._on_edit_countries)
         self.add_command(label = 'Regions', command = self._on_edit_regions)
+        self.add_command(label = 'Airports', command = self._on_edit_airports)
+        self.add_separator()
+        self.add_command(
+            label = 'Search Names and Keywords', command = self._on_full_text_search)
 
 
     def _on_edit_continents(self):
@@ -95,6 +99,14 @@ class EditMenu(BaseMenu):
         self.initiate_event(ShowEditRegionsViewEvent())
 
 
+    def _on_edit_airports(self):
+        self.initiate_event(ShowEditAirportsViewEvent())
+
+
+    def _on_full_text_search(self):
+        self.initiate_event(ShowFullTextSearchViewEvent())
+
+
 
 class DebugMenu(BaseMenu):
     def __init__(self, parent):
@@ -106,6 +118,13 @@ class DebugMenu(BaseMenu):
             label = 'Show Events', variable = self._is_debug_mode,
             command = self._on_change_show_events)
 
+        self.add_command(
+            label = 'Show Engine Statistics', command = self._on_show_engine_statistics)
+
+
+    def _on_show_engine_statistics(self):
+        self.initiate_event(ReportEngineStatisticsEvent())
+
 
     def _on_change_show_events(self):
         if self._is_debug_mode.get():
@@ -13,6 +13,14 @@ import tkinter.messagebox
 from p2app.events import *
 from .event_handling import EventHandler
 from .events import *
+from .virtual_list import VirtualList
+
+
+# How many regions are asked for at a time as the search results are scrolled
+_PAGE_SIZE = 100
+
+# How long, in milliseconds, typing must pause before the regions are searched for
+_SEARCH_DELAY_MILLISECONDS = 200
 
 
 
@@ -99,16 +107,15 @@ class _RegionsSearchView(tkinter.LabelFrame, EventHandler):
         empty_area = tkinter.Label(self, text = '')
         empty_area.grid(row = 4, column = 1, sticky = tkinter.NSEW, padx = 5, pady = 5)
 
-        self._search_list = tkinter.Listbox(
-            self, height = 4,
-            activestyle = tkinter.NONE, selectmode = tkinter.SINGLE)
+        self._search_list = VirtualList(
+            self, self._request_search_page, self._on_search_selection_changed, height = 4)
 
-        self._search_list.bind('<<ListboxSelect>>', self._on_search_selection_changed)
         self._search_list.grid(
             row = 0, column = 2, rowspan = 4, columnspan = 1, sticky = tkinter.NSEW,
             padx = 5, pady = 5)
 
-        self._search_region_ids = []
+        self._search_criteria = None
+        self._pending_search = None
 
         button_frame = tkinter.Frame(self)
         button_frame.grid(row = 5, column = 2, sticky = tkinter.E, padx = 5, pady = 5)
@@ -136,11 +143,39 @@ class _RegionsSearchView(tkinter.LabelFrame, EventHandler):
         self.columnconfigure(2, weight = 2)
 
 
+    def destroy(self):
+        self._cancel_pending_search()
+        super().destroy()
+
+
     def _on_search_button_clicked(self):
+        self._cancel_pending_search()
         self.initiate_event(ClearRegionsSearchListEvent())
-        self.initiate_event(StartRegionSearchEvent(
+
+        self._search_criteria = (
             self._get_search_region_code(), self._get_search_local_code(),
-            self._get_search_name()))
+            self._get_search_name())
+
+        self._search_list.start()
+
+
+    def _request_search_page(self, after_key):
+        # Each field matches the regions beginning with what's been typed into it,
+        # so that the results narrow as the user types
+        self.initiate_event(StartRegionPageSearchEvent(
+            *self._search_criteria, page_size = _PAGE_SIZE, after_key = after_key,
+            mode = PREFIX_MATCH))
+
+
+    def _cancel_pending_search(self):
+        if self._pending_search is not None:
+            self.after_cancel(self._pending_search)
+            self._pending_search = None
+
+
+    def _on_search_delay_passed(self):
+        self._pending_search = None
+        self._on_search_button_clicked()
 
 
     def _get_search_region_code(self):
@@ -159,8 +194,7 @@ class _RegionsSearchView(tkinter.LabelFrame, EventHandler):
 
 
     def _get_selected_search_region_id(self):
-        selection, *_ = self._search_list.curselection()
-        return self._search_region_ids[selection]
+        return self._search_list.selected_value()
 
 
     def _on_search_changed(self, *args):
@@ -172,11 +206,22 @@ class _RegionsSearchView(tkinter.LabelFrame, EventHandler):
             new_state = tkinter.DISABLED
 
         self._search_button['state'] = new_state
+
+        # Searching once the user pauses, rather than after every keystroke, with
+        # the results of an earlier search discarded when the new one begins
+        self._cancel_pending_search()
+
+        if new_state == tkinter.NORMAL:
+            self._pending_search = self.after(
+                _SEARCH_DELAY_MILLISECONDS, self._on_search_delay_passed)
+        else:
+            self.initiate_event(ClearRegionsSearchListEvent())
+
         return True
 
 
-    def _on_search_selection_changed(self, event):
-        if event.widget.curselection():
+    def _on_search_selection_changed(self, is_selected):
+        if is_selected:
             new_state = tkinter.NORMAL
         else:
             new_state = tkinter.DISABLED
@@ -197,13 +242,15 @@ class _RegionsSearchView(tkinter.LabelFrame, EventHandler):
 
     def on_event(self, event):
         if isinstance(event, ClearRegionsSearchListEvent):
-            self._search_list.delete(0, tkinter.END)
-            self._search_region_ids = []
+            self._search_list.clear()
             self._edit_button['state'] = tkinter.DISABLED
-        elif isinstance(event, RegionSearchResultEvent):
-            display_name = f'{event.region().region_code} - {event.region().name}'
-            self._search_list.insert(tkinter.END, display_name)
-            self._search_region_ids.append(event.region().region_id)
+        elif isinstance(event, RegionSearchPageEvent):
+            rows = [
+                (f'{region.region_code} - {region.name}', region.region_id)
+                for region in event.regions()
+            ]
+
+            self._search_list.add_page(rows, event.after_key(), event.next_key())
 
 
 
@@ -0,0 +1,298 @@
+# p2app/views/virtual_list.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# A list of search results that only ever shows a window of them at a time.
+#
+# * The rows are received a page at a time, by calling the request_page function
+#   it was given with the key the page begins after, then waiting for the page to
+#   be given to add_page before asking for another.  Whenever the window comes
+#   within two windows of the last row received, the list asks for the next page.
+# * Only a handful of pages around the window are kept, as (text, value) pairs,
+#   and the Listbox only ever holds the rows that are visible, so neither memory
+#   nor the time it takes to show the list grows with how far it's scrolled.  The
+#   key each page begins after is remembered, so that a page that was let go can
+#   be asked for again when the window comes back near it.  Until it arrives, its
+#   rows are shown as placeholders.
+# * The selection is kept as the index of the selected row among all of them,
+#   along with its value, so it survives the window being scrolled away from it
+#   and back.
+
+import tkinter
+import tkinter.font
+
+
+
+# How many pages are kept, unless more than that are within reach of the window
+_MAX_KEPT_PAGES = 8
+
+# The text shown for a row whose page hasn't arrived yet
+_PLACEHOLDER_TEXT = '...'
+
+
+
+class VirtualList(tkinter.Frame):
+    def __init__(self, parent, request_page, on_selection_changed, height = 4, **options):
+        super().__init__(parent, **options)
+
+        self._request_page = request_page
+        self._on_selection_changed = on_selection_changed
+        self._height = height
+
+        self._pages = {}
+        self._page_keys = [None]
+        self._page_length = None
+        self._row_count = 0
+        self._is_complete = True
+        self._first = 0
+        self._selected = None
+        self._selected_value = None
+        self._requested_page = None
+        self._requested_key = None
+        self._is_requesting = False
+
+        self._listbox = tkinter.Listbox(
+            self, height = height, activestyle = tkinter.NONE, selectmode = tkinter.SINGLE,
+            exportselection = False)
+
+        self._font = tkinter.font.Font(font = self._listbox.cget('font'))
+
+        self._listbox.grid(row = 0, column = 0, sticky = tkinter.NSEW)
+        self._listbox.bind('<<ListboxSelect>>', self._on_listbox_select)
+        self._listbox.bind('<MouseWheel>', self._on_mouse_wheel)
+        self._listbox.bind('<Button-4>', lambda event: self._scroll_by(-3))
+        self._listbox.bind('<Button-5>', lambda event: self._scroll_by(3))
+        self._listbox.bind('<Up>', lambda event: self._move_selection(-1))
+        self._listbox.bind('<Down>', lambda event: self._move_selection(1))
+        self._listbox.bind('<Prior>', lambda event: self._scroll_by(-self._height))
+        self._listbox.bind('<Next>', lambda event: self._scroll_by(self._height))
+        self._listbox.bind('<Configure>', self._on_resized)
+
+        self._scrollbar = tkinter.Scrollbar(
+            self, orient = tkinter.VERTICAL, command = self._on_scrollbar)
+
+        self._scrollbar.grid(row = 0, column = 1, sticky = tkinter.NS)
+
+        self.rowconfigure(0, weight = 1)
+        self.columnconfigure(0, weight = 1)
+        self.columnconfigure(1, weight = 0)
+
+
+    def clear(self):
+        self._pages = {}
+        self._page_keys = [None]
+        self._page_length = None
+        self._row_count = 0
+        self._is_complete = True
+        self._first = 0
+        self._selected = None
+        self._selected_value = None
+        self._requested_page = None
+        self._requested_key = None
+        self._is_requesting = False
+        self._render()
+
+
+    def start(self):
+        """Clears the list and asks for its first page"""
+        self.clear()
+        self._is_complete = False
+        self._request(0)
+
+
+    def add_page(self, rows, after_key, next_key):
+        # A page that wasn't asked for belongs to an earlier search
+        if not self._is_requesting or after_key != self._requested_key:
+            return
+
+        index = self._requested_page
+        self._is_requesting = False
+
+        # Every page but the last is as long as the first
+        if self._page_length is None:
+            self._page_length = max(len(rows), 1)
+
+        self._pages[index] = rows
+
+        if index == len(self._page_keys) - 1 and not self._is_complete:
+            self._row_count = index * self._page_length + len(rows)
+
+            if next_key is None:
+                self._is_complete = True
+            else:
+                self._page_keys.append(next_key)
+
+        if self._selected is not None and self._page_of(self._selected) == index:
+            self._selected_value = self._row(self._selected)[1]
+
+        self._render()
+
+
+    def selected_value(self):
+        return self._selected_value
+
+
+    def _on_listbox_select(self, event):
+        selection = self._listbox.curselection()
+
+        if selection:
+            self._select(self._first + selection[0])
+
+        self._on_selection_changed(self._selected_value is not None)
+
+
+    def _on_mouse_wheel(self, event):
+        self._scroll_by(-1 if event.delta > 0 else 1)
+        return 'break'
+
+
+    def _on_resized(self, event):
+        # The Listbox may have been stretched or shrunk by its layout, so the window
+        # is made as many rows tall as now fit in it
+        listbox = self._listbox
+        row_height = \
+            self._font.metrics('linespace') + 1 + 2 * int(listbox.cget('selectborderwidth'))
+        border = 2 * (int(listbox.cget('borderwidth')) + int(listbox.cget('highlightthickness')))
+        height = max((event.height - border) // row_height, 1)
+
+        if height != self._height:
+            self._height = height
+            self._render()
+
+
+    def _on_scrollbar(self, action, amount, unit = None):
+        if action == tkinter.MOVETO:
+            self._scroll_to(int(float(amount) * self._virtual_size()))
+        elif unit == tkinter.PAGES:
+            self._scroll_by(int(amount) * self._height)
+        else:
+            self._scroll_by(int(amount))
+
+
+    def _move_selection(self, offset):
+        if self._row_count == 0:
+            return 'break'
+
+        if self._selected is None:
+            selected = self._first
+        else:
+            selected = max(0, min(self._selected + offset, self._row_count - 1))
+
+        self._select(selected)
+
+        # The window follows the selection when it moves past either end
+        if selected < self._first:
+            self._first = selected
+        elif selected >= self._first + self._height:
+            self._first = selected - self._height + 1
+
+        self._render()
+        self._on_selection_changed(self._selected_value is not None)
+        return 'break'
+
+
+    def _select(self, index):
+        self._selected = index
+        row = self._row(index)
+        self._selected_value = None if row is None else row[1]
+
+
+    def _scroll_by(self, rows):
+        self._scroll_to(self._first + rows)
+        return 'break'
+
+
+    def _scroll_to(self, first):
+        self._first = max(0, min(first, self._row_count - self._height))
+        self._render()
+
+
+    def _virtual_size(self):
+        # While there are more pages, the scrollbar leaves room for at least one
+        # more window of rows, so that it never looks as though the end was reached
+        more = self._height if not self._is_complete else 0
+        return max(self._row_count + more, 1)
+
+
+    def _page_of(self, index):
+        return index // self._page_length
+
+
+    def _row(self, index):
+        """Returns the row at an index among all of them, or None if its page isn't kept"""
+        if self._page_length is None:
+            return None
+
+        page = self._pages.get(self._page_of(index))
+        offset = index % self._page_length
+
+        return page[offset] if page is not None and offset < len(page) else None
+
+
+    def _render(self):
+        self._first = max(0, min(self._first, self._row_count - self._height))
+        visible = [
+            self._row(index)
+            for index in range(self._first, min(self._first + self._height, self._row_count))
+        ]
+
+        self._listbox.delete(0, tkinter.END)
+
+        if visible:
+            self._listbox.insert(
+                tkinter.END,
+                *(_PLACEHOLDER_TEXT if row is None else row[0] for row in visible))
+
+        if self._selected is not None and 0 <= self._selected - self._first < len(visible):
+            self._listbox.selection_set(self._selected - self._first)
+
+        size = self._virtual_size()
+        self._scrollbar.set(self._first / size, min((self._first + len(visible)) / size, 1.0))
+
+        self._request_page_if_needed()
+
+
+    def _pages_in_reach(self):
+        """Returns the indexes of the pages within two windows of the window, which
+        are known to exist, nearest to the window first"""
+        if self._page_length is None:
+            return []
+
+        first = self._page_of(max(self._first - 2 * self._height, 0))
+        last = min(
+            self._page_of(self._first + 3 * self._height), len(self._page_keys) - 1)
+        middle = self._first_page()
+
+        return sorted(range(first, last + 1), key = lambda index: abs(index - middle))
+
+
+    def _request_page_if_needed(self):
+        if self._is_requesting:
+            return
+
+        in_reach = self._pages_in_reach()
+
+        # The pages farthest from the window are let go first, but never one that's
+        # within reach of it
+        for index in sorted(self._pages, key = lambda index: -abs(index - self._first_page())):
+            if len(self._pages) <= _MAX_KEPT_PAGES:
+                break
+            elif index not in in_reach:
+                del self._pages[index]
+
+        for index in in_reach:
+            if index not in self._pages:
+                self._request(index)
+                return
+
+
+    def _first_page(self):
+        return 0 if self._page_length is None else self._page_of(self._first)
+
+
+    def _request(self, index):
+        self._is_requesting = True
+        self._requested_page = index
+        self._requested_key = self._page_keys[index]
+        self._request_page(self._requested_key)
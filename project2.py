@@ -5,15 +5,38 @@
 #
 # This is the main module that runs the entire program.
 #
+#     python project2.py                     (the engine runs on a worker thread)
+#     python project2.py --event-bus queued  (the engine runs between redraws)
+#     python project2.py --trace events.jsonl  (Debug / Show Events traces there)
+#
 # YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
 
-from p2app import EventBus
+import argparse
+from p2app import ThreadedEventBus, QueuedEventBus
 from p2app import Engine
 from p2app import MainView
 
 
+_EVENT_BUSES = {'threaded': ThreadedEventBus, 'queued': QueuedEventBus}
+
+
+def _parse_arguments():
+    parser = argparse.ArgumentParser(description = 'Edits the airports database.')
+    parser.add_argument(
+        '--event-bus', choices = list(_EVENT_BUSES), default = 'threaded',
+        help = 'whether the engine runs on a worker thread, or on the user '
+               "interface's thread a batch of results at a time")
+    parser.add_argument(
+        '--trace', metavar = 'PATH',
+        help = 'the file that Debug / Show Events traces events to, as JSON Lines if its '
+               'suffix is .jsonl or binary otherwise (view_trace.py summarizes it)')
+    return parser.parse_args()
+
+
 def main():
-    event_bus = EventBus()
+    arguments = _parse_arguments()
+    event_bus = _EVENT_BUSES[arguments.event_bus]()
+    event_bus.set_trace_path(arguments.trace)
     engine = Engine()
     main_view = MainView(event_bus)
 
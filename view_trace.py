@@ -0,0 +1,144 @@
+# view_trace.py
+#
+# ICS 33 Spring 2023
+# Project 2: Learning to Fly
+#
+# Summarizes a trace file written while the application's debug mode was on,
+# showing how many of each type of event the engine was sent, how many results
+# they produced, and a histogram of how long they took.
+#
+#     python view_trace.py p2app-trace-20230501-120000.trace
+#     python view_trace.py trace.jsonl --measure handling --event StartAirportSearchEvent
+
+import argparse
+import struct
+import sys
+from p2app.events.tracing import read_trace_file, TraceGap
+
+
+# How each record's duration is measured, in nanoseconds
+_MEASURES = {
+    'latency': lambda record: record.finished_ns - record.sent_ns,
+    'handling': lambda record: record.finished_ns - record.started_ns,
+    'waiting': lambda record: record.started_ns - record.sent_ns
+}
+
+_PERCENTILES = (50, 90, 99)
+
+# The widest a histogram's bar can be, in characters
+_BAR_WIDTH = 40
+
+
+def _summarize(path, measure, event_types):
+    """Returns a dictionary mapping each type of event to the list of its durations
+    and its total number of results, along with the number of records lost"""
+    records = read_trace_file(path)
+    next(records)
+    summaries = {}
+    lost = 0
+
+    for record in records:
+        if isinstance(record, TraceGap):
+            lost += record.records
+        elif not event_types or record.event_type in event_types:
+            durations, results = summaries.get(record.event_type, ([], 0))
+            durations.append(measure(record))
+            summaries[record.event_type] = durations, results + record.results
+
+    return summaries, lost
+
+
+def _format_duration(nanoseconds):
+    if nanoseconds < 1_000:
+        return f'{nanoseconds:.0f} ns'
+    elif nanoseconds < 1_000_000:
+        return f'{nanoseconds / 1_000:.1f} us'
+    elif nanoseconds < 1_000_000_000:
+        return f'{nanoseconds / 1_000_000:.1f} ms'
+    else:
+        return f'{nanoseconds / 1_000_000_000:.2f} s'
+
+
+def _percentile(durations, percentile):
+    return durations[min(len(durations) * percentile // 100, len(durations) - 1)]
+
+
+def _histogram(durations):
+    """Returns the lines of a histogram of the durations, whose buckets each span
+    from one power of two nanoseconds up to the next"""
+    buckets = {}
+
+    for duration in durations:
+        bucket = max(duration, 1).bit_length() - 1
+        buckets[bucket] = buckets.get(bucket, 0) + 1
+
+    most = max(buckets.values())
+    lines = []
+
+    for bucket in range(min(buckets), max(buckets) + 1):
+        count = buckets.get(bucket, 0)
+        bar = '#' * (-(-count * _BAR_WIDTH // most))
+        lines.append(f'  {_format_duration(2 ** bucket):>9} | {bar:<{_BAR_WIDTH}} {count:,}')
+
+    return lines
+
+
+def _print_summary(event_type, durations, results):
+    durations.sort()
+    mean = sum(durations) / len(durations)
+    percentiles = ', '.join(
+        f'p{percentile} {_format_duration(_percentile(durations, percentile))}'
+        for percentile in _PERCENTILES)
+
+    print(f'{event_type}: {len(durations):,} events, {results:,} results')
+    print(f'  mean {_format_duration(mean)}, {percentiles}, max {_format_duration(durations[-1])}')
+
+    for line in _histogram(durations):
+        print(line)
+
+    print()
+
+
+def _parse_arguments():
+    parser = argparse.ArgumentParser(
+        description = 'Summarizes the events recorded in a trace file.')
+    parser.add_argument('trace', help = 'the trace file, either JSON Lines (.jsonl) or binary')
+    parser.add_argument(
+        '--measure', choices = list(_MEASURES), default = 'latency',
+        help = 'whether to measure the time from each event being sent until the engine '
+               'finished with it, the time the engine spent handling it, or the time it '
+               'waited to be handled')
+    parser.add_argument(
+        '--event', action = 'append', default = [],
+        help = 'a type of event to summarize, which can be given more than once; every '
+               'type is summarized otherwise')
+    return parser.parse_args()
+
+
+def main():
+    arguments = _parse_arguments()
+
+    try:
+        summaries, lost = _summarize(
+            arguments.trace, _MEASURES[arguments.measure], set(arguments.event))
+    except (OSError, ValueError, struct.error) as e:
+        print(f'The trace could not be read: {e}', file = sys.stderr)
+        return 1
+
+    if not summaries:
+        print('There are no events in the trace.')
+
+    # The types of events that took the longest altogether come first
+    for event_type, (durations, results) in sorted(
+            summaries.items(), key = lambda item: -sum(item[1][0])):
+        _print_summary(event_type, durations, results)
+
+    if lost > 0:
+        print(f'{lost:,} events were lost because they were recorded faster than they '
+              f'could be written.')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())